@@ -0,0 +1,136 @@
+# app/auth/auth_context.py
+"""
+Request-scoped authentication context.
+
+The check_blacklisted_tokens middleware verifies the bearer token once,
+checks it against the revocation store and stores the claims on
+``request.state.auth_claims``. Dependencies (get_current_user, logout,
+...) reuse those claims through get_token_claims() instead of decoding
+the JWT again.
+
+Verified tokens are also kept in a small LRU keyed by the raw token, so
+clients that send the same token on every request skip the HMAC check.
+A cached entry is only used until the token's own expiry, and revocation
+is still checked on every request.
+"""
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordBearer
+from jose import jwt, JWTError
+
+from ..config import settings
+from ..utils.metrics import register_metrics_source
+from .token_blacklist import is_blacklisted
+
+oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+
+class VerifiedTokenCache:
+    """LRU of verified tokens and their claims"""
+
+    def __init__(self, max_size: int = 1024):
+        self.max_size = max_size
+        self._entries = OrderedDict()  # token -> (expires_at, claims)
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, token: str) -> Optional[dict]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        expires_at, claims = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._entries[token]
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(token)
+        self.stats["hits"] += 1
+        return claims
+
+    def put(self, token: str, claims: dict):
+        if self.max_size <= 0:
+            return
+        self._entries[token] = (claims.get("exp"), claims)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def discard(self, token: str):
+        self._entries.pop(token, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_metrics(self):
+        return {"entries": len(self._entries), "max_size": self.max_size, **self.stats}
+
+verified_token_cache = VerifiedTokenCache(max_size=settings.AUTH_TOKEN_CACHE_SIZE)
+register_metrics_source("verified_token_cache", verified_token_cache.get_metrics)
+
+def decode_token(token: str) -> dict:
+    """Verify a JWT and return its claims, using the verified-token LRU
+
+    Raises:
+        JWTError: if the token is invalid or expired
+    """
+    claims = verified_token_cache.get(token)
+    if claims is None:
+        claims = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        verified_token_cache.put(token, claims)
+    return claims
+
+def token_revocation_id(claims: dict) -> str:
+    """ID the token is revoked under (tokens issued before jti existed use sub)"""
+    return claims.get("jti") or claims.get("sub", "")
+
+def get_bearer_token(request: Request) -> Optional[str]:
+    """Extract the bearer token from the Authorization header"""
+    auth_header = request.headers.get("Authorization")
+    if auth_header and auth_header.startswith("Bearer "):
+        return auth_header.split(" ")[1]
+    return None
+
+def set_request_claims(request: Request, token: str, claims: dict):
+    """Store verified claims on the request for later dependencies"""
+    request.state.auth_token = token
+    request.state.auth_claims = claims
+
+async def get_token_claims(request: Request, token: str = Depends(oauth2_scheme)) -> dict:
+    """
+    Get the verified claims of the request's access token.
+
+    Reuses the claims stored by the middleware; if the middleware did not
+    run for this request, the token is verified and checked here instead.
+
+    Raises:
+        HTTPException: If the token is invalid, revoked or not an access token
+    """
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+    claims = getattr(request.state, "auth_claims", None)
+    if claims is None or getattr(request.state, "auth_token", None) != token:
+        try:
+            claims = decode_token(token)
+        except JWTError:
+            raise credentials_exception
+        if is_blacklisted(token_revocation_id(claims)):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Token has been revoked",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        set_request_claims(request, token, claims)
+
+    if claims.get("sub") is None:
+        raise credentials_exception
+    # Refresh tokens must not be usable as access tokens
+    if "type" in claims and claims.get("type") != "access":
+        raise credentials_exception
+
+    return claims
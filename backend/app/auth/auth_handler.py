@@ -1,17 +1,27 @@
 # app/auth/auth_handler.py
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from typing import Optional
 
 from ..models.user_model import UserInDB
-from .jwt_handler import verify_token
+from .auth_context import get_token_claims, oauth2_scheme
 from ..database.mongodb_connection import get_db
+from ..config import settings
+from ..utils.executor_pool import BoundedExecutor
+from ..utils.metrics import register_metrics_source
 
 # For password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
+
+# bcrypt takes a few hundred ms per call, so request handlers run it on
+# this pool instead of blocking the event loop
+password_hash_pool = BoundedExecutor(
+    "password-hash",
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_concurrency=settings.PASSWORD_HASH_MAX_CONCURRENCY
+)
+register_metrics_source("password_hashing", password_hash_pool.get_metrics)
 
 def get_password_hash(password: str) -> str:
     """Hash a password"""
@@ -21,6 +31,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash"""
     return pwd_context.verify(plain_password, hashed_password)
 
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the password hashing pool"""
+    return await password_hash_pool.run(get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against a hash on the password hashing pool"""
+    return await password_hash_pool.run(verify_password, plain_password, hashed_password)
+
 async def get_user(username: str):
     """Get a user by username"""
     try:
@@ -49,12 +67,12 @@ async def authenticate_user(username: str, password: str):
     
     user = UserInDB(**user_doc)
     
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password_async(password, user.hashed_password):
         return False
         
     return user
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(claims: dict = Depends(get_token_claims)):
     """Get the current authenticated user"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -63,9 +81,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     )
     
     try:
-        # Verify token and get user_id
-        token_data = verify_token(token, credentials_exception)
-        username = token_data["user_id"]
+        # The token was already verified by get_token_claims
+        username = claims["sub"]
         
         # Get user from database
         user = await get_user(username)
@@ -4,6 +4,7 @@ from typing import Optional
 from jose import jwt, JWTError
 from fastapi import HTTPException, status
 import secrets
+import uuid
 
 from ..config import settings
 from ..utils.timezone_utils import get_hk_time, HK_TIMEZONE
@@ -17,7 +18,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     else:
         expire = get_hk_time() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     
-    to_encode.update({"exp": expire, "type": "access"})
+    # jti identifies this token in the revocation store on logout
+    to_encode.update({"exp": expire, "type": "access", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     
     return encoded_jwt
@@ -29,7 +31,8 @@ def create_refresh_token(data: dict):
     # Refresh tokens typically last longer than access tokens
     expire = get_hk_time() + timedelta(days=7)  # 7 days
     
-    to_encode.update({"exp": expire, "type": "refresh"})
+    # A unique jti makes every rotated token distinct, even within one second
+    to_encode.update({"exp": expire, "type": "refresh", "jti": uuid.uuid4().hex})
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     
     return encoded_jwt
@@ -46,7 +49,7 @@ def verify_token(token: str, credentials_exception, token_type: str = "access"):
         if "type" in payload and payload.get("type") != token_type:
             raise credentials_exception
             
-        return {"user_id": username}
+        return {"user_id": username, "family_id": payload.get("fid")}
     except JWTError as e:
         print(f"JWT verification error: {str(e)}")
         raise credentials_exception
@@ -2,7 +2,7 @@
 from fastapi import Depends, HTTPException, status
 from ..database.mongodb_connection import get_db
 from ..auth.auth_handler import get_current_user
-from ..database.license_db import check_user_license
+from ..database.license_db import get_user_license_status
 
 async def verify_license(
     current_user = Depends(get_current_user),
@@ -30,7 +30,7 @@ async def verify_license(
             detail="Could not determine user ID from authentication token"
         )
     
-    result = await check_user_license(db, user_id)
+    result = await get_user_license_status(db, user_id)
     
     if not result["has_license"]:
         raise HTTPException(
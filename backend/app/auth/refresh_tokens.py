@@ -0,0 +1,118 @@
+# app/auth/refresh_tokens.py
+"""
+Refresh-token store.
+
+Refresh tokens are long random JWTs, so storing them with bcrypt buys no
+security and costs hundreds of ms per call. Instead the user document
+keeps an HMAC-SHA256 digest of the current refresh token together with
+its token family ID:
+
+    refresh_token: {
+        family_id: ID shared by every token rotated from one login
+        digest:    HMAC-SHA256 of the current refresh token
+        issued_at: When the current token was issued
+    }
+
+Each refresh rotates the token inside the same family. Presenting a token
+from the current family that is no longer the latest one means it was
+replayed (e.g. stolen and used by someone else first), so the whole
+family is revoked and the user has to log in again.
+"""
+import hashlib
+import hmac
+import uuid
+from typing import Optional
+
+from pymongo import ReturnDocument
+
+from ..config import settings
+from ..utils.timezone_utils import get_hk_time
+
+class RefreshTokenReuseError(Exception):
+    """Raised when a rotated-out refresh token is presented again"""
+
+def _hmac_key() -> bytes:
+    # Domain-separate the key so the digest can never be confused with a
+    # JWT signature made with the same secret
+    secret = settings.REFRESH_TOKEN_HMAC_KEY or settings.SECRET_KEY or ""
+    return hashlib.sha256(b"refresh-token-store:" + secret.encode()).digest()
+
+def hash_refresh_token(token: str) -> str:
+    """Return the HMAC-SHA256 digest of a refresh token"""
+    return hmac.new(_hmac_key(), token.encode(), hashlib.sha256).hexdigest()
+
+def verify_refresh_token_digest(token: str, digest: str) -> bool:
+    """Check a refresh token against a stored digest in constant time"""
+    if not digest or not isinstance(digest, str):
+        return False
+    return hmac.compare_digest(hash_refresh_token(token), digest)
+
+def new_token_family() -> str:
+    """Create a new refresh token family ID"""
+    return uuid.uuid4().hex
+
+def refresh_token_record(family_id: str, token: str, issued_at=None) -> dict:
+    """Build the refresh_token sub-document stored on the user"""
+    return {
+        "family_id": family_id,
+        "digest": hash_refresh_token(token),
+        "issued_at": issued_at or get_hk_time()
+    }
+
+async def store_refresh_token(db, username: str, family_id: str, token: str):
+    """Store the digest of a freshly issued refresh token on the user"""
+    await db.users.update_one(
+        {"username": username},
+        {"$set": {"refresh_token": refresh_token_record(family_id, token)}}
+    )
+
+async def rotate_refresh_token(db, username: str, family_id: Optional[str],
+                               presented_token: str, new_token: str) -> bool:
+    """
+    Replace the stored refresh token with a new one from the same family.
+
+    The swap is a single conditional update, so two concurrent refreshes
+    with the same token cannot both succeed.
+
+    Returns:
+        True if the presented token was the current one and has been rotated,
+        False if it does not belong to the user's current token family
+        (e.g. superseded by a newer login or already logged out).
+
+    Raises:
+        RefreshTokenReuseError: if the token belongs to the current family
+        but has already been rotated out. The family is revoked.
+    """
+    if not family_id:
+        return False
+
+    user_doc = await db.users.find_one_and_update(
+        {
+            "username": username,
+            "refresh_token.family_id": family_id,
+            "refresh_token.digest": hash_refresh_token(presented_token)
+        },
+        {"$set": {"refresh_token": refresh_token_record(family_id, new_token)}},
+        projection={"_id": 1},
+        return_document=ReturnDocument.AFTER
+    )
+    if user_doc:
+        return True
+
+    # The token did not match - find out whether its family is still live
+    result = await db.users.update_one(
+        {"username": username, "refresh_token.family_id": family_id},
+        {"$set": {"refresh_token": False}}
+    )
+    if result.modified_count:
+        raise RefreshTokenReuseError(
+            f"Refresh token reuse detected for user {username}; token family revoked"
+        )
+    return False
+
+async def revoke_refresh_tokens(db, username: str):
+    """Revoke the user's current refresh token family"""
+    await db.users.update_one(
+        {"username": username},
+        {"$unset": {"refresh_token": ""}}
+    )
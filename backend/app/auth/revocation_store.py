@@ -0,0 +1,340 @@
+# app/auth/revocation_store.py
+"""
+Pluggable storage backends for revoked (logged-out) tokens.
+
+- ExpiringBlacklist: in-process dict + expiry heap. Fast, but each worker
+  process has its own copy and everything is lost on restart.
+- SQLiteRevocationBackend: a WAL-mode SQLite file shared by every worker
+  on the host and persisted across restarts.
+
+The SQLite backend keeps a per-process bloom filter of revoked token IDs
+in front of an in-memory copy of the unexpired revocations, so contains()
+(run on every authenticated request) never touches the file: the common
+"not revoked" check is a bloom miss, and bloom hits (real revocations or
+rare false positives) are confirmed against the copy. Every revocation
+bumps a version counter in the database and is tagged with it, and sync()
+pulls rows newer than the last version this process has seen. That is
+how a logout on one worker reaches the others, within one
+TOKEN_REVOCATION_SYNC_INTERVAL.
+
+Only sync(), clear_expired() and add() read or write the file, and only
+sync() and clear_expired() rebuild the bloom filter; callers run them in
+a thread (the maintenance task, logout), never on the event loop.
+"""
+import hashlib
+import heapq
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Union
+
+logger = logging.getLogger(__name__)
+
+class RevocationBackend:
+    """Interface for revoked-token storage"""
+
+    def add(self, jti: str, expires_at: Union[datetime, int, float]):
+        """Revoke a token until it expires"""
+        raise NotImplementedError
+
+    def contains(self, jti: str) -> bool:
+        """Check if a token is revoked"""
+        raise NotImplementedError
+
+    def clear_expired(self) -> int:
+        """Remove expired tokens, returning how many were removed"""
+        raise NotImplementedError
+
+    def sync(self):
+        """Pick up revocations made by other processes"""
+
+    def close(self):
+        """Release any resources held by the backend"""
+
+    def get_metrics(self):
+        """Return backend counters"""
+        return {}
+
+def _to_timestamp(expires_at: Union[datetime, int, float]) -> float:
+    """Convert an expiry (datetime or epoch seconds) to epoch seconds"""
+    if isinstance(expires_at, datetime):
+        # Naive datetimes are treated as local time, aware ones are converted
+        return expires_at.timestamp()
+    return float(expires_at)
+
+class ExpiringBlacklist(RevocationBackend):
+    """In-process set of revoked token IDs that forget entries once they expire.
+
+    Entries live in a dict (jti -> expiry timestamp) for O(1) membership,
+    plus a min-heap ordered by expiry so expired entries are dropped in
+    O(log n) each without scanning everything. Past ``max_entries`` the
+    entries closest to expiry are evicted first, since those tokens would
+    stop working soonest anyway.
+    """
+
+    def __init__(self, max_entries: int = 1_000_000):
+        self.max_entries = max_entries
+        self._expiry = {}   # jti -> expiry timestamp
+        self._heap = []     # (expiry timestamp, jti), may hold stale entries
+        self.stats = {"added": 0, "expired": 0, "evicted": 0}
+
+    def __len__(self):
+        return len(self._expiry)
+
+    def add(self, jti: str, expires_at: Union[datetime, int, float]):
+        """Add a token to the blacklist until it expires"""
+        expires = _to_timestamp(expires_at)
+        if expires <= time.time():
+            return
+        self._expiry[jti] = expires
+        heapq.heappush(self._heap, (expires, jti))
+        self.stats["added"] += 1
+
+        if len(self._expiry) > self.max_entries:
+            self.clear_expired()
+            while len(self._expiry) > self.max_entries and self._heap:
+                self._pop_entry(evicted=True)
+
+        # Re-adding a token leaves its old heap entry behind; rebuild the
+        # heap if those stale entries start to dominate
+        if len(self._heap) > 2 * len(self._expiry) + 1024:
+            self._heap = [(expires, jti) for jti, expires in self._expiry.items()]
+            heapq.heapify(self._heap)
+
+    def contains(self, jti: str) -> bool:
+        """Check if a token is blacklisted"""
+        expires = self._expiry.get(jti)
+        return expires is not None and expires > time.time()
+
+    def _pop_entry(self, evicted: bool = False):
+        expires, jti = heapq.heappop(self._heap)
+        # Only drop the token if this heap entry is its current expiry
+        if self._expiry.get(jti) == expires:
+            del self._expiry[jti]
+            self.stats["evicted" if evicted else "expired"] += 1
+
+    def clear_expired(self) -> int:
+        """Remove expired tokens, returning how many were removed"""
+        now = time.time()
+        before = len(self._expiry)
+        while self._heap and self._heap[0][0] <= now:
+            self._pop_entry()
+        return before - len(self._expiry)
+
+    def clear(self):
+        """Remove all tokens"""
+        self._expiry.clear()
+        self._heap.clear()
+
+    def get_metrics(self):
+        """Return blacklist size and counters"""
+        return {
+            "backend": "memory",
+            "entries": len(self._expiry),
+            "heap_size": len(self._heap),
+            "max_entries": self.max_entries,
+            **self.stats
+        }
+
+class BloomFilter:
+    """Fixed-size bloom filter over strings"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.capacity = capacity
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+class SQLiteRevocationBackend(RevocationBackend):
+    """Revoked tokens in a SQLite file shared across worker processes"""
+
+    def __init__(self, db_path: str, sync_interval: float = 1.0,
+                 bloom_capacity: int = 1_000_000, bloom_error_rate: float = 0.001):
+        self.db_path = db_path
+        self.sync_interval = sync_interval
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self._lock = threading.Lock()
+        self._version = 0
+        self._epoch = None
+        self._last_sync = 0.0
+        self._revoked = {}   # jti -> expiry timestamp of unexpired revocations
+        self._rebuild_needed = False
+        self.stats = {
+            "added": 0,
+            "bloom_negative": 0,
+            "blacklist_lookups": 0,
+            "false_positives": 0,
+            "syncs": 0,
+            "rebuilds": 0,
+            "expired": 0
+        }
+
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=10, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS revoked_tokens (
+            jti TEXT PRIMARY KEY,
+            expires_at REAL NOT NULL,
+            version INTEGER NOT NULL
+        )
+        ''')
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_revoked_version ON revoked_tokens (version)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_revoked_expires ON revoked_tokens (expires_at)")
+        self._conn.execute('''
+        CREATE TABLE IF NOT EXISTS revocation_meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        )
+        ''')
+        self._conn.execute("INSERT OR IGNORE INTO revocation_meta (key, value) VALUES ('version', 0), ('epoch', 0)")
+        self._rebuild_bloom()
+
+    def _read_meta(self):
+        rows = dict(self._conn.execute("SELECT key, value FROM revocation_meta").fetchall())
+        return rows["version"], rows["epoch"]
+
+    def _rebuild_bloom(self):
+        """Reload the bloom filter and the revocation copy from every unexpired row"""
+        # contains() never takes the lock, so holding it for the whole
+        # rebuild only delays add(), which runs off the event loop
+        with self._lock:
+            version, epoch = self._read_meta()
+            rows = self._conn.execute(
+                "SELECT jti, expires_at FROM revoked_tokens WHERE expires_at > ?", (time.time(),)
+            ).fetchall()
+            bloom = BloomFilter(max(self.bloom_capacity, 2 * len(rows)), self.bloom_error_rate)
+            for jti, _ in rows:
+                bloom.add(jti)
+            self._bloom, self._revoked = bloom, dict(rows)
+            self._rebuild_needed = False
+            self._version = version
+            self._epoch = epoch
+            self._last_sync = time.monotonic()
+            self.stats["rebuilds"] += 1
+
+    def add(self, jti: str, expires_at: Union[datetime, int, float]):
+        expires = _to_timestamp(expires_at)
+        if expires <= time.time():
+            return
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("UPDATE revocation_meta SET value = value + 1 WHERE key = 'version'")
+                (version,) = self._conn.execute(
+                    "SELECT value FROM revocation_meta WHERE key = 'version'"
+                ).fetchone()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO revoked_tokens (jti, expires_at, version) VALUES (?, ?, ?)",
+                    (jti, expires, version)
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._revoked[jti] = expires
+            self._bloom.add(jti)
+            self.stats["added"] += 1
+            if self._bloom.count > self._bloom.capacity:
+                # Past capacity the false-positive rate climbs; the next
+                # sync grows the filter
+                self._rebuild_needed = True
+
+    def contains(self, jti: str) -> bool:
+        # Memory only: the bloom filter, then the copy of the revocations
+        if jti not in self._bloom:
+            self.stats["bloom_negative"] += 1
+            return False
+        self.stats["blacklist_lookups"] += 1
+        expires = self._revoked.get(jti)
+        if expires is None:
+            self.stats["false_positives"] += 1
+            return False
+        return expires > time.time()
+
+    def sync(self):
+        with self._lock:
+            version, epoch = self._read_meta()
+            if epoch != self._epoch or self._rebuild_needed:
+                rebuild = True
+            else:
+                rebuild = False
+                if version > self._version:
+                    rows = self._conn.execute(
+                        "SELECT jti, expires_at FROM revoked_tokens WHERE version > ?", (self._version,)
+                    ).fetchall()
+                    for jti, expires in rows:
+                        self._revoked[jti] = expires
+                        self._bloom.add(jti)
+                    self._version = version
+                self._last_sync = time.monotonic()
+                self.stats["syncs"] += 1
+        if rebuild:
+            self._rebuild_bloom()
+
+    def clear_expired(self) -> int:
+        with self._lock:
+            now = time.time()
+            removed = self._conn.execute(
+                "DELETE FROM revoked_tokens WHERE expires_at <= ?", (now,)
+            ).rowcount
+            self._revoked = {jti: expires for jti, expires in self._revoked.items() if expires > now}
+            self.stats["expired"] += removed
+            # Bloom filters cannot forget keys. Once a good share of them is
+            # gone, bump the epoch so every process rebuilds its filter
+            bump_epoch = removed and removed * 4 > self._bloom.count
+            if bump_epoch:
+                self._conn.execute("UPDATE revocation_meta SET value = value + 1 WHERE key = 'epoch'")
+        if bump_epoch:
+            self._rebuild_bloom()
+        return removed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get_metrics(self):
+        return {
+            "backend": "sqlite",
+            "version": self._version,
+            "blacklist_entries": len(self._revoked),
+            "bloom_entries": self._bloom.count,
+            "bloom_capacity": self._bloom.capacity,
+            **self.stats
+        }
+
+def create_revocation_backend(settings) -> RevocationBackend:
+    """Create the revocation backend selected by TOKEN_REVOCATION_BACKEND"""
+    backend = settings.TOKEN_REVOCATION_BACKEND.lower()
+    if backend == "memory":
+        return ExpiringBlacklist(max_entries=settings.TOKEN_BLACKLIST_MAX_ENTRIES)
+    if backend == "sqlite":
+        return SQLiteRevocationBackend(
+            settings.TOKEN_REVOCATION_DB_PATH,
+            sync_interval=settings.TOKEN_REVOCATION_SYNC_INTERVAL,
+            bloom_capacity=settings.TOKEN_REVOCATION_BLOOM_CAPACITY
+        )
+    raise ValueError(f"Unknown token revocation backend: {settings.TOKEN_REVOCATION_BACKEND}")
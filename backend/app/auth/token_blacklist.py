@@ -1,29 +1,88 @@
-# Simple in-memory token blacklist - in production, use Redis or a database
-from datetime import datetime, timedelta
-from datetime import timezone
-from ..utils.timezone_utils import get_hk_time, HK_TIMEZONE
+# Token blacklist for logged-out access tokens
+"""
+Thin wrapper around the configured revocation backend (see
+revocation_store.py). TOKEN_REVOCATION_BACKEND selects between the
+in-process "memory" blacklist and the "sqlite" store shared by every
+uvicorn worker on the host.
 
-# Store revoked tokens with their expiry times
-blacklisted_tokens = {}
+A background maintenance task syncs revocations made by other workers
+every TOKEN_REVOCATION_SYNC_INTERVAL seconds and drops expired tokens
+every TOKEN_BLACKLIST_CLEANUP_INTERVAL seconds. is_blacklisted() runs on
+every request and only checks memory; opening the backend, revoking a
+token and the maintenance work touch the database and run in a thread.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime
 
-def add_to_blacklist(jti: str, expires_at: datetime):
+from ..config import settings
+from ..utils.metrics import register_metrics_source
+from .revocation_store import ExpiringBlacklist, create_revocation_backend
+
+logger = logging.getLogger(__name__)
+
+_revocation_backend = None
+_maintenance_task = None
+
+def get_revocation_backend():
+    """Get or create the configured revocation backend"""
+    global _revocation_backend
+    if _revocation_backend is None:
+        _revocation_backend = create_revocation_backend(settings)
+    return _revocation_backend
+
+register_metrics_source("token_blacklist", lambda: get_revocation_backend().get_metrics())
+
+async def open_revocation_backend():
+    """Create the revocation backend (loading its revocations) off the event loop"""
+    return await asyncio.to_thread(get_revocation_backend)
+
+async def add_to_blacklist(jti: str, expires_at: datetime):
     """Add a token to the blacklist"""
-    blacklisted_tokens[jti] = expires_at
+    await asyncio.to_thread(get_revocation_backend().add, jti, expires_at)
 
 def is_blacklisted(jti: str) -> bool:
     """Check if a token is blacklisted"""
-    # First, clean up expired tokens
-    current_time = get_hk_time()
-    expired_tokens = [token for token, expires in blacklisted_tokens.items() if expires < current_time]
-    for token in expired_tokens:
-        blacklisted_tokens.pop(token, None)
-    
-    # Check if token is in blacklist
-    return jti in blacklisted_tokens
+    return get_revocation_backend().contains(jti)
 
 def clear_expired_tokens():
     """Remove expired tokens from blacklist"""
-    current_time = get_hk_time()
-    expired_tokens = [token for token, expires in blacklisted_tokens.items() if expires < current_time]
-    for token in expired_tokens:
-        blacklisted_tokens.pop(token, None)
\ No newline at end of file
+    return get_revocation_backend().clear_expired()
+
+async def _maintenance_loop(sync_interval: float, cleanup_interval: float):
+    last_cleanup = time.monotonic()
+    while True:
+        await asyncio.sleep(sync_interval)
+        try:
+            # Run in a thread: a bloom filter rebuild can take a while
+            backend = get_revocation_backend()
+            await asyncio.to_thread(backend.sync)
+            if time.monotonic() - last_cleanup >= cleanup_interval:
+                last_cleanup = time.monotonic()
+                removed = await asyncio.to_thread(backend.clear_expired)
+                if removed:
+                    logger.info(f"Removed {removed} expired tokens from blacklist")
+        except Exception as e:
+            logger.error(f"Token blacklist maintenance failed: {e}")
+
+def start_blacklist_cleanup(sync_interval: float = None, cleanup_interval: float = None):
+    """Start the background task that syncs and cleans up revoked tokens"""
+    global _maintenance_task
+    if _maintenance_task is None or _maintenance_task.done():
+        sync_interval = sync_interval or settings.TOKEN_REVOCATION_SYNC_INTERVAL
+        cleanup_interval = cleanup_interval or settings.TOKEN_BLACKLIST_CLEANUP_INTERVAL
+        _maintenance_task = asyncio.get_running_loop().create_task(
+            _maintenance_loop(min(sync_interval, cleanup_interval), cleanup_interval)
+        )
+
+async def stop_blacklist_cleanup():
+    """Stop the background maintenance task"""
+    global _maintenance_task
+    if _maintenance_task is not None:
+        _maintenance_task.cancel()
+        try:
+            await _maintenance_task
+        except asyncio.CancelledError:
+            pass
+        _maintenance_task = None
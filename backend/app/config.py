@@ -6,12 +6,51 @@ class Settings(BaseSettings):
     # MongoDB
     MONGODB_URL: str = os.getenv("MONGODB_URL")
     MONGODB_DB_NAME: str = os.getenv("MONGODB_DB_NAME", "language_tutoring_app")
+    MONGODB_MAX_POOL_SIZE: int = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+    MONGODB_MIN_POOL_SIZE: int = int(os.getenv("MONGODB_MIN_POOL_SIZE", "5"))
+    MONGODB_MAX_IDLE_TIME_MS: int = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "300000"))
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "10000"))
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+    MONGODB_CONNECT_TIMEOUT_MS: int = int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "10000"))
+    # Wire compression, in order of preference (unavailable libraries are skipped)
+    MONGODB_COMPRESSORS: str = os.getenv("MONGODB_COMPRESSORS", "zstd,snappy,zlib")
+    MONGODB_READ_PREFERENCE: str = os.getenv("MONGODB_READ_PREFERENCE", "primary")
+    # Connection manager: how long requests wait for a connection, health
+    # checks, reconnect backoff and the circuit breaker
+    MONGODB_READY_TIMEOUT: float = float(os.getenv("MONGODB_READY_TIMEOUT", "5"))
+    MONGODB_HEALTH_CHECK_INTERVAL: float = float(os.getenv("MONGODB_HEALTH_CHECK_INTERVAL", "10"))
+    MONGODB_RECONNECT_MAX_DELAY: float = float(os.getenv("MONGODB_RECONNECT_MAX_DELAY", "30"))
+    MONGODB_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("MONGODB_BREAKER_FAILURE_THRESHOLD", "3"))
+    MONGODB_BREAKER_RESET_TIMEOUT: float = float(os.getenv("MONGODB_BREAKER_RESET_TIMEOUT", "10"))
     
     # JWT
     SECRET_KEY: str = os.getenv("SECRET_KEY")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 
+    # Number of verified access tokens cached per process
+    AUTH_TOKEN_CACHE_SIZE: int = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "1024"))
+
+    # Key for refresh-token digests (falls back to SECRET_KEY)
+    REFRESH_TOKEN_HMAC_KEY: Optional[str] = os.getenv("REFRESH_TOKEN_HMAC_KEY")
+
+    # Token blacklist / revocation store (logged-out access tokens)
+    TOKEN_BLACKLIST_MAX_ENTRIES: int = int(os.getenv("TOKEN_BLACKLIST_MAX_ENTRIES", "1000000"))
+    TOKEN_BLACKLIST_CLEANUP_INTERVAL: int = int(os.getenv("TOKEN_BLACKLIST_CLEANUP_INTERVAL", "60"))
+    TOKEN_REVOCATION_BACKEND: str = os.getenv("TOKEN_REVOCATION_BACKEND", "sqlite")
+    TOKEN_REVOCATION_DB_PATH: str = os.getenv("TOKEN_REVOCATION_DB_PATH", "data/revoked_tokens.db")
+    TOKEN_REVOCATION_SYNC_INTERVAL: float = float(os.getenv("TOKEN_REVOCATION_SYNC_INTERVAL", "1"))
+    TOKEN_REVOCATION_BLOOM_CAPACITY: int = int(os.getenv("TOKEN_REVOCATION_BLOOM_CAPACITY", "1000000"))
+
+    # Per-process license status cache (seconds; 0 disables it)
+    LICENSE_CACHE_TTL: float = float(os.getenv("LICENSE_CACHE_TTL", "60"))
+    LICENSE_CACHE_NEGATIVE_TTL: float = float(os.getenv("LICENSE_CACHE_NEGATIVE_TTL", "5"))
+    LICENSE_CACHE_SIZE: int = int(os.getenv("LICENSE_CACHE_SIZE", "10000"))
+
+    # Password hashing worker pool (bcrypt runs off the event loop)
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+    PASSWORD_HASH_MAX_CONCURRENCY: int = int(os.getenv("PASSWORD_HASH_MAX_CONCURRENCY", "4"))
+
     # SQLite settings
     SQLITE_DB_PATH: str = os.getenv("SQLITE_DB_PATH", "data/word_storage.db")
     ENABLE_AUTO_SYNC: bool = os.getenv("ENABLE_AUTO_SYNC", "true").lower() == "true"
@@ -20,9 +59,61 @@ class Settings(BaseSettings):
     # Youdao API
     YOUDAO_APP_KEY: str = os.getenv("YOUDAO_APP_KEY")
     YOUDAO_APP_SECRET: str = os.getenv("YOUDAO_APP_SECRET")
+    YOUDAO_API_URL: str = os.getenv("YOUDAO_API_URL", "https://openapi.youdao.com/api")
+    YOUDAO_BATCH_API_URL: str = os.getenv("YOUDAO_BATCH_API_URL", "https://openapi.youdao.com/v2/api")
+    # Limits of one batch request, and batch requests sent at once per call
+    YOUDAO_BATCH_MAX_ITEMS: int = int(os.getenv("YOUDAO_BATCH_MAX_ITEMS", "50"))
+    YOUDAO_BATCH_MAX_CHARS: int = int(os.getenv("YOUDAO_BATCH_MAX_CHARS", "5000"))
+    TRANSLATION_BATCH_CONCURRENCY: int = int(os.getenv("TRANSLATION_BATCH_CONCURRENCY", "4"))
+    # Long texts are translated in chunks of whole sentences up to this many
+    # characters, this many chunks at once per request
+    TRANSLATION_CHUNK_CHARS: int = int(os.getenv("TRANSLATION_CHUNK_CHARS", "400"))
+    TRANSLATION_CHUNK_CONCURRENCY: int = int(os.getenv("TRANSLATION_CHUNK_CONCURRENCY", "4"))
+    # Youdao quota (token bucket per API key; waits in seconds) and circuit breaker
+    YOUDAO_QUOTA_PER_HOUR: float = float(os.getenv("YOUDAO_QUOTA_PER_HOUR", "100"))
+    YOUDAO_QUOTA_BURST: float = float(os.getenv("YOUDAO_QUOTA_BURST", "10"))
+    YOUDAO_QUOTA_MAX_WAIT: float = float(os.getenv("YOUDAO_QUOTA_MAX_WAIT", "2"))
+    YOUDAO_QUOTA_BULK_MAX_WAIT: float = float(os.getenv("YOUDAO_QUOTA_BULK_MAX_WAIT", "30"))
+    YOUDAO_QUOTA_INTERACTIVE_RESERVE: float = float(os.getenv("YOUDAO_QUOTA_INTERACTIVE_RESERVE", "2"))
+    # The quota is per API key: its bucket is kept in this SQLite file, shared
+    # by every worker on the host. Set it empty for a bucket per process,
+    # which lets N workers make N x YOUDAO_QUOTA_PER_HOUR calls
+    YOUDAO_QUOTA_DB_PATH: str = os.getenv("YOUDAO_QUOTA_DB_PATH", "data/youdao_quota.db")
+    YOUDAO_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("YOUDAO_BREAKER_FAILURE_THRESHOLD", "5"))
+    YOUDAO_BREAKER_RESET_TIMEOUT: float = float(os.getenv("YOUDAO_BREAKER_RESET_TIMEOUT", "30"))
+
+    # Translation cache (in-memory LRU + SQLite; TTL in seconds, 0 disables it)
+    TRANSLATION_CACHE_DB_PATH: str = os.getenv("TRANSLATION_CACHE_DB_PATH", "data/translation_cache.db")
+    TRANSLATION_CACHE_MEMORY_SIZE: int = int(os.getenv("TRANSLATION_CACHE_MEMORY_SIZE", "10000"))
+    TRANSLATION_CACHE_MAX_ENTRIES: int = int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "200000"))
+    TRANSLATION_CACHE_TTL: float = float(os.getenv("TRANSLATION_CACHE_TTL", "2592000"))
+    TRANSLATION_CACHE_WARM: bool = os.getenv("TRANSLATION_CACHE_WARM", "true").lower() == "true"
+
+    # Precomputed WordNet index, built in the background from the
+    # checksummed WordNet files in DICTIONARY_DATA_DIR if missing
+    DICTIONARY_DATA_DIR: str = os.getenv("DICTIONARY_DATA_DIR", "data/wordnet")
+    DICTIONARY_INDEX_PATH: str = os.getenv("DICTIONARY_INDEX_PATH", "data/dictionary_index.db")
+    DICTIONARY_INDEX_MEMORY_SIZE: int = int(os.getenv("DICTIONARY_INDEX_MEMORY_SIZE", "4096"))
+
+    # Shared HTTP client for external APIs (timeouts in seconds)
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+    HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))
+    HTTP_PER_HOST_LIMIT: int = int(os.getenv("HTTP_PER_HOST_LIMIT", "20"))
+    HTTP_CONNECT_TIMEOUT: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3"))
+    HTTP_READ_TIMEOUT: float = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+    HTTP_POOL_TIMEOUT: float = float(os.getenv("HTTP_POOL_TIMEOUT", "5"))
+    HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "true").lower() == "true"
 
     # Google Cloud Vision API credentials
     GOOGLE_APPLICATION_CREDENTIALS: str = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
+    # OCR worker pool (Vision calls and PDF parsing run off the event loop);
+    # past OCR_MAX_QUEUE waiting jobs new uploads are refused, and a job
+    # running longer than OCR_TIMEOUT seconds fails
+    OCR_WORKERS: int = int(os.getenv("OCR_WORKERS", "4"))
+    OCR_MAX_CONCURRENCY: int = int(os.getenv("OCR_MAX_CONCURRENCY", "4"))
+    OCR_MAX_QUEUE: int = int(os.getenv("OCR_MAX_QUEUE", "32"))
+    OCR_TIMEOUT: float = float(os.getenv("OCR_TIMEOUT", "30"))
 
     # Email settings
     SMTP_SERVER: str = os.getenv("SMTP_SERVER", "smtp.gmail.com")
@@ -31,6 +122,14 @@ class Settings(BaseSettings):
     EMAIL_USERNAME: Optional[str] = os.getenv("EMAIL_USERNAME")
     EMAIL_PASSWORD: Optional[str] = os.getenv("EMAIL_PASSWORD")
     EMAIL_USE_TLS: bool = os.getenv("EMAIL_USE_TLS", "true").lower() == "true"
+
+    # Email outbox (queued emails sent by a background worker)
+    EMAIL_OUTBOX_DB_PATH: str = os.getenv("EMAIL_OUTBOX_DB_PATH", "data/email_outbox.db")
+    EMAIL_OUTBOX_BATCH_SIZE: int = int(os.getenv("EMAIL_OUTBOX_BATCH_SIZE", "50"))
+    EMAIL_OUTBOX_MAX_ATTEMPTS: int = int(os.getenv("EMAIL_OUTBOX_MAX_ATTEMPTS", "5"))
+    EMAIL_OUTBOX_RETRY_BASE: float = float(os.getenv("EMAIL_OUTBOX_RETRY_BASE", "5"))
+    EMAIL_OUTBOX_POLL_INTERVAL: float = float(os.getenv("EMAIL_OUTBOX_POLL_INTERVAL", "2"))
+    SMTP_IDLE_TIMEOUT: float = float(os.getenv("SMTP_IDLE_TIMEOUT", "60"))
     
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -2,7 +2,8 @@
 Database initialization script
 Creates required collections and indices
 """
-from .mongodb_connection import get_db
+from .mongodb_connection import get_db, get_mongodb_client
+from .mongodb_utils.word import backfill_word_search_fields
 import logging
 
 # Set up logging
@@ -36,6 +37,22 @@ async def init_db():
         # Create indices for words collection if needed
         logger.info("Creating indices for words collection...")
         await db.words.create_index("user_id")
+        # Prefix search on word_lower, infix search on its trigrams
+        await db.words.create_index("word_lower")
+        await db.words.create_index("word_ngrams")
+        backfilled = await backfill_word_search_fields(await get_mongodb_client())
+        if backfilled:
+            logger.info(f"Added search fields to {backfilled} existing words")
+        
+        # Unique license keys let bulk generation insert without lookups
+        logger.info("Creating indices for licenses collection...")
+        await db.licenses.create_index("license_key", unique=True)
+        # Filters used by the admin license listing, paginated on _id
+        await db.licenses.create_index([("status", 1), ("_id", 1)])
+        await db.licenses.create_index([("created_by", 1), ("_id", 1)])
+        await db.licenses.create_index([("issued_date", 1), ("_id", 1)])
+        
+        await db.license_jobs.create_index("job_id", unique=True)
         
         logger.info("Database initialization complete!")
         return True
@@ -0,0 +1,78 @@
+# app/database/license_cache.py
+"""
+Per-user cache of license status for the license gate.
+
+verify_license runs on every protected request, and check_user_license
+needs a users lookup plus a licenses lookup each time. The result is
+kept here per user for a short TTL so the gate normally answers from
+memory.
+
+Stale-read semantics:
+  - The cache is per process. activate_license, revoke_license and
+    registration with a license key invalidate the entry on the worker
+    that handled the change, so that worker sees it immediately.
+  - Other uvicorn workers, and changes made directly in the database,
+    are only picked up when the cached entry expires: a revoked license
+    keeps working for at most LICENSE_CACHE_TTL seconds, and a newly
+    activated one can be refused for at most LICENSE_CACHE_NEGATIVE_TTL
+    seconds.
+  - Set LICENSE_CACHE_TTL to 0 to disable caching.
+"""
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from ..config import settings
+from ..utils.metrics import register_metrics_source
+
+class LicenseStatusCache:
+    """TTL cache of check_user_license results keyed by user ID"""
+
+    def __init__(self, ttl: float = 60, negative_ttl: float = 5, max_size: int = 10000):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+        self._entries = OrderedDict()  # user_id -> (expires_at, result)
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, user_id) -> Optional[dict]:
+        key = str(user_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return result
+
+    def put(self, user_id, result: dict):
+        ttl = self.ttl if result.get("has_license") else min(self.ttl, self.negative_ttl)
+        if ttl <= 0 or self.max_size <= 0:
+            return
+        key = str(user_id)
+        self._entries[key] = (time.monotonic() + ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id):
+        if user_id is not None and self._entries.pop(str(user_id), None) is not None:
+            self.stats["invalidations"] += 1
+
+    def clear(self):
+        self._entries.clear()
+
+    def get_metrics(self):
+        return {"entries": len(self._entries), "ttl": self.ttl, **self.stats}
+
+license_cache = LicenseStatusCache(
+    ttl=settings.LICENSE_CACHE_TTL,
+    negative_ttl=settings.LICENSE_CACHE_NEGATIVE_TTL,
+    max_size=settings.LICENSE_CACHE_SIZE
+)
+register_metrics_source("license_cache", license_cache.get_metrics)
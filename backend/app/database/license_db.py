@@ -1,8 +1,22 @@
 # app/database/license_db.py
+import asyncio
 from datetime import datetime
 from typing import List, Optional, Dict, Any
 from bson import ObjectId
+from pymongo.errors import BulkWriteError
 from ..models.license_model import LicenseStatus
+from .license_cache import license_cache
+
+# Largest batch create_bulk_licenses accepts
+MAX_BULK_LICENSES = 100_000
+# insert_many attempts before giving up on keys that keep colliding
+BULK_LICENSE_RETRIES = 5
+DUPLICATE_KEY_ERROR = 11000
+# Fields returned when listing licenses
+LICENSE_LIST_FIELDS = {
+    "license_key": 1, "status": 1, "issued_date": 1,
+    "user_id": 1, "activated_at": 1, "created_by": 1
+}
 
 async def create_license(db, admin_id=None):
     """Create a new license key"""
@@ -35,10 +49,91 @@ async def get_license_by_key(db, license_key):
     """Find a license by its key"""
     return await db.licenses.find_one({"license_key": license_key})
 
-async def get_all_licenses(db):
-    """Get all licenses"""
-    cursor = db.licenses.find()
-    return await cursor.to_list(length=100)
+def license_sort(issued_from=None, issued_to=None, **filters):
+    """Listing order: by issue date when a date range is given, else by _id
+    
+    A date range is served by the (issued_date, _id) index, which only
+    avoids an in-memory sort if the results are sorted on it as well.
+    """
+    if issued_from or issued_to:
+        return [("issued_date", 1), ("_id", 1)]
+    return [("_id", 1)]
+
+def license_cursor(license, by_date):
+    """Pagination cursor pointing just after `license`"""
+    if by_date:
+        return f"{license['issued_date'].isoformat()},{license['_id']}"
+    return str(license["_id"])
+
+def parse_license_cursor(cursor, by_date):
+    """Parse a license_cursor value into (issued_date or None, _id)
+    
+    Raises:
+        ValueError: if the cursor is malformed
+    """
+    issued_date = None
+    if by_date:
+        issued, _, cursor = cursor.partition(",")
+        issued_date = datetime.fromisoformat(issued)
+    if not ObjectId.is_valid(cursor):
+        raise ValueError("Invalid pagination cursor")
+    return issued_date, ObjectId(cursor)
+
+def build_license_query(status=None, created_by=None, issued_from=None, issued_to=None, after=None):
+    """Build the licenses filter for listing, keyset-paginated
+    
+    Args:
+        after: parse_license_cursor result for the last license of the
+            previous page
+    """
+    query = {}
+    if status:
+        query["status"] = status
+    if created_by:
+        query["created_by"] = created_by
+    if issued_from or issued_to:
+        query["issued_date"] = {}
+        if issued_from:
+            query["issued_date"]["$gte"] = issued_from
+        if issued_to:
+            query["issued_date"]["$lt"] = issued_to
+    if after:
+        after_date, after_id = after
+        if after_date is None:
+            query["_id"] = {"$gt": after_id}
+        else:
+            # Next in (issued_date, _id) order
+            query["$or"] = [
+                {"issued_date": {"$gt": after_date}},
+                {"issued_date": after_date, "_id": {"$gt": after_id}}
+            ]
+    return query
+
+async def get_all_licenses(db, limit=100, after=None, **filters):
+    """Get one page of licenses, in license_sort order
+    
+    Args:
+        db: Database handle
+        limit: Maximum number of licenses to return
+        after: parse_license_cursor result for the last license of the
+            previous page
+        **filters: status, created_by, issued_from, issued_to
+    """
+    cursor = db.licenses.find(
+        build_license_query(after=after, **filters),
+        projection=LICENSE_LIST_FIELDS
+    ).sort(license_sort(**filters)).limit(limit)
+    return await cursor.to_list(length=limit)
+
+async def iter_licenses(db, batch_size=1000, **filters):
+    """Yield every matching license in license_sort order, one cursor batch at a time"""
+    cursor = db.licenses.find(
+        build_license_query(**filters),
+        projection=LICENSE_LIST_FIELDS,
+        batch_size=batch_size
+    ).sort(license_sort(**filters))
+    async for license in cursor:
+        yield license
 
 async def activate_license(db, license_key, user_id):
     """Activate a license for a user"""
@@ -77,9 +172,88 @@ async def activate_license(db, license_key, user_id):
             }
         }
     )
+    license_cache.invalidate(user_id)
     
     return {"success": True, "message": "License activated successfully"}
 
+async def activate_license_batch(db, license_keys, user_id, invalid_entries=()):
+    """Activate the first usable license among many keys for a user
+    
+    All keys are resolved with one $in query. A user holds a single
+    license, so at most one key is claimed; the claim is conditional on
+    the key still being unused, so a concurrent activation of the same
+    key moves on to the next candidate.
+    
+    Returns:
+        Dict with success, the activated key (if any) and a per-key
+        report of {"license_key", "status"}, where status is one of
+        activated, already_activated, not_needed, in_use, revoked,
+        not_found or invalid_format
+    """
+    found = await db.licenses.find(
+        {"license_key": {"$in": list(license_keys)}},
+        projection={"license_key": 1, "status": 1, "user_id": 1}
+    ).to_list(length=None)
+    licenses = {license["license_key"]: license for license in found}
+    
+    statuses = {}
+    candidates = []
+    for license_key in license_keys:
+        license_data = licenses.get(license_key)
+        if not license_data:
+            statuses[license_key] = "not_found"
+        elif license_data.get("status") == LicenseStatus.REVOKED:
+            statuses[license_key] = "revoked"
+        elif license_data.get("user_id") == user_id:
+            statuses[license_key] = "already_activated"
+        elif license_data.get("user_id"):
+            statuses[license_key] = "in_use"
+        else:
+            candidates.append(license_key)
+    
+    activated = None
+    if "already_activated" not in statuses.values():
+        for license_key in candidates:
+            result = await db.licenses.update_one(
+                {"license_key": license_key, "user_id": None, "status": {"$ne": LicenseStatus.REVOKED}},
+                {
+                    "$set": {
+                        "user_id": user_id,
+                        "status": LicenseStatus.USED,
+                        "activated_at": datetime.now()
+                    }
+                }
+            )
+            if result.modified_count:
+                activated = license_key
+                break
+            statuses[license_key] = "in_use"
+    
+    if activated:
+        await db.users.update_one(
+            {"_id": ObjectId(user_id)},
+            {
+                "$set": {
+                    "has_valid_license": True,
+                    "license_key": activated
+                }
+            }
+        )
+        license_cache.invalidate(user_id)
+        statuses[activated] = "activated"
+    
+    results = [
+        {"license_key": license_key, "status": statuses.get(license_key, "not_needed")}
+        for license_key in license_keys
+    ]
+    results.extend({"license_key": entry, "status": "invalid_format"} for entry in invalid_entries)
+    
+    return {
+        "success": activated is not None or "already_activated" in statuses.values(),
+        "activated": activated,
+        "results": results
+    }
+
 async def revoke_license(db, license_key):
     """Revoke a license"""
     license_data = await get_license_by_key(db, license_key)
@@ -102,6 +276,7 @@ async def revoke_license(db, license_key):
             {"_id": ObjectId(license_data["user_id"])},
             {"$set": {"has_valid_license": False}}
         )
+        license_cache.invalidate(license_data["user_id"])
     
     return {"success": True, "message": "License revoked successfully"}
 
@@ -133,18 +308,79 @@ async def check_user_license(db, user_id):
         "activated_at": license_data.get("activated_at")
     }
 
+async def get_user_license_status(db, user_id):
+    """Check if a user has a valid license, using the license status cache
+    
+    May return a result up to LICENSE_CACHE_TTL seconds old; see
+    license_cache.py for when changes become visible.
+    """
+    result = license_cache.get(user_id)
+    if result is None:
+        result = await check_user_license(db, user_id)
+        license_cache.put(user_id, result)
+    return result
+
 async def create_bulk_licenses(db, count, admin_id=None):
-    """Create multiple license keys at once"""
-    if count <= 0 or count > 100:
-        return {"success": False, "message": "Count must be between 1 and 100"}
+    """Create multiple license keys at once
+    
+    Keys are generated distinct in memory (in a thread: 100k keys take
+    about a second) and written with one unordered insert_many. The unique
+    index on license_key rejects any key that already exists; only those
+    keys are regenerated and retried.
+    
+    Returns success False with a message if count is out of range, or if
+    some keys still collided after BULK_LICENSE_RETRIES attempts; in that
+    case licenses holds the keys that were created, count how many, and
+    requested how many were asked for.
+    """
+    from ..utils.license_utils import generate_license_keys
+    
+    if count <= 0 or count > MAX_BULK_LICENSES:
+        return {"success": False, "message": f"Count must be between 1 and {MAX_BULK_LICENSES}"}
     
     licenses = []
-    for _ in range(count):
+    issued_date = datetime.now()
+    pending = await asyncio.to_thread(generate_license_keys, count)
+    
+    for _ in range(BULK_LICENSE_RETRIES):
+        documents = [
+            {
+                "license_key": license_key,
+                "status": "active",
+                "issued_date": issued_date,
+                "user_id": None,
+                "activated_at": None,
+                "created_by": admin_id
+            }
+            for license_key in pending
+        ]
+        
         try:
-            license_key, _ = await create_license(db, admin_id)
-            licenses.append(license_key)
-        except Exception as e:
-            print(f"Error generating license in bulk: {str(e)}")
-            # Continue with the next one
+            await db.licenses.insert_many(documents, ordered=False)
+            licenses.extend(pending)
+            pending = []
+            break
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            collided = {
+                documents[err["index"]]["license_key"]
+                for err in errors if err.get("code") == DUPLICATE_KEY_ERROR
+            }
+            if len(collided) != len(errors):
+                print(f"Error generating licenses in bulk: {e.details}")
+                raise
+            licenses.extend(key for key in pending if key not in collided)
+            # Regenerate only the keys that already existed
+            pending = await asyncio.to_thread(generate_license_keys, len(collided), exclude=licenses)
+    
+    if pending:
+        print(f"Could not generate {len(pending)} unique license keys after {BULK_LICENSE_RETRIES} attempts")
+        return {
+            "success": False,
+            "message": f"Created only {len(licenses)} of {count} license keys",
+            "licenses": licenses,
+            "count": len(licenses),
+            "requested": count
+        }
     
-    return {"success": True, "licenses": licenses, "count": len(licenses)}
\ No newline at end of file
+    return {"success": True, "licenses": licenses, "count": len(licenses), "requested": count}
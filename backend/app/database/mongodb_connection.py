@@ -1,9 +1,25 @@
 """
 MongoDB connection utilities for the language tutoring API.
 This module integrates the MongoDBClient from mongodb_utils.
+
+MongoConnectionManager owns the one MongoDBClient of the app. A
+background task connects it, pings it every
+MONGODB_HEALTH_CHECK_INTERVAL seconds and keeps retrying with backoff
+while MongoDB is unreachable; the client object itself is never
+replaced, since the driver reconnects its pool on its own.
+
+Requests get the client through get_mongodb_client()/get_db(), which
+wait on a single shared readiness future instead of connecting
+themselves. While MongoDB is down a circuit breaker makes them fail fast
+with MongoUnavailableError (mapped to 503 in main.py); routes that only
+use SQLite never touch the manager and keep working. Network errors seen
+by the driver reach the breaker through the client's failure monitor,
+whatever the route does with the exception afterwards.
 """
 import os
 import sys
+import asyncio
+import logging
 from pathlib import Path
 
 # Add the root directory to the Python path
@@ -11,41 +27,223 @@ ROOT_DIR = Path(__file__).resolve().parent.parent.parent.parent
 sys.path.append(str(ROOT_DIR))
 
 from .mongodb_utils.client import MongoDBClient
+from .mongodb_utils.pool_metrics import pool_metrics
+from .mongodb_utils.failure_monitor import failure_monitor
 from ..config import settings
+from ..utils.circuit_breaker import CircuitBreaker
+from ..utils.metrics import register_metrics_source
+
+logger = logging.getLogger(__name__)
+
+class MongoUnavailableError(Exception):
+    """MongoDB is not reachable right now"""
+
+    def __init__(self, message="Database temporarily unavailable", retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class MongoConnectionManager:
+    """Connects the shared client and tracks whether MongoDB is reachable"""
+
+    def __init__(
+        self,
+        client_factory=MongoDBClient,
+        ready_timeout: float = 5,
+        health_check_interval: float = 10,
+        reconnect_max_delay: float = 30,
+        breaker: CircuitBreaker = None,
+    ):
+        self.client_factory = client_factory
+        self.ready_timeout = ready_timeout
+        self.health_check_interval = health_check_interval
+        self.reconnect_max_delay = reconnect_max_delay
+        self.breaker = breaker or CircuitBreaker("mongodb", failure_threshold=3, reset_timeout=10)
+        self.client = None
+        self.stats = {"connects": 0, "connect_failures": 0, "disconnects": 0}
+        self._ready = None
+        self._wake = None
+        self._task = None
+        self._loop = None
+        self._ready_callbacks = []
+        self._callbacks_run = False
+
+    def _ready_future(self) -> asyncio.Future:
+        if self._ready is None or self._ready.get_loop() is not asyncio.get_running_loop():
+            self._ready = asyncio.get_running_loop().create_future()
+        return self._ready
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready is not None and self._ready.done() and not self._ready.cancelled()
+
+    def on_ready(self, callback):
+        """Run an async callback once, after the first successful connection"""
+        self._ready_callbacks.append(callback)
+
+    def start(self):
+        """Start connecting in the background"""
+        if self.client is None:
+            self.client = self.client_factory()
+        if self._task is None or self._task.done():
+            self._ready_future()
+            self._wake = asyncio.Event()
+            self._loop = asyncio.get_running_loop()
+            self._task = self._loop.create_task(self._run())
+            failure_monitor.subscribe(self._driver_failure)
+
+    async def stop(self):
+        """Stop the background task and close the client"""
+        failure_monitor.unsubscribe(self._driver_failure)
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.client is not None:
+            await self.client.close_async()
+            self.client = None
+        self._ready = None
+
+    async def wait_ready(self, timeout: float = None) -> MongoDBClient:
+        """Get the connected client, waiting for it if a connection is in progress
+
+        Raises:
+            MongoUnavailableError: if the circuit is open or MongoDB does
+                not become reachable within the timeout
+        """
+        if not self.breaker.allow_request():
+            raise MongoUnavailableError(retry_after=self.breaker.retry_after())
+        if self.is_ready:
+            return self.client
 
-# Global client instance
-mongodb_client = None
-db = None
+        self.start()
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(self._ready_future()),
+                timeout=self.ready_timeout if timeout is None else timeout
+            )
+        except asyncio.TimeoutError:
+            raise MongoUnavailableError(retry_after=self.breaker.retry_after())
+        return self.client
+
+    def report_failure(self, error: Exception = None):
+        """Record a failed MongoDB operation and re-check the connection now"""
+        self.breaker.record_failure()
+        if self._wake is not None:
+            self._wake.set()
+
+    def _driver_failure(self, error):
+        # Called on a driver thread; the breaker and wake event belong to the loop
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._report_driver_failure, error)
+        except RuntimeError:
+            pass
+
+    def _report_driver_failure(self, error):
+        # While disconnected the reconnect loop already knows, and waking it
+        # on every failed heartbeat would skip its backoff
+        if self.is_ready:
+            self.report_failure(error)
+
+    def _mark_ready(self):
+        future = self._ready_future()
+        if not future.done():
+            future.set_result(True)
+
+    def _mark_unavailable(self):
+        if self.is_ready:
+            self.stats["disconnects"] += 1
+            self._ready = asyncio.get_running_loop().create_future()
+
+    async def _run_ready_callbacks(self):
+        if self._callbacks_run:
+            return
+        self._callbacks_run = True
+        for callback in self._ready_callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                logger.error(f"MongoDB on-ready callback failed: {e}")
+
+    async def _run(self):
+        delay = 0.5
+        while True:
+            try:
+                was_ready = self.is_ready
+                await self.client.connect_async()
+                self.breaker.record_success()
+                if not was_ready:
+                    self.stats["connects"] += 1
+                    logger.info("MongoDB is reachable")
+                self._mark_ready()
+                await self._run_ready_callbacks()
+                delay = 0.5
+                sleep_for = self.health_check_interval
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats["connect_failures"] += 1
+                logger.warning(f"MongoDB unreachable, retrying in {delay:.1f}s: {e}")
+                self.breaker.trip()
+                self._mark_unavailable()
+                sleep_for = delay
+                delay = min(delay * 2, self.reconnect_max_delay)
+
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=sleep_for)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    def get_metrics(self):
+        return {
+            "ready": self.is_ready,
+            **self.stats,
+            "circuit": self.breaker.get_metrics(),
+            "driver_failures": failure_monitor.get_metrics(),
+        }
+
+connection_manager = MongoConnectionManager(
+    ready_timeout=settings.MONGODB_READY_TIMEOUT,
+    health_check_interval=settings.MONGODB_HEALTH_CHECK_INTERVAL,
+    reconnect_max_delay=settings.MONGODB_RECONNECT_MAX_DELAY,
+    breaker=CircuitBreaker(
+        "mongodb",
+        failure_threshold=settings.MONGODB_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=settings.MONGODB_BREAKER_RESET_TIMEOUT
+    )
+)
+
+register_metrics_source("mongodb_pool", pool_metrics.get_metrics)
+register_metrics_source("mongodb_connection", connection_manager.get_metrics)
 
 async def get_mongodb_client():
-    """Get or create the MongoDB client"""
-    global mongodb_client
-    if mongodb_client is None:
-        mongodb_client = MongoDBClient()
-        await mongodb_client.connect_async()
-    return mongodb_client
+    """Get the shared MongoDB client once it is connected"""
+    return await connection_manager.wait_ready()
 
 async def get_db():
     """Get the database instance"""
     client = await get_mongodb_client()
     return client.async_db
 
-async def connect_to_mongodb():
-    """Connect to MongoDB Atlas"""
-    global mongodb_client, db
-    try:
-        mongodb_client = MongoDBClient()
-        await mongodb_client.connect_async()
-        db = mongodb_client.async_db
-        print("Successfully connected to MongoDB using integrated client!")
-        return db
-    except Exception as e:
-        print(f"MongoDB connection error: {e}")
-        raise e
+async def connect_to_mongodb(timeout: float = None):
+    """Start the connection manager and wait for the first connection
+
+    Raises:
+        MongoUnavailableError: if MongoDB is not reachable in time; the
+            manager keeps reconnecting in the background
+    """
+    connection_manager.start()
+    client = await connection_manager.wait_ready(timeout)
+    print("Successfully connected to MongoDB using integrated client!")
+    return client.async_db
 
 async def close_mongodb_connection():
     """Close MongoDB connection"""
-    global mongodb_client
-    if mongodb_client:
-        await mongodb_client.close_async()
-        print("MongoDB connection closed") 
\ No newline at end of file
+    await connection_manager.stop()
+    print("MongoDB connection closed")
@@ -4,13 +4,13 @@
 from .client import MongoDBClient
 
 # Import functions from user module
-from .user import add_user, get_user, update_user, delete_user, update_last_login
+from .user import add_user, get_user, update_user, delete_user, update_last_login, record_login
 
 # Import functions from word module
-from .word import add_word, find_word, update_word, delete_word
+from .word import add_word, find_word, update_word, delete_word, search_words, backfill_word_search_fields
 
 # Import functions from usage_log module
-from .usage_log import add_event
+from .usage_log import add_event, schedule_event
 
 # Import functions from word_operation module
 from .word_operations import log_word_operation
@@ -18,8 +18,8 @@ from .word_operations import log_word_operation
 # Export publicly available components
 __all__ = [
     'MongoDBClient',
-    'add_user', 'get_user', 'update_user', 'delete_user', 'update_last_login',
-    'add_word', 'find_word', 'update_word', 'delete_word',
-    'add_event',
+    'add_user', 'get_user', 'update_user', 'delete_user', 'update_last_login', 'record_login',
+    'add_word', 'find_word', 'update_word', 'delete_word', 'search_words', 'backfill_word_search_fields',
+    'add_event', 'schedule_event',
     'log_word_operation'
 ]
\ No newline at end of file
@@ -5,10 +5,28 @@ from motor.motor_asyncio import AsyncIOMotorClient
 import asyncio
 import os
 from dotenv import load_dotenv
+from ...config import settings
+from .pool_metrics import pool_metrics
+from .failure_monitor import failure_monitor
 
 # Load environment variables from .env file
 load_dotenv()
 
+def mongo_client_options():
+    """Pool, timeout, compression and read preference options for MongoClient"""
+    return {
+        "server_api": ServerApi('1'),
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGODB_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGODB_CONNECT_TIMEOUT_MS,
+        "compressors": settings.MONGODB_COMPRESSORS,
+        "readPreference": settings.MONGODB_READ_PREFERENCE,
+        "event_listeners": [pool_metrics, *failure_monitor.listeners],
+    }
+
 class MongoDBClient:
     """Main client class for MongoDB connections"""
     
@@ -27,7 +45,7 @@ class MongoDBClient:
     def connect(self):
         """Connect to MongoDB database (synchronous)"""
         try:
-            self.client = MongoClient(self.uri, server_api=ServerApi('1'))
+            self.client = MongoClient(self.uri, **mongo_client_options())
             self.client.admin.command('ping')
             print("Successfully connected to MongoDB!")
             self.db = self.client[self.db_name]
@@ -36,13 +54,17 @@ class MongoDBClient:
             raise ConnectionError(f"Failed to connect to MongoDB: {e}")
     
     async def connect_async(self):
-        """Connect to MongoDB database (asynchronous)"""
+        """Connect to MongoDB database (asynchronous)
+        
+        The Motor client is created once; later calls only check that the
+        server answers a ping.
+        """
         try:
-            self.async_client = AsyncIOMotorClient(self.uri, server_api=ServerApi('1'))
-            self.async_db = self.async_client[self.db_name]
+            if self.async_client is None:
+                self.async_client = AsyncIOMotorClient(self.uri, **mongo_client_options())
+                self.async_db = self.async_client[self.db_name]
             # Test connection
             await self.async_db.command("ping")
-            print("Successfully connected to MongoDB asynchronously!")
             return True
         except Exception as e:
             raise ConnectionError(f"Failed to connect to MongoDB asynchronously: {e}")
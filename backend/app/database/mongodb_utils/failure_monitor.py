@@ -0,0 +1,134 @@
+# mongodb_utils/failure_monitor.py
+"""
+Network failure reporting for the shared MongoDB client.
+
+FailureMonitor is registered on the client next to the pool metrics
+listener, so every MongoDB call made through it is covered no matter how
+the calling route handles the exception afterwards. Network errors on a
+command, connections that fail to open and failed server heartbeats are
+passed to the subscribed callbacks; server errors such as duplicate keys
+are not, since they say nothing about whether MongoDB is reachable.
+
+Listeners run on driver threads, so subscribers must hand the failure
+over to their own event loop themselves.
+"""
+import logging
+import threading
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Exception types pymongo reports in CommandFailedEvent.failure["errtype"]
+# when a command failed because the connection did
+NETWORK_ERROR_TYPES = {
+    "AutoReconnect",
+    "ConnectionFailure",
+    "NetworkTimeout",
+    "NotPrimaryError",
+    "ServerSelectionTimeoutError",
+}
+
+class _HeartbeatFailures(monitoring.ServerHeartbeatListener):
+    """Heartbeat half of FailureMonitor; its method names clash with CommandListener's"""
+
+    def __init__(self, monitor):
+        self.monitor = monitor
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        self.monitor._report("heartbeat_failures", event.reply)
+
+class FailureMonitor(monitoring.CommandListener, monitoring.ConnectionPoolListener):
+    """Passes MongoDB network failures to subscribed callbacks"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callbacks = []
+        self.counters = {"command_failures": 0, "connection_failures": 0, "heartbeat_failures": 0}
+        self.heartbeats = _HeartbeatFailures(self)
+
+    @property
+    def listeners(self):
+        """Both listener objects, for MongoClient's event_listeners"""
+        return [self, self.heartbeats]
+
+    def subscribe(self, callback):
+        """Call `callback(error)` from a driver thread on every network failure"""
+        with self._lock:
+            if callback not in self._callbacks:
+                self._callbacks.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def _report(self, counter, error):
+        with self._lock:
+            self.counters[counter] += 1
+            callbacks = list(self._callbacks)
+        for callback in callbacks:
+            try:
+                callback(error)
+            except Exception as e:
+                logger.error(f"MongoDB failure callback failed: {e}")
+
+    # CommandListener
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        failure = event.failure if isinstance(event.failure, dict) else {}
+        if failure.get("errtype") in NETWORK_ERROR_TYPES:
+            self._report("command_failures", failure.get("errmsg"))
+
+    # ConnectionPoolListener
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pass
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        if event.reason == monitoring.ConnectionCheckOutFailedReason.CONN_ERROR:
+            self._report("connection_failures", "connection check out failed")
+
+    def connection_checked_out(self, event):
+        pass
+
+    def connection_checked_in(self, event):
+        pass
+
+    def get_metrics(self):
+        with self._lock:
+            return dict(self.counters)
+
+# Shared by every client created through MongoDBClient
+failure_monitor = FailureMonitor()
@@ -0,0 +1,109 @@
+# mongodb_utils/pool_metrics.py
+"""
+Connection pool metrics for the shared MongoDB client.
+
+PoolMetricsListener is registered on the client as a pymongo
+ConnectionPoolListener. It counts connection lifecycle events and
+measures how long operations wait to check a connection out of the pool,
+which is the first sign that maxPoolSize is too small.
+"""
+import threading
+import time
+
+from pymongo import monitoring
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Counts pool events and times connection checkouts"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Checkout start and finish happen on the same thread
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {
+                "pools_created": 0,
+                "pools_cleared": 0,
+                "connections_created": 0,
+                "connections_closed": 0,
+                "checkouts": 0,
+                "checkout_failures": 0,
+                "checkout_timeouts": 0,
+            }
+            self.in_use = 0
+            self.open = 0
+            self.wait_total = 0.0
+            self.wait_max = 0.0
+
+    def _count(self, name):
+        with self._lock:
+            self.counters[name] += 1
+
+    def _wait_time(self):
+        started = getattr(self._local, "checkout_started", None)
+        self._local.checkout_started = None
+        return time.perf_counter() - started if started is not None else 0.0
+
+    def pool_created(self, event):
+        self._count("pools_created")
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._count("pools_cleared")
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.counters["connections_created"] += 1
+            self.open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.counters["connections_closed"] += 1
+            self.open = max(0, self.open - 1)
+
+    def connection_check_out_started(self, event):
+        self._local.checkout_started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        waited = self._wait_time()
+        with self._lock:
+            self.counters["checkout_failures"] += 1
+            if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+                self.counters["checkout_timeouts"] += 1
+            self.wait_max = max(self.wait_max, waited)
+
+    def connection_checked_out(self, event):
+        waited = self._wait_time()
+        with self._lock:
+            self.counters["checkouts"] += 1
+            self.in_use += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use = max(0, self.in_use - 1)
+
+    def get_metrics(self):
+        with self._lock:
+            checkouts = self.counters["checkouts"]
+            return {
+                **self.counters,
+                "connections_open": self.open,
+                "connections_in_use": self.in_use,
+                "avg_checkout_wait_ms": round(self.wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+                "max_checkout_wait_ms": round(self.wait_max * 1000, 3),
+            }
+
+# Shared by every client created through MongoDBClient
+pool_metrics = PoolMetricsListener()
@@ -7,6 +7,14 @@ Attributes in collection 'event_logs':
     event_type: Type of event (e.g., "register", "login")
     event_time: Timestamp of when the event occurred
 """
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Strong references to in-flight background event writes, so they are
+# not garbage collected before they finish
+_pending_events = set()
 
 async def add_event(client, userid, event_type, event_time) -> int:
     """
@@ -21,10 +29,6 @@ async def add_event(client, userid, event_type, event_time) -> int:
     Returns:
         wordid: The ID of the newly created event
     """
-    # Ensure client is connected asynchronously
-    if client.async_db is None:
-        await client.connect_async()
-        
     collection = client.async_db['usage_logs']
             
     # Find the maximum event ID
@@ -45,3 +49,27 @@ async def add_event(client, userid, event_type, event_time) -> int:
     result = await collection.insert_one(document)
     print(f"Event added. Inserted document ID: {result.inserted_id}")
     return eventid
+
+def schedule_event(client, userid, event_type, event_time):
+    """
+    Write a usage event in the background without awaiting it
+    
+    Args:
+        client: MongoDBClient instance
+        userid: id of the user carrying out the event
+        event_type: Type of event (e.g., "register", "login")
+        event_time: Timestamp of when the event occurred
+        
+    Returns:
+        The asyncio task writing the event
+    """
+    async def write_event():
+        try:
+            await add_event(client, userid, event_type, event_time)
+        except Exception as e:
+            logger.error(f"Failed to log {event_type} event for user {userid}: {e}")
+    
+    task = asyncio.get_running_loop().create_task(write_event())
+    _pending_events.add(task)
+    task.add_done_callback(_pending_events.discard)
+    return task
@@ -1,6 +1,7 @@
 # mongodb_utils/user.py
 import datetime
 import time
+from pymongo import ReturnDocument
 
 """
 Attributes in collection 'user':
@@ -11,6 +12,7 @@ Attributes in collection 'user':
     is_active: Boolean indicating if user is active
     created_at: Timestamp of when the user was created
     last_login: Timestamp of last login
+    refresh_token: Digest and family of the current refresh token
 """
 
 async def add_user(client, document: dict) -> str:
@@ -24,10 +26,6 @@ async def add_user(client, document: dict) -> str:
     Returns:
         userid: The ID of the newly created user (string representation of MongoDB _id)
     """
-    # Ensure client is connected asynchronously
-    if client.async_db is None:
-        await client.connect_async()
-        
     collection = client.async_db['users']
     
     try:
@@ -91,10 +89,6 @@ async def get_user(client, username=None, userid=None, email=None):
     Returns:
         A user document or None if not found
     """
-    # Ensure client is connected asynchronously
-    if client.async_db is None:
-        await client.connect_async()
-        
     collection = client.async_db['users']
     
     try:
@@ -129,10 +123,6 @@ async def update_user(client, userid, update_data):
     Returns:
         Boolean indicating success
     """
-    # Ensure client is connected asynchronously
-    if client.async_db is None:
-        await client.connect_async()
-        
     collection = client.async_db['users']
     
     try:
@@ -164,10 +154,6 @@ async def delete_user(client, username=None, userid=None, email=None):
     Returns:
         Boolean indicating if the user was deleted
     """
-    # Ensure client is connected asynchronously
-    if client.async_db is None:
-        await client.connect_async()
-        
     collection = client.async_db['users']
     
     try:
@@ -215,4 +201,33 @@ async def update_last_login(client, userid):
         })
     except Exception as e:
         print(f"Error updating last login:", e)
-        raise e
\ No newline at end of file
+        raise e
+
+async def record_login(client, username, login_time, refresh_token_record):
+    """
+    Record a successful login in a single round trip
+    
+    Sets last_login and the refresh token record with one
+    find_one_and_update and returns the user's ID fields.
+    
+    Args:
+        client: MongoDBClient instance
+        username: Username of the user logging in
+        login_time: Timestamp of the login
+        refresh_token_record: Refresh token sub-document to store
+        
+    Returns:
+        Document with userid and _id, or None if the user does not exist
+    """
+    collection = client.async_db['users']
+    
+    try:
+        return await collection.find_one_and_update(
+            {"username": username},
+            {"$set": {"last_login": login_time, "refresh_token": refresh_token_record}},
+            projection={"userid": 1},
+            return_document=ReturnDocument.AFTER
+        )
+    except Exception as e:
+        print(f"Error recording login:", e)
+        raise e
@@ -1,7 +1,10 @@
 # mongodb_utils/word.py
 import datetime
+import re
 import time
 
+from pymongo import UpdateOne
+
 """
 Attributes in collection 'words':
     wordid: ID of the word
@@ -10,8 +13,109 @@ Attributes in collection 'words':
     en_meaning: English meaning/definition
     part_of_speech: List of parts of speech (e.g., ["noun", "verb"])
     wordtime: Timestamp of when the word was added
+    word_lower: Lowercased word, indexed for prefix search
+    word_ngrams: Distinct trigrams of word_lower, indexed for infix search
 """
 
+SEARCH_NGRAM_SIZE = 3
+DEFAULT_SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 500
+
+def normalize_word(word: str) -> str:
+    """Form of a word stored in word_lower and used for searching"""
+    return word.strip().lower()
+
+def word_ngrams(word: str, size: int = SEARCH_NGRAM_SIZE) -> list:
+    """Distinct n-grams of the normalized word (the whole word if it is shorter)"""
+    text = normalize_word(word)
+    if len(text) <= size:
+        return [text] if text else []
+    return sorted({text[i:i + size] for i in range(len(text) - size + 1)})
+
+def word_search_fields(word: str) -> dict:
+    """Derived fields stored next to `word` so searches can use indexes"""
+    return {"word_lower": normalize_word(word), "word_ngrams": word_ngrams(word)}
+
+def build_word_search_query(query: str, mode: str = "infix") -> dict:
+    """
+    Build an index-friendly filter for searching words
+    
+    User input is escaped, so regex metacharacters match literally.
+    "prefix" is an anchored, case-sensitive regex on word_lower, which
+    MongoDB turns into an index range scan. "infix" narrows the candidates
+    with the trigram index first and only then checks the substring;
+    queries shorter than a trigram fall back to prefix search.
+    
+    Args:
+        query: Text to search for
+        mode: "prefix" or "infix"
+        
+    Returns:
+        MongoDB filter for the words collection
+    """
+    text = normalize_word(query)
+    if mode not in ("prefix", "infix"):
+        raise ValueError(f"Unknown search mode: {mode}")
+    if mode == "prefix" or len(text) < SEARCH_NGRAM_SIZE:
+        return {"word_lower": {"$regex": f"^{re.escape(text)}"}}
+    return {
+        "word_ngrams": {"$all": word_ngrams(text)},
+        "word_lower": {"$regex": re.escape(text)},
+    }
+
+async def search_words(client, query, mode="infix", limit=DEFAULT_SEARCH_LIMIT):
+    """
+    Search words by prefix or substring, case-insensitively
+    
+    Args:
+        client: MongoDBClient instance
+        query: Text to search for
+        mode: "prefix" or "infix" (substring anywhere in the word)
+        limit: Maximum number of results, capped at MAX_SEARCH_LIMIT
+        
+    Returns:
+        List of word documents ordered by word_lower
+    """
+    collection = client.async_db['words']
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+    
+    try:
+        cursor = collection.find(build_word_search_query(query, mode))
+        cursor = cursor.sort("word_lower", 1).limit(limit)
+        return [doc async for doc in cursor]
+    except Exception as e:
+        print(f"Error searching words:", e)
+        raise e
+
+async def backfill_word_search_fields(client, batch_size=1000) -> int:
+    """
+    Add word_lower/word_ngrams to words stored before search fields existed
+    
+    Args:
+        client: MongoDBClient instance
+        batch_size: Number of updates sent per bulk_write
+        
+    Returns:
+        Number of documents updated
+    """
+    collection = client.async_db['words']
+    updated = 0
+    batch = []
+    
+    cursor = collection.find({"word_lower": {"$exists": False}}, {"word": 1})
+    async for doc in cursor:
+        if not isinstance(doc.get("word"), str):
+            continue
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": word_search_fields(doc["word"])}))
+        if len(batch) >= batch_size:
+            result = await collection.bulk_write(batch, ordered=False)
+            updated += result.modified_count
+            batch = []
+    if batch:
+        result = await collection.bulk_write(batch, ordered=False)
+        updated += result.modified_count
+    return updated
+
 async def add_word(client, word, en_meaning, ch_meaning, part_of_speech) -> int:
     """
     Add a new word to the word collection
@@ -26,10 +130,6 @@ async def add_word(client, word, en_meaning, ch_meaning, part_of_speech) -> int:
     Returns:
         wordid: The ID of the newly created word
     """
-    # Ensure client is connected asynchronously
-    if client.async_db is None:
-        await client.connect_async()
-        
     collection = client.async_db['words']
     
     try:
@@ -56,7 +156,8 @@ async def add_word(client, word, en_meaning, ch_meaning, part_of_speech) -> int:
             "ch_meaning": ch_meaning, 
             "en_meaning": en_meaning,
             "part_of_speech": part_of_speech, 
-            "wordtime": current_time
+            "wordtime": current_time,
+            **word_search_fields(word)
         }
         
         result = await collection.insert_one(document)
@@ -66,7 +167,7 @@ async def add_word(client, word, en_meaning, ch_meaning, part_of_speech) -> int:
         print(f"Error adding word:", e)
         raise e
 
-async def find_word(client, word=None, wordid=None, partial_match=False):
+async def find_word(client, word=None, wordid=None, partial_match=False, limit=DEFAULT_SEARCH_LIMIT):
     """
     Find word(s) by exact match, partial match, or ID
     
@@ -74,15 +175,12 @@ async def find_word(client, word=None, wordid=None, partial_match=False):
         client: MongoDBClient instance
         word: (Optional) Word to search for
         wordid: (Optional) Word ID to search for
-        partial_match: Whether to use partial matching for the word
+        partial_match: Whether to use partial (substring) matching for the word
+        limit: Maximum number of partial matches returned
         
     Returns:
         A word document, list of word documents, or None if not found
     """
-    # Ensure client is connected asynchronously
-    if client.async_db is None:
-        await client.connect_async()
-        
     collection = client.async_db['words']
     
     try:
@@ -93,10 +191,8 @@ async def find_word(client, word=None, wordid=None, partial_match=False):
         # Search by word if provided
         if word is not None:
             if partial_match:
-                # Use regex for partial matching
-                regex_pattern = {"$regex": f".*{word}.*", "$options": "i"}
-                cursor = collection.find({"word": regex_pattern})
-                return [doc async for doc in cursor]
+                # Indexed substring search on the normalized fields
+                return await search_words(client, word, mode="infix", limit=limit)
             else:
                 # Exact match
                 return await collection.find_one({"word": word})
@@ -120,12 +216,11 @@ async def update_word(client, wordid, update_data):
     Returns:
         Boolean indicating success
     """
-    # Ensure client is connected asynchronously
-    if client.async_db is None:
-        await client.connect_async()
-        
     collection = client.async_db['words']
     
+    if isinstance(update_data.get("word"), str):
+        update_data = {**update_data, **word_search_fields(update_data["word"])}
+    
     try:
         result = await collection.update_one(
             {"wordid": wordid},
@@ -154,10 +249,6 @@ async def delete_word(client, word=None, wordid=None) -> bool:
     Returns:
         Boolean indicating if the word was deleted
     """
-    # Ensure client is connected asynchronously
-    if client.async_db is None:
-        await client.connect_async()
-        
     collection = client.async_db['words']
     
     try:
@@ -19,10 +19,6 @@ async def log_word_operation(client, user_id, wordid, word, operation_type,
     Returns:
         Boolean indicating success
     """
-    # Ensure client is connected asynchronously
-    if client.async_db is None:
-        await client.connect_async()
-        
     collection = client.async_db['word_operations']
     
     try:
@@ -67,10 +63,6 @@ async def get_user_word_stats(client, user_id):
     Returns:
         Dictionary of user stats or None if not found
     """
-    # Ensure client is connected asynchronously
-    if client.async_db is None:
-        await client.connect_async()
-        
     try:
         # Get operations for this user
         operations_collection = client.async_db['word_operations']
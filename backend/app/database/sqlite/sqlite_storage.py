@@ -129,6 +129,82 @@ class WordStorage:
                 print(f"Error adding word:", e)
                 raise e
 
+    async def add_words(self, words: List[Dict[str, Any]], user_id) -> List[Dict[str, Any]]:
+        """
+        Add many words in one transaction (bulk import).
+
+        Args:
+            words: Dicts with word, en_meaning, ch_meaning and part_of_speech
+            user_id: User ID the sync queue entries are recorded for
+
+        Returns:
+            One dict per input with its wordid and whether it was created;
+            words already stored (or repeated in the input) are left as they are
+        """
+        async with aiosqlite.connect(self.db_path) as conn:
+            try:
+                await conn.execute("BEGIN TRANSACTION")
+
+                # Look up the words that already exist, in chunks below SQLite's variable limit
+                texts = list({entry["word"] for entry in words})
+                known = {}
+                for start in range(0, len(texts), 500):
+                    chunk = texts[start:start + 500]
+                    cursor = await conn.execute(
+                        f"SELECT word, wordid FROM words WHERE word IN ({','.join('?' * len(chunk))})",
+                        chunk
+                    )
+                    known.update(dict(await cursor.fetchall()))
+
+                cursor = await conn.execute("SELECT MAX(wordid) FROM words")
+                result = await cursor.fetchone()
+                next_wordid = result[0] + 1 if result[0] is not None else 1
+                current_time = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+                rows, queue, results = [], [], []
+                for entry in words:
+                    word = entry["word"]
+                    if word in known:
+                        results.append({"wordid": known[word], "created": False})
+                        continue
+                    wordid = known[word] = next_wordid
+                    next_wordid += 1
+                    rows.append((
+                        wordid, word, entry["en_meaning"], entry["ch_meaning"],
+                        json.dumps(entry["part_of_speech"]), current_time, 0
+                    ))
+                    data = {
+                        "wordid": wordid,
+                        "word": word,
+                        "en_meaning": entry["en_meaning"],
+                        "ch_meaning": entry["ch_meaning"],
+                        "part_of_speech": entry["part_of_speech"],
+                        "wordtime": current_time
+                    }
+                    queue.append(("add", user_id, wordid, word, json.dumps(data), current_time))
+                    results.append({"wordid": wordid, "created": True})
+
+                await conn.executemany(
+                    "INSERT INTO words (wordid, word, en_meaning, ch_meaning, part_of_speech, wordtime, synced) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                await conn.executemany(
+                    """
+                    INSERT INTO sync_queue
+                    (operation, user_id, wordid, word, data, timestamp)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    queue
+                )
+
+                await conn.commit()
+                print(f"Added {len(rows)} words locally ({len(words) - len(rows)} already stored)")
+                return results
+            except Exception as e:
+                await conn.rollback()
+                print(f"Error adding words:", e)
+                raise e
+
     async def find_word(self, word=None, wordid=None, partial_match=False, user_id=None) -> Union[Dict[str, Any], List[Dict[str, Any]], None]:
         """
         Find word(s) by exact match, partial match, or ID
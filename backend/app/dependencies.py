@@ -2,14 +2,12 @@
 Dependencies for FastAPI dependency injection.
 """
 from fastapi import Depends, HTTPException, status
-from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
 from pydantic import BaseModel
 from typing import Optional
 from .database.mongodb_connection import get_mongodb_client
 from .database import mongodb_utils as mdb
 from .database.sqlite.sqlite_storage import WordStorage  # Import the class directly
-from .auth.token_blacklist import is_blacklisted
+from .auth.auth_context import get_token_claims, oauth2_scheme
 from .config import settings
 
 # Create a singleton instance of the WordStorage
@@ -36,16 +34,12 @@ class UserInToken(BaseModel):
     is_active: Optional[bool] = True
     user_id: str  # Added user_id field
 
-# Setup OAuth2 password bearer with token URL
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
-
-
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+async def get_current_user(claims: dict = Depends(get_token_claims)):
     """
     Get the current authenticated user based on JWT token.
     
     Args:
-        token: JWT token from OAuth2PasswordBearer
+        claims: Verified token claims shared by the auth middleware
         
     Returns:
         UserInToken: User object with username, user_id, and other fields
@@ -59,58 +53,40 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    try:
-        # Check if token is blacklisted (logged out)
-        if is_blacklisted(token):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Token has been revoked",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+    # Extract username from the 'sub' field
+    username: str = claims.get("sub")
+    if username is None:
+        raise credentials_exception
+    
+    # Get user from database
+    client = await get_mongodb_client()
+    user_doc = await mdb.get_user(client, username=username)
+    
+    if user_doc is None:
+        raise credentials_exception
         
-        # Decode the JWT token
-        payload = jwt.decode(
-            token, 
-            settings.SECRET_KEY, 
-            algorithms=[settings.ALGORITHM]
+    # Check if user is active
+    if not user_doc.get("is_active", True):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user account"
         )
-        
-        # Extract username from the 'sub' field
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
-        
-        # Get user from database
-        client = await get_mongodb_client()
-        user_doc = await mdb.get_user(client, username=username)
-        
-        if user_doc is None:
-            raise credentials_exception
-            
-        # Check if user is active
-        if not user_doc.get("is_active", True):
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Inactive user account"
-            )
-        
-        # Extract user_id from the user document
-        user_id = user_doc.get("userid")
-        if user_id is None:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="User ID not found in database"
-            )
-        
-        # Create and return a UserInToken object
-        user = UserInToken(
-            username=username,
-            email=user_doc.get("email"),
-            is_active=user_doc.get("is_active", True),
-            user_id=user_id  # Include user_id
+    
+    # Extract user_id from the user document
+    user_id = user_doc.get("userid")
+    if user_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="User ID not found in database"
         )
-        
-        return user
-        
-    except JWTError:
-        raise credentials_exception
+    
+    # Create and return a UserInToken object
+    user = UserInToken(
+        username=username,
+        email=user_doc.get("email"),
+        is_active=user_doc.get("is_active", True),
+        user_id=user_id  # Include user_id
+    )
+    
+    return user
+
@@ -40,6 +40,9 @@ class LicenseActivate(BaseModel):
 class LicenseFileUpload(BaseModel):
     file_content: str  # Base64 encoded file content
 
+class RosterUpload(BaseModel):
+    file_content: str  # Base64 encoded CSV of email[,username] rows
+
 class EmailLicenseRequest(BaseModel):
     email: EmailStr
     username: Optional[str] = None
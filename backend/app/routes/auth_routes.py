@@ -3,13 +3,18 @@ from fastapi.security import OAuth2PasswordRequestForm
 from datetime import datetime, timedelta
 from datetime import timezone
 from bson import ObjectId
-from jose import jwt
 
 from ..models.user_model import UserCreate, UserResponse, Token, RefreshToken
-from ..auth.auth_handler import get_password_hash, authenticate_user, get_current_user
+from ..auth.auth_handler import get_password_hash_async, authenticate_user, get_current_user
 from ..auth.jwt_handler import create_access_token, create_refresh_token, verify_token
 from ..auth.token_blacklist import add_to_blacklist
+from ..auth.auth_context import get_token_claims, token_revocation_id
+from ..auth.refresh_tokens import (
+    new_token_family, refresh_token_record, rotate_refresh_token,
+    revoke_refresh_tokens, RefreshTokenReuseError
+)
 from ..database.mongodb_connection import get_db, get_mongodb_client
+from ..database.license_cache import license_cache
 from ..database import mongodb_utils as mdb
 from ..config import settings
 from ..utils.timezone_utils import get_hk_time, convert_to_hk_time, HK_TIMEZONE
@@ -38,7 +43,7 @@ async def register_user(user_data: UserCreate):
             )
         
         # Hash password
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await get_password_hash_async(user_data.password)
         time_now = get_hk_time()
 
         # Set default license values
@@ -118,6 +123,7 @@ async def register_user(user_data: UserCreate):
                 }
             )
             print(f"User update result: {result.modified_count} document(s) updated")
+            license_cache.invalidate(userid)
                         
             # Update the response object
             user_obj["has_valid_license"] = True
@@ -163,7 +169,6 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
       - 401: Invalid credentials
     """
     client = await get_mongodb_client()
-    db = await get_db()
     user = await authenticate_user(form_data.username, form_data.password)
     
     if not user:
@@ -174,18 +179,6 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         )
     
     time_now = get_hk_time()
-    # Update last login time
-    await db.users.update_one(
-        {"username": user.username},
-        {"$set": {"last_login": time_now}}
-    )
-
-    user_doc = await mdb.get_user(client, username=user.username)
-    userid = user_doc["userid"]
-
-    # Add login event to usage logs
-    await mdb.add_event(client, userid, "login", time_now)
-
     
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -194,53 +187,49 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         expires_delta=access_token_expires
     )
     
-    # Create refresh token
+    # Create refresh token in a new token family
+    family_id = new_token_family()
     refresh_token = create_refresh_token(
-        data={"sub": user.username}
+        data={"sub": user.username, "fid": family_id}
     )
     
-    # Store refresh token hash in database (optional, for additional security)
-    refresh_token_hash = get_password_hash(refresh_token)
-    await db.users.update_one(
-        {"username": user.username},
-        {"$set": {"refresh_token": refresh_token_hash}}
+    # Update last login time and store the refresh token digest in one round trip
+    user_doc = await mdb.record_login(
+        client,
+        user.username,
+        time_now,
+        refresh_token_record(family_id, refresh_token, issued_at=time_now)
     )
+    if not user_doc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect username or password",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    userid = user_doc["userid"]
+
+    # Add login event to usage logs without holding up the response
+    mdb.schedule_event(client, userid, "login", time_now)
     
     return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
 
 @router.post("/logout")
-async def logout(request: Request, current_user = Depends(get_current_user)):
+async def logout(
+    current_user = Depends(get_current_user),
+    claims: dict = Depends(get_token_claims)
+):
     """
     Logout a user by invalidating their current token.
     
     Requires authentication.
     """
-    # Get the token from the Authorization header
-    auth_header = request.headers.get("Authorization")
-    if not auth_header or not auth_header.startswith("Bearer "):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    token = auth_header.split(" ")[1]
-    
     try:
-        # Decode the token to get its expiry
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        jti = payload.get("sub", "")  # Use the subject as the token ID
-        exp = datetime.fromtimestamp(payload.get("exp", 0))
+        # Revoke the access token until it would have expired anyway
+        await add_to_blacklist(token_revocation_id(claims), claims.get("exp", 0))
         
-        # Add token to blacklist
-        add_to_blacklist(jti, exp)
-        
-        # Clear the refresh token from the database
+        # Revoke the refresh token family
         db = await get_db()
-        await db.users.update_one(
-            {"username": current_user.username},
-            {"$unset": {"refresh_token": ""}}
-        )
+        await revoke_refresh_tokens(db, current_user.username)
 
         time_now = get_hk_time()
         client = await get_mongodb_client()
@@ -284,18 +273,7 @@ async def refresh_token(refresh_token_data: RefreshToken):
             token_type="refresh"
         )
         username = token_data["user_id"]
-        
-        # Get the user
         db = await get_db()
-        user_doc = await db.users.find_one({"username": username})
-        
-        if not user_doc:
-            raise credentials_exception
-        
-        # Optional: Verify the refresh token against stored hash
-        # if "refresh_token" in user_doc:
-        #     if not verify_password(refresh_token_data.refresh_token, user_doc["refresh_token"]):
-        #         raise credentials_exception
         
         # Create new access token
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -304,15 +282,22 @@ async def refresh_token(refresh_token_data: RefreshToken):
             expires_delta=access_token_expires
         )
         
-        # Create new refresh token
-        new_refresh_token = create_refresh_token(data={"sub": username})
+        # Create new refresh token in the same family
+        family_id = token_data.get("family_id")
+        new_refresh_token = create_refresh_token(data={"sub": username, "fid": family_id})
         
-        # Update refresh token in database
-        refresh_token_hash = get_password_hash(new_refresh_token)
-        await db.users.update_one(
-            {"username": username},
-            {"$set": {"refresh_token": refresh_token_hash}}
-        )
+        # Verify the presented refresh token against the stored digest and
+        # rotate it; a replayed token revokes the whole family
+        try:
+            rotated = await rotate_refresh_token(
+                db, username, family_id,
+                refresh_token_data.refresh_token, new_refresh_token
+            )
+        except RefreshTokenReuseError as e:
+            print(str(e))
+            raise credentials_exception
+        if not rotated:
+            raise credentials_exception
         
         return {
             "access_token": access_token, 
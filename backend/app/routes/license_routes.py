@@ -1,26 +1,34 @@
 # app/routers/license_router.py
-from fastapi import APIRouter, Depends, HTTPException, status, Body
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Body, Query, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 import base64
+import csv
+import io
+import uuid
+from datetime import datetime
 from pydantic import BaseModel
 from typing import List, Optional, Dict
 from ..models.license_model import (
     License, LicenseActivate, LicenseFileUpload, LicenseStatus,
-    EmailLicenseRequest, GenerateAndEmailLicenseRequest
+    EmailLicenseRequest, GenerateAndEmailLicenseRequest, RosterUpload
 )
 from ..auth.auth_handler import get_current_user, is_admin
 from ..database.mongodb_connection import get_db, get_mongodb_client
-from ..utils.license_utils import parse_license_file
-from ..utils.email_utils import send_license_key_email
+from ..utils.license_utils import parse_license_file_entries, parse_roster_csv
+from ..utils.email_utils import send_license_key_email, build_license_key_email, get_email_config
+from ..utils.email_outbox import enqueue_emails, get_job_progress
 from ..database.license_db import (
     create_license, get_license_by_key, get_all_licenses,
-    activate_license, revoke_license, check_user_license,
-    create_bulk_licenses
+    activate_license, activate_license_batch, revoke_license, get_user_license_status,
+    create_bulk_licenses, iter_licenses, MAX_BULK_LICENSES,
+    license_sort, license_cursor, parse_license_cursor
 )
 from ..database import mongodb_utils as mdb
 
 router = APIRouter(prefix="/licenses", tags=["License Management"])
 
+LICENSE_CSV_FIELDS = ["_id", "license_key", "status", "issued_date", "user_id", "activated_at", "created_by"]
+
 # User endpoints
 @router.post("/activate")
 async def activate_license_key(
@@ -48,40 +56,49 @@ async def upload_license_file(
     current_user = Depends(get_current_user),
     db = Depends(get_db)
 ):
-    """Upload and process a license file"""
+    """Upload and process a license file
+    
+    Every key in the file is validated and looked up in one batch; the
+    response includes a per-key status report.
+    """
+    # Get the user_id from the current user
+    user_id = current_user.user_id if hasattr(current_user, 'user_id') else current_user.id
+    
     try:
-        # Get the user_id from the current user
-        user_id = current_user.user_id if hasattr(current_user, 'user_id') else current_user.id
-        
         # Decode base64 file content
         file_content = base64.b64decode(file_data.file_content).decode('utf-8')
-        
-        # Parse the file to extract license keys
-        license_keys = parse_license_file(file_content)
-        
-        if not license_keys:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No valid license keys found in the file"
-            )
-        
-        # Try to activate each license key
-        for key in license_keys:
-            result = await activate_license(db, key, user_id)
-            if result["success"]:
-                return {"message": f"License key {key} activated successfully"}
-        
-        # If we get here, none of the keys worked
+    except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="None of the license keys in the file could be activated"
+            detail=f"Error processing license file: {str(e)}"
         )
-        
-    except Exception as e:
+    
+    # Parse the file to extract license keys
+    license_keys, invalid_entries = parse_license_file_entries(file_content)
+    
+    if not license_keys:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Error processing license file: {str(e)}"
+            detail="No valid license keys found in the file"
         )
+    
+    result = await activate_license_batch(db, license_keys, user_id, invalid_entries)
+    
+    if not result["success"]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={
+                "message": "None of the license keys in the file could be activated",
+                "results": result["results"]
+            }
+        )
+    
+    if result["activated"]:
+        message = f"License key {result['activated']} activated successfully"
+    else:
+        message = "A license key in the file is already activated for this user"
+    
+    return {"message": message, "results": result["results"]}
 
 @router.get("/status")
 async def check_license_status(
@@ -92,7 +109,7 @@ async def check_license_status(
     # Get the user_id from the current user
     user_id = current_user.user_id if hasattr(current_user, 'user_id') else current_user.id
     
-    result = await check_user_license(db, user_id)
+    result = await get_user_license_status(db, user_id)
     
     return {
         "has_valid_license": result["has_license"],
@@ -127,10 +144,10 @@ async def generate_bulk_licenses_path(
 ):
     """Generate multiple license keys at once using path parameter (admin only)"""
     # Validate count
-    if count <= 0 or count > 100:
+    if count <= 0 or count > MAX_BULK_LICENSES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Count must be between 1 and 100"
+            detail=f"Count must be between 1 and {MAX_BULK_LICENSES}"
         )
     
     # Get admin ID
@@ -140,8 +157,9 @@ async def generate_bulk_licenses_path(
     result = await create_bulk_licenses(db, count, admin_id)
     
     if not result["success"]:
+        # The count was checked above: some keys could not be created
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=result["message"]
         )
     
@@ -209,8 +227,9 @@ async def generate_and_email_license(
     result = await create_bulk_licenses(db, request.count, admin_id)
     
     if not result["success"]:
+        # A count out of range creates nothing; a shortfall is our failure
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR if "licenses" in result else status.HTTP_400_BAD_REQUEST,
             detail=result["message"]
         )
     
@@ -255,24 +274,186 @@ async def generate_and_email_license(
                    "Some license keys could not be emailed, check the details"
     }
 
+@router.post("/roster", response_model=Dict, status_code=status.HTTP_202_ACCEPTED)
+async def generate_licenses_for_roster(
+    roster: RosterUpload,
+    admin_user = Depends(is_admin),
+    db = Depends(get_db)
+):
+    """
+    Generate and email a license key for every student in a roster (admin only)
+    
+    Licenses are created in one bulk insert and all emails are queued in
+    the outbox, which sends them in the background. Poll
+    `/licenses/roster/{job_id}` for delivery progress.
+    """
+    try:
+        file_content = base64.b64decode(roster.file_content).decode('utf-8-sig')
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Error processing roster file: {str(e)}"
+        )
+    
+    students, rejected = parse_roster_csv(file_content)
+    if not students:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"message": "No valid students found in the roster", "rejected": rejected}
+        )
+    if len(students) > MAX_BULK_LICENSES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A roster can have at most {MAX_BULK_LICENSES} students"
+        )
+    
+    if not get_email_config()["email_sender"]:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Email is not configured"
+        )
+    
+    admin_id = admin_user.user_id if hasattr(admin_user, 'user_id') else admin_user.id
+    result = await create_bulk_licenses(db, len(students), admin_id)
+    if not result["success"] or result["count"] < len(students):
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Could not generate a license for every student"
+        )
+    
+    job_id = uuid.uuid4().hex
+    emails = []
+    for student, license_key in zip(students, result["licenses"]):
+        subject, text_content, html_content = build_license_key_email(license_key, student["username"])
+        emails.append({
+            "recipient": student["email"],
+            "subject": subject,
+            "text_content": text_content,
+            "html_content": html_content
+        })
+    
+    await db.license_jobs.insert_one({
+        "job_id": job_id,
+        "created_by": admin_id,
+        "created_at": datetime.now(),
+        "total": len(emails),
+        "rejected": rejected
+    })
+    await enqueue_emails(emails, job_id=job_id)
+    
+    return {
+        "job_id": job_id,
+        "count": len(emails),
+        "rejected": rejected,
+        "message": f"Generated {len(emails)} license keys; emails are being sent"
+    }
+
+@router.get("/roster/{job_id}", response_model=Dict)
+async def get_roster_job_progress(
+    job_id: str,
+    admin_user = Depends(is_admin),
+    db = Depends(get_db)
+):
+    """Get the email delivery progress of a roster job (admin only)"""
+    job = await db.license_jobs.find_one({"job_id": job_id}, projection={"_id": 0, "total": 1, "rejected": 1})
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Roster job not found"
+        )
+    
+    counts = await get_job_progress(job_id)
+    in_progress = counts.get("pending", 0) + counts.get("sending", 0)
+    
+    return {
+        "job_id": job_id,
+        "total": job["total"],
+        "sent": counts.get("sent", 0),
+        "failed": counts.get("failed", 0),
+        "pending": in_progress,
+        "rejected": job.get("rejected", []),
+        "done": in_progress == 0
+    }
+
+def _serialize_license(license):
+    """Convert ObjectIds in a license document to strings"""
+    if "_id" in license:
+        license["_id"] = str(license["_id"])
+    if "user_id" in license and license["user_id"]:
+        license["user_id"] = str(license["user_id"])
+    if "created_by" in license and license["created_by"]:
+        license["created_by"] = str(license["created_by"])
+    return license
+
+async def _license_csv_rows(db, filters):
+    """Yield the CSV export one cursor batch at a time"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=LICENSE_CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    async for license in iter_licenses(db, **filters):
+        writer.writerow(_serialize_license(license))
+        count += 1
+        if count % 1000 == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
 @router.get("/all", response_model=List[Dict])
 async def get_all_license_keys(
+    response: Response,
+    status_filter: Optional[LicenseStatus] = Query(None, alias="status"),
+    created_by: Optional[str] = None,
+    issued_from: Optional[datetime] = None,
+    issued_to: Optional[datetime] = None,
+    after: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    format: str = Query("json", pattern="^(json|csv)$"),
     admin_user = Depends(is_admin),
     db = Depends(get_db)
 ):
-    """Get all license keys (admin only)"""
-    licenses = await get_all_licenses(db)
-    
-    # Convert ObjectId to string for JSON serialization
-    for license in licenses:
-        if "_id" in license:
-            license["_id"] = str(license["_id"])
-        if "user_id" in license and license["user_id"]:
-            license["user_id"] = str(license["user_id"])
-        if "created_by" in license and license["created_by"]:
-            license["created_by"] = str(license["created_by"])
-    
-    return licenses
+    """
+    Get license keys (admin only)
+    
+    - **status**, **created_by**, **issued_from**, **issued_to**: optional filters
+    - **after**: cursor of the previous page, from its `X-Next-Cursor`
+      header. Pages are ordered by `_id`, or by issue date (then `_id`)
+      when a date range is given
+    - **limit**: page size (max 1000)
+    - **format**: `csv` streams every matching license as CSV, ignoring paging
+    """
+    filters = {
+        "status": status_filter.value if status_filter else None,
+        "created_by": created_by,
+        "issued_from": issued_from,
+        "issued_to": issued_to
+    }
+    
+    if format == "csv":
+        return StreamingResponse(
+            _license_csv_rows(db, filters),
+            media_type="text/csv",
+            headers={"Content-Disposition": "attachment; filename=licenses.csv"}
+        )
+    
+    # Date-range listings are ordered (and paginated) by issue date
+    by_date = license_sort(**filters)[0][0] == "issued_date"
+    try:
+        after = parse_license_cursor(after, by_date) if after else None
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+    
+    licenses = await get_all_licenses(db, limit=limit, after=after, **filters)
+    
+    # A full page means there may be more
+    if len(licenses) == limit:
+        response.headers["X-Next-Cursor"] = license_cursor(licenses[-1], by_date)
+    
+    return [_serialize_license(license) for license in licenses]
 
 @router.post("/check-email-config")
 async def check_email_configuration(
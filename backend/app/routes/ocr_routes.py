@@ -2,41 +2,94 @@ from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile,
 from typing import List
 from io import BytesIO
 import os
+import math
+import asyncio
 import logging
-from google.cloud import vision
-from google.oauth2 import service_account
 import tempfile
-import PyPDF2
-import pdfplumber
+import functools
 
 from ..auth.auth_handler import get_current_user
+from ..config import settings
 from ..database.mongodb_connection import get_mongodb_client
+from ..utils.executor_pool import BoundedExecutor
+from ..utils.metrics import register_metrics_source
 
 router = APIRouter(prefix="/extract-text", tags=["Text Extraction (OCR)"])
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Initialize Google Cloud Vision client
-try:
-    # Check if we have credentials as environment variable
-    if os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
-        # Parse credentials from environment variable
-        import json
-        credentials_info = json.loads(os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"))
-        credentials = service_account.Credentials.from_service_account_info(credentials_info)
-        vision_client = vision.ImageAnnotatorClient(credentials=credentials)
-        logger.info("Initialized Vision API client with credentials from environment variable JSON")
-    elif os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
-        # Use standard credentials file
-        vision_client = vision.ImageAnnotatorClient()
-        logger.info("Initialized Vision API client with standard credentials")
-    else:
-        logger.warning("No Google Cloud credentials found. OCR will not work.")
+# Google Cloud Vision client, created on first use: importing the client
+# library takes a few hundred milliseconds that startup should not pay
+# (the PDF libraries are likewise imported when a PDF arrives)
+vision_client = None
+_vision_client_initialized = False
+
+# The Vision client and the PDF libraries block for the whole call, so
+# they run on this pool instead of the event loop
+ocr_pool = BoundedExecutor(
+    "ocr",
+    max_workers=settings.OCR_WORKERS,
+    max_concurrency=settings.OCR_MAX_CONCURRENCY
+)
+ocr_stats = {"rejected": 0}
+
+def get_ocr_metrics():
+    return {**ocr_pool.get_metrics(), **ocr_stats}
+
+register_metrics_source("ocr", get_ocr_metrics)
+
+class OCRBusyError(Exception):
+    """Too many OCR jobs are already waiting for a worker"""
+
+    def __init__(self, retry_after: float):
+        super().__init__("OCR queue is full")
+        self.retry_after = retry_after
+
+async def run_ocr_job(func, *args):
+    """
+    Run a blocking OCR step on the OCR pool
+    
+    Raises:
+        OCRBusyError: if OCR_MAX_QUEUE jobs are already waiting
+        asyncio.TimeoutError: if the step runs longer than OCR_TIMEOUT
+    """
+    waiting = ocr_pool.stats["waiting"]
+    if waiting >= settings.OCR_MAX_QUEUE:
+        ocr_stats["rejected"] += 1
+        # Roughly how long until the queue has drained
+        metrics = ocr_pool.get_metrics()
+        raise OCRBusyError(metrics["avg_run_time"] * waiting / ocr_pool.max_concurrency)
+    return await ocr_pool.run(func, *args, timeout=settings.OCR_TIMEOUT)
+
+def get_vision_client():
+    """Return the Vision client, initializing it on first call (None without credentials)"""
+    global vision_client, _vision_client_initialized
+    if _vision_client_initialized:
+        return vision_client
+    _vision_client_initialized = True
+    try:
+        from google.cloud import vision
+        from google.oauth2 import service_account
+        # Check if we have credentials as environment variable
+        if os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
+            # Parse credentials from environment variable
+            import json
+            credentials_info = json.loads(os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"))
+            credentials = service_account.Credentials.from_service_account_info(credentials_info)
+            vision_client = vision.ImageAnnotatorClient(credentials=credentials)
+            logger.info("Initialized Vision API client with credentials from environment variable JSON")
+        elif os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
+            # Use standard credentials file
+            vision_client = vision.ImageAnnotatorClient()
+            logger.info("Initialized Vision API client with standard credentials")
+        else:
+            logger.warning("No Google Cloud credentials found. OCR will not work.")
+            vision_client = None
+    except Exception as e:
+        logger.error(f"Failed to initialize Google Cloud Vision client: {e}")
         vision_client = None
-except Exception as e:
-    logger.error(f"Failed to initialize Google Cloud Vision client: {e}")
-    vision_client = None
+    return vision_client
 
 async def detect_text(image_content):
     """
@@ -48,14 +101,19 @@ async def detect_text(image_content):
     Returns:
         Extracted text
     """
-    if vision_client is None:
+    client = get_vision_client()
+    if client is None:
         raise Exception("Google Cloud Vision client not initialized")
     
     try:    
+        from google.cloud import vision
         image = vision.Image(content=image_content)
         
-        # Perform text detection
-        response = vision_client.text_detection(image=image)
+        # Perform text detection on the OCR pool; the client gives up on
+        # the upstream call when the job times out
+        response = await run_ocr_job(
+            functools.partial(client.text_detection, image=image, timeout=settings.OCR_TIMEOUT)
+        )
         
         if response.error.message:
             raise Exception(f"Google Cloud Vision API error: {response.error.message}")
@@ -78,7 +136,7 @@ async def detect_text(image_content):
 
 async def process_pdf(pdf_content):
     """
-    Process a PDF file and extract text
+    Process a PDF file and extract text on the OCR pool
     
     Args:
         pdf_content: Binary content of the PDF file
@@ -86,7 +144,14 @@ async def process_pdf(pdf_content):
     Returns:
         Extracted text
     """
+    return await run_ocr_job(extract_pdf_text, pdf_content)
+
+def extract_pdf_text(pdf_content):
+    """Extract the text of a PDF (blocking)"""
     try:
+        import PyPDF2
+        import pdfplumber
+        
         pdf_file = BytesIO(pdf_content)
         
         # First try with pdfplumber, which has better text extraction capabilities
@@ -134,9 +199,12 @@ async def extract_text_from_image(
     - Requires authentication
     - Accepts image files (JPEG, PNG) and PDF files
     - Returns detected text
+    - At most OCR_MAX_CONCURRENCY files are processed at once; when
+      OCR_MAX_QUEUE more are waiting, uploads get 503 with a Retry-After
+      header, and a job running past OCR_TIMEOUT gets 504
     """
     # Check if OCR is available
-    if vision_client is None:
+    if get_vision_client() is None:
         raise HTTPException(
             status_code=status.HTTP_501_NOT_IMPLEMENTED,
             detail="OCR service is not configured properly. Check Google Cloud Vision credentials."
@@ -184,6 +252,18 @@ async def extract_text_from_image(
             "detected_language": "auto-detect"  # Simple language detection could be added later
         }
         
+    except OCRBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="OCR service is busy, please try again shortly",
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+        )
+    except asyncio.TimeoutError:
+        logger.error(f"OCR job timed out after {settings.OCR_TIMEOUT} s")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="OCR service timed out"
+        )
     except Exception as e:
         logger.error(f"Error extracting text: {str(e)}")
         
@@ -1,13 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Body
-from typing import Dict, Optional
-from nltk.corpus import wordnet
-import requests
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import httpx
 import hashlib
+import json
+import math
 import uuid
 import time
 import os
 
 from ..auth.auth_handler import get_current_user
+from ..config import settings
+from ..utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+from ..utils.dictionary_index import dictionary_index
+from ..utils.http_client import http_client
+from ..utils.metrics import register_metrics_source
+from ..utils.rate_limiter import QuotaScheduler, QuotaExceededError, INTERACTIVE, BULK
+from ..utils.single_flight import SingleFlight
+from ..utils.text_chunks import split_text
+from ..utils.translation_cache import translation_cache, normalize_text
 
 router = APIRouter(prefix="/translate", tags=["Translation"])
 
@@ -16,8 +28,193 @@ router = APIRouter(prefix="/translate", tags=["Translation"])
 YOUDAO_APP_KEY = os.environ.get("YOUDAO_APP_KEY", "")
 YOUDAO_APP_SECRET = os.environ.get("YOUDAO_APP_SECRET", "")
 
-# Youdao API endpoint
-YOUDAO_API_URL = "https://openapi.youdao.com/api"
+# Youdao API endpoints (the v2 endpoint takes several q values per call)
+YOUDAO_API_URL = settings.YOUDAO_API_URL
+YOUDAO_BATCH_API_URL = settings.YOUDAO_BATCH_API_URL
+
+# Most texts accepted by /translate/batch in one request
+MAX_BATCH_TEXTS = 1000
+
+# Longest text accepted by /translate and /translate/stream; longer than
+# TRANSLATION_CHUNK_CHARS it is translated in chunks
+MAX_TRANSLATE_CHARS = 20000
+
+# Youdao error codes meaning the account is over its quota (411, 412)
+# or unusable (401), rather than a problem with one request
+YOUDAO_QUOTA_ERRORS = {"411", "412"}
+YOUDAO_ACCOUNT_ERRORS = {"401"}
+
+# Identical translations in flight at the same time share one Youdao call
+translation_flight = SingleFlight("translation")
+register_metrics_source("translation_single_flight", translation_flight.get_metrics)
+
+# Every upstream call takes a token from the API key's bucket, shared by
+# all workers on the host; lookups (INTERACTIVE) go before batch jobs (BULK)
+youdao_quota = QuotaScheduler(
+    "youdao",
+    rate=settings.YOUDAO_QUOTA_PER_HOUR / 3600,
+    capacity=settings.YOUDAO_QUOTA_BURST,
+    interactive_max_wait=settings.YOUDAO_QUOTA_MAX_WAIT,
+    bulk_max_wait=settings.YOUDAO_QUOTA_BULK_MAX_WAIT,
+    interactive_reserve=settings.YOUDAO_QUOTA_INTERACTIVE_RESERVE,
+    db_path=settings.YOUDAO_QUOTA_DB_PATH or None,
+)
+register_metrics_source("youdao_quota", youdao_quota.get_metrics)
+
+# While Youdao keeps failing, lookups are answered from the cache only
+youdao_breaker = CircuitBreaker(
+    "youdao",
+    failure_threshold=settings.YOUDAO_BREAKER_FAILURE_THRESHOLD,
+    reset_timeout=settings.YOUDAO_BREAKER_RESET_TIMEOUT,
+)
+register_metrics_source("youdao_circuit", youdao_breaker.get_metrics)
+
+# Raised when Youdao is not called at all: no quota left or circuit open
+UPSTREAM_UNAVAILABLE = (QuotaExceededError, CircuitOpenError)
+
+class YoudaoAPIError(Exception):
+    """Youdao answered with a non-zero errorCode"""
+
+    def __init__(self, error_code: str):
+        super().__init__(f"Youdao API error: {error_code}")
+        self.error_code = error_code
+
+async def request_youdao_translation(params: dict) -> dict:
+    """
+    Call the Youdao API through the shared pooled HTTP client
+    
+    Raises:
+        httpx.TimeoutException: if Youdao does not answer in time
+        YoudaoAPIError: if Youdao returns an error code
+    """
+    response = await http_client.get(YOUDAO_API_URL, params=params)
+    response.raise_for_status()
+    response_json = response.json()
+    
+    if response_json.get("errorCode") != "0":
+        raise YoudaoAPIError(response_json.get("errorCode"))
+    return response_json
+
+async def call_youdao(send, lane: str = INTERACTIVE):
+    """
+    Send one upstream request under the quota and the circuit breaker
+    
+    Args:
+        send: Coroutine function making the request
+        lane: INTERACTIVE for lookups, BULK for batch jobs
+    
+    Raises:
+        CircuitOpenError: if Youdao has been failing (nothing is sent)
+        QuotaExceededError: if no quota is available in time (nothing is sent)
+    """
+    youdao_breaker.check()
+    await youdao_quota.acquire(YOUDAO_APP_KEY, lane)
+    try:
+        result = await send()
+    except YoudaoAPIError as e:
+        if e.error_code in YOUDAO_QUOTA_ERRORS:
+            # Youdao counts differently than we do: stop until the bucket refills
+            await youdao_quota.penalize(YOUDAO_APP_KEY)
+            youdao_breaker.record_failure()
+        elif e.error_code in YOUDAO_ACCOUNT_ERRORS:
+            youdao_breaker.record_failure()
+        raise
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code >= 500:
+            youdao_breaker.record_failure()
+        raise
+    except httpx.HTTPError:
+        youdao_breaker.record_failure()
+        raise
+    youdao_breaker.record_success()
+    return result
+
+def translation_error_message(error: Exception) -> str:
+    """What a client is told about a text that could not be translated"""
+    if isinstance(error, UPSTREAM_UNAVAILABLE):
+        return "Translation service temporarily unavailable"
+    if isinstance(error, httpx.TimeoutException):
+        return "Translation service timed out"
+    return f"Error translating text: {str(error)}"
+
+def translation_unavailable(error: Exception) -> HTTPException:
+    """503 telling the client when the translation service can be retried"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Translation service temporarily unavailable; only cached translations can be served",
+        headers={"Retry-After": str(max(1, math.ceil(error.retry_after)))}
+    )
+
+async def request_youdao_batch(params: dict) -> List[dict]:
+    """
+    Call the Youdao batch API with several q values in one request
+    
+    Returns:
+        The translateResults list (query, translation, type per text)
+    
+    Raises:
+        httpx.TimeoutException: if Youdao does not answer in time
+        YoudaoAPIError: if Youdao returns an error code
+    """
+    response = await http_client.post(YOUDAO_BATCH_API_URL, data=params)
+    response.raise_for_status()
+    response_json = response.json()
+    
+    if response_json.get("errorCode") != "0":
+        raise YoudaoAPIError(response_json.get("errorCode"))
+    return response_json.get("translateResults", [])
+
+def youdao_auth_params(query_text: str) -> dict:
+    """
+    Generate the signature parameters Youdao requires for a query
+    
+    For batch requests query_text is all q values joined together.
+    """
+    if not YOUDAO_APP_KEY or not YOUDAO_APP_SECRET:
+        raise Exception("Youdao API credentials not configured")
+        
+    salt = str(uuid.uuid1())
+    timestamp = str(int(time.time()))
+    input_text = query_text
+    
+    # Signature v3 signs only the first and last 10 characters and the
+    # length of a long query; the full text is still sent as q
+    if len(input_text) > 20:
+        input_len = len(input_text)
+        input_text = input_text[:10] + str(input_len) + input_text[-10:]
+        
+    # Generate sign according to Youdao API requirements
+    sign_str = YOUDAO_APP_KEY + input_text + salt + timestamp + YOUDAO_APP_SECRET
+    sign = hashlib.sha256(sign_str.encode()).hexdigest()
+    
+    return {
+        "appKey": YOUDAO_APP_KEY,
+        "salt": salt,
+        "sign": sign,
+        "signType": "v3",
+        "curtime": timestamp
+    }
+
+def pack_batches(texts: List[str], max_items: int, max_chars: int) -> List[List[str]]:
+    """
+    Split texts into as few Youdao batch requests as the API limits allow
+    
+    Args:
+        texts: Texts to translate, in order
+        max_items: Most q values per request
+        max_chars: Most characters of q values per request
+    """
+    batches = []
+    current, current_chars = [], 0
+    for text in texts:
+        if current and (len(current) >= max_items or current_chars + len(text) > max_chars):
+            batches.append(current)
+            current, current_chars = [], 0
+        current.append(text)
+        current_chars += len(text)
+    if current:
+        batches.append(current)
+    return batches
 
 class TranslationRequest:
     def __init__(self, text: str, target_language: str):
@@ -25,45 +222,235 @@ class TranslationRequest:
         self.target_language = target_language
         self.source_language = "auto"  # Auto-detect source language
         
-    def get_youdao_params(self):
+    def youdao_target_language(self):
         """
-        Generate parameters for Youdao API request
+        Map the requested language code to the Youdao code
         """
-        if not YOUDAO_APP_KEY or not YOUDAO_APP_SECRET:
-            raise Exception("Youdao API credentials not configured")
-            
-        salt = str(uuid.uuid1())
-        timestamp = str(int(time.time()))
-        input_text = self.text
-        
-        # If query text is too long, truncate and use hash instead
-        if len(input_text) > 20:
-            input_len = len(input_text)
-            input_text = input_text[:10] + str(input_len) + input_text[-10:]
-            
-        # Generate sign according to Youdao API requirements
-        sign_str = YOUDAO_APP_KEY + input_text + salt + timestamp + YOUDAO_APP_SECRET
-        sign = hashlib.sha256(sign_str.encode()).hexdigest()
-        
-        # Map language codes to Youdao codes
         target_lang = self.target_language
         if target_lang.lower() == "zh" or target_lang.lower() == "zh-cn":
             target_lang = "zh-CHS"
         elif target_lang.lower() == "zh-tw":
             target_lang = "zh-CHT"
+        return target_lang
+        
+    def get_youdao_params(self):
+        """
+        Generate parameters for Youdao API request
+        """
+        # Map language codes to Youdao codes
+        target_lang = self.youdao_target_language()
             
         params = {
             "q": self.text,
             "from": self.source_language,
             "to": target_lang,
-            "appKey": YOUDAO_APP_KEY,
-            "salt": salt,
-            "sign": sign,
-            "signType": "v3",
-            "curtime": timestamp
+            **youdao_auth_params(self.text)
         }
         
         return params
+    
+    def get_youdao_batch_params(self, texts: List[str]):
+        """
+        Generate parameters for a Youdao batch request covering texts
+        """
+        return {
+            "q": texts,
+            "from": self.source_language,
+            "to": self.youdao_target_language(),
+            **youdao_auth_params("".join(texts))
+        }
+
+async def translate_cached(translation_request: TranslationRequest, lane: str = INTERACTIVE) -> dict:
+    """
+    Translate through the translation cache, calling Youdao only on a miss
+    and at most once at a time per text and language pair
+    
+    Args:
+        translation_request: Text and target language
+        lane: Youdao quota lane of the call made on a miss
+    
+    Returns:
+        Dict with translated_text and detected_source
+    
+    Raises:
+        QuotaExceededError, CircuitOpenError: on a miss while Youdao
+            cannot be called
+    """
+    source = translation_request.source_language
+    target = translation_request.youdao_target_language()
+    
+    cached = await translation_cache.get(translation_request.text, source, target)
+    if cached is not None:
+        return cached
+    
+    async def fetch():
+        params = translation_request.get_youdao_params()
+        response_json = await call_youdao(lambda: request_youdao_translation(params), lane)
+        
+        # Extract translation from response
+        translations = response_json.get("translation", [])
+        if not translations:
+            raise Exception("No translation found in response")
+        
+        result = {
+            "translated_text": translations[0],
+            "detected_source": response_json.get("l", "").split("2")[0],
+        }
+        await translation_cache.put(translation_request.text, source, target, **result)
+        return result
+    
+    # Concurrent misses for the same text wait on the first one's call;
+    # failures reach every waiter and are not cached
+    key = (normalize_text(translation_request.text), source, target)
+    return await translation_flight.do(key, fetch)
+
+async def translate_pack(translation_request: TranslationRequest, pack: List[str], lane: str) -> Dict[str, dict]:
+    """
+    Translate texts with one call to the Youdao batch API and cache the results
+    
+    Args:
+        translation_request: Target language of the texts (its text is unused)
+        pack: Texts to send, within the YOUDAO_BATCH_MAX_* limits
+        lane: Youdao quota lane of the call
+    
+    Returns:
+        Dict from normalised text to its translated_text and detected_source;
+        texts Youdao returned nothing for are missing
+    
+    Raises:
+        The errors of call_youdao
+    """
+    source = translation_request.source_language
+    target = translation_request.youdao_target_language()
+    params = translation_request.get_youdao_batch_params(pack)
+    results = await call_youdao(lambda: request_youdao_batch(params), lane)
+    
+    by_query = {}
+    for item in results:
+        translation = item.get("translation")
+        if item.get("query") is not None and translation:
+            by_query[normalize_text(item["query"])] = {
+                "translated_text": translation,
+                "detected_source": item.get("type", "").split("2")[0],
+            }
+    for text in pack:
+        key = normalize_text(text)
+        if key in by_query:
+            await translation_cache.put(text, source, target, **by_query[key])
+    return by_query
+
+def start_chunk_translations(
+    chunks: List[Tuple[str, str]],
+    target_language: str,
+    first_alone: bool = False
+) -> List[asyncio.Future]:
+    """
+    Start translating the chunks of one text
+    
+    Cached chunks are answered at once. The others are packed into as few
+    Youdao batch calls as the API limits allow (one for most passages), so
+    a long text costs about as much quota as a short one. With first_alone
+    the first chunk is sent on its own through translate_cached, so it
+    comes back as fast as a short lookup while the rest are in flight.
+    
+    Returns:
+        One future per chunk, in chunk order, resolving to its translation
+        or failing with the error of its Youdao call. Once the caller has
+        cancelled every future it stopped waiting for, the calls still
+        queued or in flight are cancelled too
+    """
+    loop = asyncio.get_running_loop()
+    futures = [loop.create_future() for _ in chunks]
+    translation_request = TranslationRequest(text="", target_language=target_language)
+    source = translation_request.source_language
+    target = translation_request.youdao_target_language()
+    
+    def settle(indices, result=None, error=None):
+        for index in indices:
+            if not futures[index].done():
+                if error is not None:
+                    futures[index].set_exception(error)
+                else:
+                    futures[index].set_result(result)
+    
+    async def translate_first():
+        try:
+            first_request = TranslationRequest(text=chunks[0][0], target_language=target_language)
+            settle([0], await translate_cached(first_request))
+        except Exception as e:
+            settle([0], error=e)
+    
+    async def translate_rest(start):
+        try:
+            # Repeated chunks are sent once, keyed like the cache
+            positions = {}
+            for index in range(start, len(chunks)):
+                chunk = chunks[index][0]
+                positions.setdefault(normalize_text(chunk), (chunk, []))[1].append(index)
+            
+            misses = []
+            for chunk, indices in positions.values():
+                cached = await translation_cache.get(chunk, source, target)
+                if cached is not None:
+                    settle(indices, cached)
+                else:
+                    misses.append(chunk)
+            
+            budget = asyncio.Semaphore(settings.TRANSLATION_CHUNK_CONCURRENCY)
+            
+            async def send_pack(pack):
+                async with budget:
+                    try:
+                        by_query = await translate_pack(translation_request, pack, INTERACTIVE)
+                    except Exception as e:
+                        for chunk in pack:
+                            settle(positions[normalize_text(chunk)][1], error=e)
+                        return
+                for chunk in pack:
+                    key = normalize_text(chunk)
+                    if key in by_query:
+                        settle(positions[key][1], by_query[key])
+                    else:
+                        settle(positions[key][1], error=Exception("No translation found in response"))
+            
+            batches = pack_batches(misses, settings.YOUDAO_BATCH_MAX_ITEMS, settings.YOUDAO_BATCH_MAX_CHARS)
+            await asyncio.gather(*(send_pack(pack) for pack in batches))
+        except Exception as e:
+            settle(range(start, len(chunks)), error=e)
+    
+    if first_alone and chunks:
+        workers = [asyncio.ensure_future(translate_first()), asyncio.ensure_future(translate_rest(1))]
+    else:
+        workers = [asyncio.ensure_future(translate_rest(0))]
+    
+    def stop_when_abandoned(_):
+        if all(future.done() for future in futures):
+            for worker in workers:
+                worker.cancel()
+    
+    for future in futures:
+        future.add_done_callback(stop_when_abandoned)
+    return futures
+
+def validate_translate_body(data: Dict[str, str]):
+    """Check the body shared by /translate and /translate/stream"""
+    if not data.get("text"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Text to translate is required"
+        )
+    
+    if len(data["text"]) > MAX_TRANSLATE_CHARS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_TRANSLATE_CHARS} characters can be translated per request"
+        )
+        
+    if not data.get("target_language"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Target language is required"
+        )
 
 @router.post("", status_code=status.HTTP_200_OK)
 async def translate_text(
@@ -80,19 +467,19 @@ async def translate_text(
         "target_language": "zh" (language code, e.g., en, zh, ja, etc.)
       }
     - Returns translated text
-    - Rate-limited to 100 requests per hour (Youdao API free tier)
+    - Texts longer than TRANSLATION_CHUNK_CHARS are split into sentence
+      chunks, cached separately and sent together in Youdao batch calls;
+      use /translate/stream to get the chunks as soon as each is ready.
+      The response then also lists the chunks; a chunk that could not be
+      translated has translated_text null and an error message, is kept
+      untranslated in the joined translated_text, and the response is
+      marked degraded. Only when no chunk could be translated does the
+      request fail
+    - Rate-limited to YOUDAO_QUOTA_PER_HOUR requests per hour (100 on the
+      Youdao API free tier); when the quota is used up or Youdao keeps
+      failing, uncached texts get 503 with a Retry-After header
     """
-    if not data.get("text"):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Text to translate is required"
-        )
-        
-    if not data.get("target_language"):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Target language is required"
-        )
+    validate_translate_body(data)
         
     try:
         translation_request = TranslationRequest(
@@ -109,28 +496,57 @@ async def translate_text(
                 "target_language": data["target_language"]
             }
             
-        # Get Youdao API parameters
-        params = translation_request.get_youdao_params()
-        
-        # Send request to Youdao API
-        response = requests.get(YOUDAO_API_URL, params=params)
-        response_json = response.json()
-        
-        if response_json.get("errorCode") != "0":
-            raise Exception(f"Youdao API error: {response_json.get('errorCode')}")
+        # Long texts: sentence chunks, each cached on its own
+        if len(data["text"]) > settings.TRANSLATION_CHUNK_CHARS:
+            chunks = split_text(data["text"], settings.TRANSLATION_CHUNK_CHARS)
+            futures = start_chunk_translations(chunks, data["target_language"])
+            try:
+                outcomes = await asyncio.gather(*futures, return_exceptions=True)
+            finally:
+                for future in futures:
+                    future.cancel()
+            translated = [o for o in outcomes if not isinstance(o, BaseException)]
+            if not translated:
+                raise outcomes[0]
             
-        # Extract translation from response
-        translations = response_json.get("translation", [])
-        if not translations:
-            raise Exception("No translation found in response")
+            results = []
+            for (chunk, separator), outcome in zip(chunks, outcomes):
+                result = {"text": chunk, "separator": separator}
+                if isinstance(outcome, BaseException):
+                    result["translated_text"] = None
+                    result["error"] = translation_error_message(outcome)
+                else:
+                    result["translated_text"] = outcome["translated_text"]
+                results.append(result)
+            return {
+                "text": data["text"],
+                "translated_text": "".join(
+                    (result["translated_text"] or result["text"]) + result["separator"]
+                    for result in results
+                ),
+                "source_language": translated[0]["detected_source"],
+                "target_language": data["target_language"],
+                "chunks": results,
+                "degraded": len(translated) < len(chunks)
+            }
+            
+        # Cached translation, or a call to the Youdao API
+        translation = await translate_cached(translation_request)
             
         return {
             "text": data["text"],
-            "translated_text": translations[0],
-            "source_language": response_json.get("l", "").split("2")[0],
+            "translated_text": translation["translated_text"],
+            "source_language": translation["detected_source"],
             "target_language": data["target_language"]
         }
         
+    except UPSTREAM_UNAVAILABLE as e:
+        raise translation_unavailable(e)
+    except httpx.TimeoutException:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Translation service timed out"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -171,17 +587,8 @@ async def translate_word(
         word = data["word"]
         target_language = data["target_language"]
         
-        # Use NLTK to get part of speech and English meanings
-        def get_word_meaning(word):
-            synsets = wordnet.synsets(word)
-            meanings = {}
-            for synset in synsets:
-                pos = synset.pos()  # Part of speech
-                definition = synset.definition()
-                meanings.setdefault(pos, []).append(definition)
-            return meanings
-
-        word_meaning = get_word_meaning(word)
+        # Part of speech and English meanings from the local WordNet index
+        word_meaning = dictionary_index.lookup(word)
         part_of_speech = list(word_meaning.keys())
         english_meanings = list(word_meaning.values())
         
@@ -201,29 +608,230 @@ async def translate_word(
             text=word,
             target_language=target_language
         )
-        params = translation_request.get_youdao_params()
-        response = requests.get(YOUDAO_API_URL, params=params)
-        response_json = response.json()
-        
-        if response_json.get("errorCode") != "0":
-            raise Exception(f"Youdao API error: {response_json.get('errorCode')}")
-        
-        # Extract translation from response
-        translations = response_json.get("translation", [])
-        if not translations:
-            raise Exception("No translation found in response")
+        try:
+            translation = await translate_cached(translation_request)
+        except UPSTREAM_UNAVAILABLE as e:
+            # Degraded answer: the dictionary part still works without Youdao
+            return {
+                "word": word,
+                "translated_word": None,
+                "part_of_speech": part_of_speech,
+                "english_meanings": english_meanings,
+                "source_language": "auto",
+                "target_language": target_language,
+                "degraded": True,
+                "retry_after": round(e.retry_after, 1)
+            }
         
         return {
             "word": word,
-            "translated_word": translations[0],
+            "translated_word": translation["translated_text"],
             "part_of_speech": part_of_speech,
             "english_meanings": english_meanings,
-            "source_language": response_json.get("l", "").split("2")[0],
+            "source_language": translation["detected_source"],
             "target_language": target_language
         }
         
+    except httpx.TimeoutException:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail="Translation service timed out"
+        )
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error translating word: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+@router.post("/batch", status_code=status.HTTP_200_OK)
+async def translate_batch(
+    data: Dict[str, Any] = Body(...),
+    current_user = Depends(get_current_user)
+):
+    """
+    Translate many texts (e.g. the words of an OCR result) at once
+    
+    - Requires authentication
+    - Request body:
+      {
+        "texts": ["Text to translate", ...],
+        "target_language": "zh" (language code, e.g., en, zh, ja, etc.)
+      }
+    - Duplicate texts are translated once and cached texts are not sent
+      upstream; the rest are packed into as few Youdao requests as the
+      API limits allow, sent in parallel
+    - Returns one result per input text, in input order, plus counts of
+      inputs, cache hits and upstream calls. A text whose upstream request
+      failed has translated_text null and an error message, and the
+      response is marked degraded
+    - Batch requests use the bulk lane of the Youdao quota, behind
+      single-word lookups
+    """
+    texts = data.get("texts")
+    if not isinstance(texts, list) or not texts or not all(isinstance(t, str) and t.strip() for t in texts):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="texts must be a non-empty list of non-empty strings"
+        )
+    if len(texts) > MAX_BATCH_TEXTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {MAX_BATCH_TEXTS} texts can be translated per request"
+        )
+    if not data.get("target_language"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Target language is required"
+        )
+    
+    target_language = data["target_language"]
+    translation_request = TranslationRequest(text="", target_language=target_language)
+    source = translation_request.source_language
+    target = translation_request.youdao_target_language()
+    
+    # Deduplicate on the cache key, keeping the first spelling seen
+    unique = {}
+    for text in texts:
+        unique.setdefault(normalize_text(text), text)
+    
+    # If Youdao credentials are not set, return dummy translations
+    if not YOUDAO_APP_KEY or not YOUDAO_APP_SECRET:
+        translations = {
+            key: {"translated_text": f"[Translation of '{text}' to {target_language}]", "detected_source": "auto"}
+            for key, text in unique.items()
+        }
+        cache_hits, upstream_calls, misses = 0, 0, []
+    else:
+        translations = {}
+        misses = []
+        for key, text in unique.items():
+            cached = await translation_cache.get(text, source, target)
+            if cached is not None:
+                translations[key] = {**cached, "cached": True}
+            else:
+                misses.append(text)
+        cache_hits = len(translations)
+        
+        batches = pack_batches(misses, settings.YOUDAO_BATCH_MAX_ITEMS, settings.YOUDAO_BATCH_MAX_CHARS)
+        upstream_calls = len(batches)
+        budget = asyncio.Semaphore(settings.TRANSLATION_BATCH_CONCURRENCY)
+        
+        async def send_pack(pack):
+            async with budget:
+                try:
+                    return pack, await translate_pack(translation_request, pack, BULK), None
+                except Exception as e:
+                    return pack, {}, translation_error_message(e)
+        
+        for pack, by_query, error in await asyncio.gather(*(send_pack(p) for p in batches)):
+            for text in pack:
+                key = normalize_text(text)
+                if key in by_query:
+                    translations[key] = by_query[key]
+                else:
+                    translations[key] = {"error": error or "No translation found in response"}
+    
+    results = []
+    for text in texts:
+        translation = translations[normalize_text(text)]
+        result = {
+            "text": text,
+            "translated_text": translation.get("translated_text"),
+            "source_language": translation.get("detected_source"),
+            "cached": translation.get("cached", False),
+        }
+        if "error" in translation:
+            result["error"] = translation["error"]
+        results.append(result)
+    
+    return {
+        "target_language": target_language,
+        "results": results,
+        "degraded": any("error" in result for result in results),
+        "stats": {
+            "inputs": len(texts),
+            "unique": len(unique),
+            "cache_hits": cache_hits,
+            "upstream_calls": upstream_calls,
+        }
+    }
+
+@router.post("/stream", status_code=status.HTTP_200_OK)
+async def translate_stream(
+    data: Dict[str, str] = Body(...),
+    current_user = Depends(get_current_user)
+):
+    """
+    Translate a long text (e.g. an OCR'd passage) chunk by chunk, streaming
+    each chunk back as soon as it and every chunk before it are translated
+    
+    - Requires authentication
+    - Request body: the same as /translate
+    - The text is split at paragraph breaks and sentence ends; the first
+      sentence is a chunk of its own, sent on its own so it arrives almost
+      immediately. The other chunks go together in Youdao batch calls
+      sent alongside it. Chunks are cached separately
+    - Returns newline-delimited JSON (application/x-ndjson), one object per line:
+      {"type": "start", "chunks": n, "target_language": "zh"}
+      {"type": "chunk", "index": 0, "text": "...", "separator": " ",
+       "translated_text": "...", "source_language": "en"}
+      ...
+      {"type": "end", "chunks": n, "degraded": false}
+      Joining every translated_text followed by its separator gives the
+      whole translation. A chunk that could not be translated has
+      translated_text null and an error message, and the stream ends
+      marked degraded
+    """
+    validate_translate_body(data)
+    
+    text = data["text"]
+    target_language = data["target_language"]
+    chunks = split_text(text, settings.TRANSLATION_CHUNK_CHARS)
+    
+    def line(item: dict) -> str:
+        return json.dumps(item, ensure_ascii=False) + "\n"
+    
+    async def stream_chunks():
+        yield line({"type": "start", "chunks": len(chunks), "target_language": target_language})
+        
+        # If Youdao credentials are not set, return dummy translations
+        if not YOUDAO_APP_KEY or not YOUDAO_APP_SECRET:
+            for index, (chunk, separator) in enumerate(chunks):
+                yield line({
+                    "type": "chunk",
+                    "index": index,
+                    "text": chunk,
+                    "separator": separator,
+                    "translated_text": f"[Translation of '{chunk}' to {target_language}]",
+                    "source_language": "auto"
+                })
+            yield line({"type": "end", "chunks": len(chunks), "degraded": False})
+            return
+        
+        degraded = False
+        futures = start_chunk_translations(chunks, target_language, first_alone=True)
+        try:
+            for index, ((chunk, separator), future) in enumerate(zip(chunks, futures)):
+                item = {"type": "chunk", "index": index, "text": chunk, "separator": separator}
+                try:
+                    translation = await future
+                    item["translated_text"] = translation["translated_text"]
+                    item["source_language"] = translation["detected_source"]
+                except Exception as e:
+                    degraded = True
+                    item["translated_text"] = None
+                    item["source_language"] = None
+                    item["error"] = translation_error_message(e)
+                yield line(item)
+        finally:
+            # The client went away: stop translating what it will not read
+            for future in futures:
+                future.cancel()
+        yield line({"type": "end", "chunks": len(chunks), "degraded": degraded})
+    
+    return StreamingResponse(
+        stream_chunks(),
+        media_type="application/x-ndjson",
+        # Proxies must pass each line on at once rather than buffer the response
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
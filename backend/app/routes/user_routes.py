@@ -4,7 +4,8 @@ from ..models.license_model import LicenseActivate, EmailLicenseRequest
 from ..auth.auth_handler import get_current_user
 from ..database.mongodb_connection import get_db, get_mongodb_client
 from ..database import mongodb_utils as mdb
-from ..database.license_db import activate_license, check_user_license, create_license
+from ..database.license_db import activate_license, create_license
+from ..database.license_db import get_user_license_status as get_cached_license_status
 from ..utils.email_utils import send_license_key_email
 from ..auth.license_checker import verify_license
 
@@ -107,7 +108,7 @@ async def get_user_license_status(
     user_id = current_user.user_id if hasattr(current_user, 'user_id') else current_user.id
     
     # Check license status
-    result = await check_user_license(db, user_id)
+    result = await get_cached_license_status(db, user_id)
     
     return {
         "has_valid_license": result["has_license"],
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, status, HTTPException
 from ..utils.timezone_utils import get_hk_time, HK_TIMEZONE
+from ..utils.metrics import collect_metrics
 from datetime import datetime, timezone
 
 router = APIRouter(tags=["Utilities"])
@@ -15,4 +16,9 @@ async def get_time():
         "hong_kong_time": hk_time.strftime("%Y-%m-%d %H:%M:%S %Z"),
         "timezone_offset": "+08:00",
         "timezone_name": "Asia/Hong_Kong"
-    } 
\ No newline at end of file
+    }
+
+@router.get("/metrics")
+async def get_metrics():
+    """Get in-process performance counters (worker pools, caches, etc.)"""
+    return collect_metrics()
@@ -2,12 +2,15 @@
 from fastapi import APIRouter, Depends, HTTPException, Body
 from typing import List, Optional
 from pydantic import BaseModel
+import json
 from ..dependencies import get_sqlite_storage, get_mongo_client
 from ..database.mongodb_utils.word import find_word as mongo_find_word
 from ..dependencies import get_current_user
 from ..dependencies import UserInToken
 from ..database import mongodb_utils as mdb
 from ..utils.logger import logger
+from ..utils.dictionary_index import dictionary_index
+from ..utils.translation_cache import translation_cache
 
 
 
@@ -26,8 +29,15 @@ class WordBase(BaseModel):
     ch_meaning: str
     part_of_speech: List[str]
 
-class WordCreate(WordBase):
-    pass
+class WordCreate(BaseModel):
+    """Only the word is required; blank fields are filled in by the server"""
+    word: str
+    en_meaning: Optional[str] = None
+    ch_meaning: Optional[str] = None
+    part_of_speech: Optional[List[str]] = None
+
+class WordBatchCreate(BaseModel):
+    words: List[WordCreate]
 
 class WordUpdate(BaseModel):
     en_meaning: Optional[str] = None
@@ -51,20 +61,83 @@ class WordResponse(BaseModel):
     created_at: Optional[str] = ""
     updated_at: Optional[str] = ""
 
+# Definitions kept per part of speech, as the app does when saving a word
+MAX_MEANINGS_PER_POS = 3
+
+# Language pair Chinese meanings are cached under by /translate/word
+CH_MEANING_LANGUAGES = ("auto", "zh-CHS")
+
+# Most words accepted by /words/batch in one request
+MAX_BATCH_WORDS = 1000
+
+def dictionary_fields(word: str):
+    """
+    en_meaning and part_of_speech of a word from the local dictionary
+
+    Uses the app's format: en_meaning is a JSON object mapping each part
+    of speech to its first definitions joined by commas, with satellite
+    adjectives ("s") counted as adjectives ("a").
+    """
+    meanings = {}
+    for pos, definitions in dictionary_index.lookup(word).items():
+        meanings.setdefault("a" if pos == "s" else pos, []).extend(definitions)
+    en_meaning = {
+        pos: ",".join(definitions[:MAX_MEANINGS_PER_POS]) for pos, definitions in meanings.items()
+    }
+    return json.dumps(en_meaning), list(meanings)
+
+async def autofill_words(words: List[WordCreate]) -> List[dict]:
+    """
+    Fill in the fields a client left blank, without calling Youdao
+
+    en_meaning and part_of_speech come from the dictionary index and
+    ch_meaning from the translation cache (under the language pair
+    /translate/word uses for Chinese); a word that was never translated
+    gets an empty ch_meaning. Fields the client sent are kept.
+    """
+    needs_translation = [w.word for w in words if not w.ch_meaning]
+    cached = await translation_cache.get_many(needs_translation, *CH_MEANING_LANGUAGES) if needs_translation else {}
+
+    filled = []
+    for word_data in words:
+        en_meaning = word_data.en_meaning
+        part_of_speech = word_data.part_of_speech
+        if not en_meaning or not part_of_speech:
+            dictionary_meaning, dictionary_pos = dictionary_fields(word_data.word)
+            en_meaning = en_meaning or dictionary_meaning
+            part_of_speech = part_of_speech or dictionary_pos
+        ch_meaning = word_data.ch_meaning
+        if not ch_meaning:
+            ch_meaning = cached.get(word_data.word, {}).get("translated_text", "")
+        filled.append({
+            "word": word_data.word,
+            "en_meaning": en_meaning,
+            "ch_meaning": ch_meaning,
+            "part_of_speech": part_of_speech,
+        })
+    return filled
+
 @router.post("/", response_model=Word, status_code=201)
 async def create_word(
     word_data: WordCreate,
     current_user: UserInToken = Depends(get_current_user),  # Get the authenticated user
     storage=Depends(get_sqlite_storage)
 ):
-    """Add a new word to the database (stored locally and synced when online)."""
+    """
+    Add a new word to the database (stored locally and synced when online).
+    
+    Only "word" is required: missing English meanings and parts of speech
+    come from the local dictionary and the Chinese meaning from the
+    translation cache, so no separate /translate/word call is needed.
+    """
     
     try:
+        filled = (await autofill_words([word_data]))[0]
         wordid = await storage.add_word(
-            word=word_data.word,
-            en_meaning=word_data.en_meaning,
-            ch_meaning=word_data.ch_meaning,
-            part_of_speech=word_data.part_of_speech,
+            word=filled["word"],
+            en_meaning=filled["en_meaning"],
+            ch_meaning=filled["ch_meaning"],
+            part_of_speech=filled["part_of_speech"],
             user_id= current_user.user_id
         )
         
@@ -77,6 +150,31 @@ async def create_word(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to create word: {str(e)}")
 
+@router.post("/batch", status_code=201)
+async def create_words(
+    batch: WordBatchCreate,
+    current_user: UserInToken = Depends(get_current_user),
+    storage=Depends(get_sqlite_storage)
+):
+    """
+    Add many words at once (bulk import), filling blank fields like POST /words/
+    
+    - Request body: {"words": [{"word": "apple"}, {"word": "pear", "ch_meaning": "梨"}, ...]}
+    - Words already stored are left unchanged and reported with "created": false
+    """
+    if len(batch.words) > MAX_BATCH_WORDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_WORDS} words per request")
+    
+    try:
+        filled = await autofill_words(batch.words)
+        stored = await storage.add_words(filled, user_id=current_user.user_id)
+        
+        words = [{**entry, **result} for entry, result in zip(filled, stored)]
+        created = sum(1 for result in stored if result["created"])
+        return {"words": words, "created": created, "existing": len(words) - created}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to create words: {str(e)}")
+
 @router.get("/all", response_model=List[WordResponse])
 async def get_all_words(
     current_user: UserInToken = Depends(get_current_user),
@@ -0,0 +1,42 @@
+import argparse
+import time
+
+from app.config import settings
+from app.utils.dictionary_data import DictionaryDataError, provision_data_dir, verify_data_dir
+from app.utils.dictionary_index import build_dictionary_index
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Provision the WordNet data directory (with checksums) and build the dictionary index"
+    )
+    parser.add_argument(
+        "--from", dest="source",
+        help="Directory with the WordNet database files (default: the local NLTK wordnet corpus)"
+    )
+    parser.add_argument(
+        "--download", action="store_true",
+        help="Download WordNet with NLTK if there is no local copy"
+    )
+    parser.add_argument(
+        "--verify-only", action="store_true",
+        help="Only check the existing data directory against its checksums"
+    )
+    parser.add_argument("--data-dir", default=settings.DICTIONARY_DATA_DIR, help="Data directory to fill")
+    parser.add_argument("--output", default=settings.DICTIONARY_INDEX_PATH, help="Index file to write")
+
+    args = parser.parse_args()
+
+    try:
+        if args.verify_only:
+            verify_data_dir(args.data_dir)
+            print(f"{args.data_dir} matches its checksums")
+        else:
+            started = time.perf_counter()
+            digest = provision_data_dir(args.data_dir, source=args.source, download=args.download)
+            count = build_dictionary_index(args.data_dir, args.output, digest)
+            print(
+                f"Provisioned {args.data_dir} and indexed {count} lemmas into {args.output} "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+    except DictionaryDataError as e:
+        parser.error(str(e))
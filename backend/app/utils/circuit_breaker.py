@@ -0,0 +1,77 @@
+"""
+Circuit breaker for calls to external services.
+
+After `failure_threshold` consecutive failures the breaker opens and
+callers fail fast with CircuitOpenError instead of waiting on a service
+that is down. After `reset_timeout` seconds it becomes half-open and lets
+calls through again: the next success closes it, the next failure opens
+it for another `reset_timeout`.
+"""
+import time
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because the circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable (retry in {retry_after:.1f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self.stats = {"opened": 0, "rejected": 0, "failures": 0}
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit becomes half-open"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def allow_request(self) -> bool:
+        if self.state == self.OPEN:
+            self.stats["rejected"] += 1
+            return False
+        return True
+
+    def check(self):
+        """Raise CircuitOpenError if calls are currently refused"""
+        if not self.allow_request():
+            raise CircuitOpenError(self.name, self.retry_after())
+
+    def record_success(self):
+        self._failures = 0
+        self._state = self.CLOSED
+
+    def record_failure(self):
+        self.stats["failures"] += 1
+        self._failures += 1
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self.trip()
+
+    def trip(self):
+        """Open the circuit now"""
+        if self._state != self.OPEN:
+            self.stats["opened"] += 1
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+
+    def get_metrics(self):
+        return {"state": self.state, "consecutive_failures": self._failures, **self.stats}
@@ -0,0 +1,158 @@
+"""
+Local WordNet data for the dictionary index.
+
+The API never downloads anything while starting. The WordNet database
+files live in DICTIONARY_DATA_DIR next to a SHA256SUMS manifest (the
+`sha256sum` format), put there once per host by the provisioning step:
+
+    python -m app.scripts.provision_dictionary [--from DIR | --download]
+
+The files are only read when the dictionary index has to be (re)built,
+and only after every checksum matches the manifest. Without a data
+directory an NLTK WordNet corpus that is already installed locally is
+used instead; nothing is fetched over the network.
+"""
+import os
+import shutil
+import hashlib
+import logging
+import tempfile
+from typing import Callable, Dict, IO, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "SHA256SUMS"
+
+# Files the index is built from
+WORDNET_DATA_FILES = [
+    f"{kind}.{suffix}" for suffix in ("noun", "verb", "adj", "adv") for kind in ("index", "data")
+] + [f"{suffix}.exc" for suffix in ("noun", "verb", "adj", "adv")]
+
+class DictionaryDataError(Exception):
+    """The data directory is incomplete or does not match its manifest"""
+
+def wordnet_opener(source) -> Callable[[str], IO[bytes]]:
+    """Open WordNet files from a directory or an NLTK path pointer (e.g. a zip)"""
+    if isinstance(source, str):
+        return lambda name: open(os.path.join(source, name), "rb")
+    return lambda name: source.join(name).open()
+
+def local_nltk_wordnet():
+    """The WordNet corpus NLTK has installed locally, or None (never downloads)"""
+    try:
+        import nltk
+        return nltk.data.find("corpora/wordnet")
+    except LookupError:
+        return None
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def read_manifest(directory: str) -> Dict[str, str]:
+    """File name -> expected SHA-256, or {} when there is no manifest"""
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    manifest = {}
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                checksum, name = line.split(maxsplit=1)
+                manifest[name.strip().lstrip("*")] = checksum
+    return manifest
+
+def manifest_digest(directory: str) -> Optional[str]:
+    """Fingerprint of a data directory's manifest (None without one)"""
+    path = os.path.join(directory, MANIFEST_NAME)
+    return file_sha256(path) if os.path.exists(path) else None
+
+def verify_data_dir(directory: str) -> str:
+    """
+    Check every WordNet file against the manifest
+
+    Returns:
+        The manifest digest, recorded in the index built from the files
+
+    Raises:
+        DictionaryDataError: on a missing manifest or file, or a mismatch
+    """
+    manifest = read_manifest(directory)
+    if not manifest:
+        raise DictionaryDataError(f"No {MANIFEST_NAME} in {directory}")
+    for name in WORDNET_DATA_FILES:
+        path = os.path.join(directory, name)
+        if name not in manifest or not os.path.exists(path):
+            raise DictionaryDataError(f"{name} missing from {directory}")
+        if file_sha256(path) != manifest[name]:
+            raise DictionaryDataError(f"Checksum mismatch for {name} in {directory}")
+    return manifest_digest(directory)
+
+def provision_data_dir(directory: str, source=None, download: bool = False) -> str:
+    """
+    Fill `directory` with the WordNet files and write their manifest
+
+    Args:
+        directory: Data directory to (re)create
+        source: Directory or NLTK path pointer to copy from; defaults to
+            the locally installed NLTK corpus
+        download: Fetch the corpus with NLTK's downloader when there is
+            no local copy (the only step that uses the network)
+
+    Returns:
+        The manifest digest of the provisioned directory
+    """
+    with tempfile.TemporaryDirectory() as download_dir:
+        if source is None:
+            source = local_nltk_wordnet()
+        if source is None and download:
+            import nltk
+            if not nltk.download("wordnet", download_dir=download_dir, quiet=True):
+                raise DictionaryDataError("Downloading WordNet failed")
+            source = nltk.data.find("corpora/wordnet", paths=[download_dir])
+        if source is None:
+            raise DictionaryDataError("No WordNet source found; pass a directory or allow downloading")
+
+        # Copy into a sibling directory and swap it in, so readers never
+        # see a half-written data directory
+        open_file = wordnet_opener(source)
+        parent = os.path.dirname(os.path.abspath(directory))
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=parent, prefix=".wordnet-")
+        try:
+            lines = []
+            for name in WORDNET_DATA_FILES:
+                with open_file(name) as src, open(os.path.join(staging, name), "wb") as dst:
+                    shutil.copyfileobj(src, dst)
+                lines.append(f"{file_sha256(os.path.join(staging, name))}  {name}\n")
+            with open(os.path.join(staging, MANIFEST_NAME), "w") as f:
+                f.writelines(lines)
+            if os.path.exists(directory):
+                shutil.rmtree(directory)
+            os.replace(staging, directory)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+    return verify_data_dir(directory)
+
+def resolve_wordnet_source(directory: str):
+    """
+    Where to build the index from: the verified data directory, else a
+    local NLTK corpus
+
+    Returns:
+        (source, manifest digest or None), or (None, None) if there is
+        no usable data
+
+    Raises:
+        DictionaryDataError: if the data directory exists but fails verification
+    """
+    if os.path.isdir(directory):
+        return directory, verify_data_dir(directory)
+    source = local_nltk_wordnet()
+    if source is not None:
+        logger.info(f"No dictionary data in {directory}; using the local NLTK WordNet corpus")
+    return source, None
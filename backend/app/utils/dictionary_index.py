@@ -0,0 +1,336 @@
+"""
+Precomputed WordNet dictionary index.
+
+Looking a word up with `nltk.corpus.wordnet.synsets` loads the whole
+corpus into Python on first use (seconds) and then walks synset objects
+on every call. The index is built once from the WordNet database files
+into a read-only SQLite table from lemma to its senses, grouped by
+part of speech in WordNet order, plus the morphology exception lists.
+
+A lookup is one or two indexed reads. Inflected forms ("dogs", "ran",
+"better") are reduced with the same rules and exception lists NLTK's
+morphy uses, so `lookup` returns exactly what grouping `synsets(word)`
+by `synset.pos()` returned. The file is opened lazily and read-only;
+every worker on the host maps the same pages through the OS cache.
+
+The index is built from the verified local data directory (see
+dictionary_data) in a background thread at startup when it is missing
+or the data changed; until then lookups return no definitions.
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+
+from ..config import settings
+from .dictionary_data import DictionaryDataError, manifest_digest, resolve_wordnet_source, wordnet_opener
+from .metrics import register_metrics_source
+
+logger = logging.getLogger(__name__)
+
+# Bumped whenever the table layout changes, so old files are rebuilt
+INDEX_FORMAT = "1"
+
+# Parts of speech in the order NLTK returns synsets for them
+POS_ORDER = ("n", "v", "a", "r")
+WORDNET_FILES = {"n": "noun", "v": "verb", "a": "adj", "r": "adv"}
+
+# WordNet's detachment rules, as applied by NLTK's morphy
+MORPHOLOGICAL_SUBSTITUTIONS = {
+    "n": [
+        ("s", ""),
+        ("ses", "s"),
+        ("ves", "f"),
+        ("xes", "x"),
+        ("zes", "z"),
+        ("ches", "ch"),
+        ("shes", "sh"),
+        ("men", "man"),
+        ("ies", "y"),
+    ],
+    "v": [
+        ("s", ""),
+        ("ies", "y"),
+        ("es", "e"),
+        ("es", ""),
+        ("ed", "e"),
+        ("ed", ""),
+        ("ing", "e"),
+        ("ing", ""),
+    ],
+    "a": [("er", ""), ("est", ""), ("er", "e"), ("est", "e")],
+    "r": [],
+}
+
+def parse_definition(data_line: str) -> str:
+    """Definition part of a data file line's gloss (examples removed)"""
+    gloss = data_line.strip().split("|", 1)[1]
+    return re.sub(r"[\"].*?[\"]", "", gloss).strip().strip("; ")
+
+def build_dictionary_index(source, path: str, data_digest: str = None) -> int:
+    """
+    Build the index at `path` from WordNet database files
+
+    Args:
+        source: directory holding index.noun, data.noun, noun.exc, ...
+            or an NLTK path pointer to one
+        path: SQLite file to write; replaced atomically when done
+        data_digest: Manifest digest of the data, to notice when it changes
+
+    Returns:
+        Number of lemmas indexed
+    """
+    open_file = wordnet_opener(source)
+    lemmas: Dict[str, Dict[str, List[List[str]]]] = {}
+    exceptions = []
+
+    for pos in POS_ORDER:
+        suffix = WORDNET_FILES[pos]
+
+        # offset -> (synset pos, definition); adjective files mix "a" and "s"
+        synsets = {}
+        with open_file(f"data.{suffix}") as data_file:
+            for raw in data_file:
+                line = raw.decode("utf-8")
+                if line.startswith(" "):
+                    continue
+                offset, _, synset_pos = line.split(" ", 3)[:3]
+                synsets[int(offset)] = [synset_pos, parse_definition(line)]
+
+        with open_file(f"index.{suffix}") as index_file:
+            for raw in index_file:
+                line = raw.decode("utf-8")
+                if line.startswith(" "):
+                    continue
+                fields = line.split()
+                synset_count = int(fields[2])
+                offsets = fields[len(fields) - synset_count:]
+                lemmas.setdefault(fields[0], {})[pos] = [synsets[int(o)] for o in offsets]
+
+        with open_file(f"{suffix}.exc") as exc_file:
+            for raw in exc_file:
+                terms = raw.decode("utf-8").split()
+                if terms:
+                    exceptions.append((terms[0], pos, json.dumps(terms[1:])))
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+    connection = sqlite3.connect(temp_path)
+    try:
+        connection.executescript("""
+            CREATE TABLE lemmas (lemma TEXT PRIMARY KEY, senses TEXT NOT NULL) WITHOUT ROWID;
+            CREATE TABLE exceptions (
+                form TEXT NOT NULL,
+                pos TEXT NOT NULL,
+                lemmas TEXT NOT NULL,
+                PRIMARY KEY (form, pos)
+            ) WITHOUT ROWID;
+            CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        """)
+        connection.executemany(
+            "INSERT INTO lemmas VALUES (?, ?)",
+            ((lemma, json.dumps(senses, ensure_ascii=False, separators=(",", ":")))
+             for lemma, senses in lemmas.items()),
+        )
+        connection.executemany("INSERT OR REPLACE INTO exceptions VALUES (?, ?, ?)", exceptions)
+        connection.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [
+                ("format", INDEX_FORMAT),
+                ("data_digest", data_digest or ""),
+                ("lemmas", str(len(lemmas))),
+                ("built_at", str(time.time())),
+            ],
+        )
+        connection.commit()
+        connection.execute("VACUUM")
+    finally:
+        connection.close()
+    # Workers starting together may all build; the last rename wins harmlessly
+    os.replace(temp_path, path)
+    return len(lemmas)
+
+class DictionaryIndex:
+    """Read-only lemma -> {pos: [definitions]} lookups backed by SQLite"""
+
+    def __init__(self, path: str, data_dir: str = None, memory_size: int = 4096):
+        self.path = path
+        self.data_dir = data_dir
+        self.memory_size = memory_size
+        self._local = threading.local()
+        self._build_lock = threading.Lock()
+        self._builder = None
+        self._memory = OrderedDict()  # word -> meanings
+        self.stats = {"lookups": 0, "memory_hits": 0, "found": 0, "not_found": 0, "total_time": 0.0}
+
+    def available(self, data_digest: str = None) -> bool:
+        """
+        Whether an index in the current format exists at `path` (built
+        from the data with this manifest digest, when one is given)
+        """
+        if not os.path.exists(self.path):
+            return False
+        try:
+            meta = dict(self._connection().execute("SELECT key, value FROM meta").fetchall())
+        except sqlite3.Error:
+            return False
+        if meta.get("format") != INDEX_FORMAT:
+            return False
+        return data_digest is None or meta.get("data_digest") == data_digest
+
+    def ensure_built(self, source=None) -> bool:
+        """
+        Build the index if it is missing, outdated or its data changed
+
+        Without `source` the data directory is used (after verifying its
+        checksums), else a local NLTK corpus. Returns False when there is
+        no index and no usable data to build it from.
+        """
+        with self._build_lock:
+            data_digest = None
+            if source is None and self.data_dir and os.path.isdir(self.data_dir):
+                data_digest = manifest_digest(self.data_dir)
+            if self.available(data_digest):
+                return True
+            if source is None:
+                try:
+                    source, data_digest = resolve_wordnet_source(self.data_dir or "")
+                except DictionaryDataError as e:
+                    logger.error(f"Dictionary data unusable, not building the index: {e}")
+                    return False
+            if source is None:
+                logger.warning(
+                    "WordNet data not found; run `python -m app.scripts.provision_dictionary`. "
+                    "Dictionary lookups will be empty"
+                )
+                return False
+            started = time.perf_counter()
+            count = build_dictionary_index(source, self.path, data_digest)
+            self.reset()
+            logger.info(
+                f"Built dictionary index with {count} lemmas in {time.perf_counter() - started:.1f}s"
+            )
+            return True
+
+    def _build_quietly(self):
+        try:
+            self.ensure_built()
+        except Exception as e:
+            logger.error(f"Building the dictionary index failed: {e}")
+
+    def start_background_build(self) -> threading.Thread:
+        """Check (and if needed build) the index without delaying startup"""
+        if self._builder is None or not self._builder.is_alive():
+            self._builder = threading.Thread(
+                target=self._build_quietly, name="dictionary-index", daemon=True
+            )
+            self._builder.start()
+        return self._builder
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            uri = f"file:{os.path.abspath(self.path)}?mode=ro"
+            connection = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            self._local.connection = connection
+        return connection
+
+    def _fetch(self, sql: str, params) -> list:
+        if not os.path.exists(self.path):
+            return []
+        return self._connection().execute(sql, params).fetchall()
+
+    def _candidates(self, word: str) -> Dict[str, List[str]]:
+        """Forms morphy would try for each part of speech, in its order"""
+        exceptions = {
+            pos: json.loads(lemmas)
+            for pos, lemmas in self._fetch("SELECT pos, lemmas FROM exceptions WHERE form = ?", (word,))
+        }
+        candidates = {}
+        for pos in POS_ORDER:
+            if pos in exceptions:
+                forms = exceptions[pos]
+            else:
+                forms = [
+                    word[: -len(old)] + new
+                    for old, new in MORPHOLOGICAL_SUBSTITUTIONS[pos]
+                    if word.endswith(old)
+                ]
+            candidates[pos] = list(dict.fromkeys([word] + forms))
+        return candidates
+
+    def _lookup(self, word: str) -> Dict[str, List[str]]:
+        candidates = self._candidates(word)
+        forms = list({form for pos_forms in candidates.values() for form in pos_forms})
+        placeholders = ",".join("?" * len(forms))
+        entries = {
+            lemma: json.loads(senses)
+            for lemma, senses in self._fetch(
+                f"SELECT lemma, senses FROM lemmas WHERE lemma IN ({placeholders})", forms
+            )
+        }
+        meanings: Dict[str, List[str]] = {}
+        for pos in POS_ORDER:
+            for form in candidates[pos]:
+                for synset_pos, definition in entries.get(form, {}).get(pos, []):
+                    meanings.setdefault(synset_pos, []).append(definition)
+        return meanings
+
+    def lookup(self, word: str) -> Dict[str, List[str]]:
+        """
+        English definitions of a word grouped by part of speech
+
+        Same result as grouping `wordnet.synsets(word)` by `synset.pos()`:
+        keys are "n", "v", "a", "s" (satellite adjective) and "r", in the
+        order they first occur; an unknown word gives an empty dict.
+        """
+        started = time.perf_counter()
+        self.stats["lookups"] += 1
+        word = word.lower()
+        meanings = self._memory.get(word)
+        if meanings is not None:
+            self._memory.move_to_end(word)
+            self.stats["memory_hits"] += 1
+        else:
+            meanings = self._lookup(word)
+            self._memory[word] = meanings
+            if len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+        self.stats["found" if meanings else "not_found"] += 1
+        self.stats["total_time"] += time.perf_counter() - started
+        # Callers get their own lists; the cached entry stays intact
+        return {pos: list(definitions) for pos, definitions in meanings.items()}
+
+    def reset(self):
+        """Drop cached entries and connections (after the file was rebuilt)"""
+        self._memory.clear()
+        self._local = threading.local()
+
+    def get_metrics(self):
+        lookups = self.stats["lookups"]
+        return {
+            "path": self.path,
+            "available": os.path.exists(self.path),
+            "building": self._builder is not None and self._builder.is_alive(),
+            "lookups": lookups,
+            "memory_hits": self.stats["memory_hits"],
+            "found": self.stats["found"],
+            "not_found": self.stats["not_found"],
+            "memory_entries": len(self._memory),
+            "avg_lookup_ms": round(self.stats["total_time"] / lookups * 1000, 3) if lookups else 0.0,
+        }
+
+dictionary_index = DictionaryIndex(
+    path=settings.DICTIONARY_INDEX_PATH,
+    data_dir=settings.DICTIONARY_DATA_DIR,
+    memory_size=settings.DICTIONARY_INDEX_MEMORY_SIZE,
+)
+register_metrics_source("dictionary_index", dictionary_index.get_metrics)
@@ -0,0 +1,356 @@
+"""
+Persistent email outbox.
+
+Request handlers enqueue emails into a SQLite table and return at once.
+A background worker claims pending emails in batches and sends each
+batch over one reused SMTP session (see SMTPSession in email_utils.py),
+so STARTTLS and login happen once per connection instead of once per
+email.
+
+Failed sends are retried with exponential backoff
+(EMAIL_OUTBOX_RETRY_BASE * 2^attempt seconds, at most 10 minutes) until
+EMAIL_OUTBOX_MAX_ATTEMPTS is reached; permanent (5xx) SMTP errors fail
+the email immediately. Claims are a single UPDATE ... RETURNING, so
+several uvicorn workers can drain the same outbox file. A worker records
+each email as soon as it is sent and renews the claim on the rest of its
+batch in the same transaction, so a slow batch is never mistaken for a
+crashed worker's and sent twice.
+"""
+import os
+import time
+import smtplib
+import asyncio
+import logging
+from typing import Optional, Dict, Any, List
+
+import aiosqlite
+
+from ..config import settings
+from .email_utils import SMTPSession, build_email_message, get_email_config, is_permanent_smtp_error
+from .metrics import register_metrics_source
+
+logger = logging.getLogger(__name__)
+
+MAX_RETRY_DELAY = 600
+# Emails stuck in "sending" this long (worker crashed) are retried. Claims
+# are renewed after every email, so this only has to outlast sending one:
+# connect, STARTTLS, login and send, each up to the 30 s SMTP timeout
+STALE_CLAIM_TIMEOUT = 300
+
+class EmailOutbox:
+    """SQLite-backed queue of outgoing emails"""
+
+    def __init__(self, db_path: str, max_attempts: int = 5, retry_base: float = 5):
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.connection = None
+        self._connect_lock = asyncio.Lock()
+
+    async def connect(self):
+        """Open the outbox database, creating the table if needed"""
+        async with self._connect_lock:
+            if self.connection is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+                connection = await aiosqlite.connect(self.db_path)
+                connection.row_factory = aiosqlite.Row
+                await connection.execute("PRAGMA journal_mode=WAL")
+                await connection.execute("PRAGMA busy_timeout=5000")
+                await connection.execute("""
+                    CREATE TABLE IF NOT EXISTS email_outbox (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        recipient TEXT NOT NULL,
+                        subject TEXT NOT NULL,
+                        text_content TEXT NOT NULL,
+                        html_content TEXT,
+                        job_id TEXT,
+                        status TEXT NOT NULL DEFAULT 'pending',
+                        attempts INTEGER NOT NULL DEFAULT 0,
+                        next_attempt_at REAL NOT NULL,
+                        claimed_at REAL,
+                        sent_at REAL,
+                        last_error TEXT,
+                        created_at REAL NOT NULL
+                    )
+                """)
+                await connection.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_outbox_pending ON email_outbox (status, next_attempt_at)"
+                )
+                await connection.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_outbox_job ON email_outbox (job_id, status)"
+                )
+                await connection.commit()
+                self.connection = connection
+        return self.connection
+
+    async def enqueue(
+        self,
+        recipient: str,
+        subject: str,
+        text_content: str,
+        html_content: str = None,
+        job_id: str = None,
+    ) -> int:
+        """Add an email to the outbox and return its ID"""
+        db = await self.connect()
+        now = time.time()
+        cursor = await db.execute(
+            """INSERT INTO email_outbox
+               (recipient, subject, text_content, html_content, job_id, next_attempt_at, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (recipient, subject, text_content, html_content, job_id, now, now)
+        )
+        await db.commit()
+        return cursor.lastrowid
+
+    async def enqueue_many(self, emails: List[Dict[str, Any]], job_id: str = None) -> int:
+        """Add many emails in one transaction
+
+        Each email is a dict with recipient, subject, text_content and
+        optionally html_content.
+        """
+        db = await self.connect()
+        now = time.time()
+        await db.executemany(
+            """INSERT INTO email_outbox
+               (recipient, subject, text_content, html_content, job_id, next_attempt_at, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            [
+                (email["recipient"], email["subject"], email["text_content"],
+                 email.get("html_content"), job_id, now, now)
+                for email in emails
+            ]
+        )
+        await db.commit()
+        return len(emails)
+
+    async def claim_batch(self, limit: int) -> List[aiosqlite.Row]:
+        """Mark up to `limit` due emails as sending and return them"""
+        db = await self.connect()
+        now = time.time()
+        cursor = await db.execute(
+            """UPDATE email_outbox
+               SET status = 'sending', claimed_at = ?
+               WHERE id IN (
+                   SELECT id FROM email_outbox
+                   WHERE (status = 'pending' AND next_attempt_at <= ?)
+                      OR (status = 'sending' AND claimed_at <= ?)
+                   ORDER BY next_attempt_at
+                   LIMIT ?
+               )
+               RETURNING *""",
+            (now, now, now - STALE_CLAIM_TIMEOUT, limit)
+        )
+        rows = await cursor.fetchall()
+        await db.commit()
+        return rows
+
+    async def record_results(self, results: List[tuple], still_claimed: List[int] = ()):
+        """Store the outcome of sent emails
+
+        Args:
+            results: (row, error) pairs; error is None for a sent email
+            still_claimed: IDs of claimed emails not sent yet; their claim
+                is renewed so other workers do not take them as stale
+            
+        Returns:
+            Number of emails per new status ("sent", "pending" or "failed")
+        """
+        db = await self.connect()
+        now = time.time()
+        counts = {"sent": 0, "pending": 0, "failed": 0}
+        if still_claimed:
+            await db.execute(
+                f"""UPDATE email_outbox SET claimed_at = ?
+                    WHERE status = 'sending' AND id IN ({",".join("?" * len(still_claimed))})""",
+                (now, *still_claimed)
+            )
+        for row, error in results:
+            if error is None:
+                counts["sent"] += 1
+                await db.execute(
+                    "UPDATE email_outbox SET status = 'sent', sent_at = ?, attempts = attempts + 1 WHERE id = ?",
+                    (now, row["id"])
+                )
+                continue
+
+            attempts = row["attempts"] + 1
+            if attempts >= self.max_attempts or is_permanent_smtp_error(error):
+                status, next_attempt_at = "failed", row["next_attempt_at"]
+            else:
+                delay = min(self.retry_base * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+                status, next_attempt_at = "pending", now + delay
+            counts[status] += 1
+            await db.execute(
+                """UPDATE email_outbox
+                   SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ?
+                   WHERE id = ?""",
+                (status, attempts, next_attempt_at, str(error)[:500], row["id"])
+            )
+        await db.commit()
+        return counts
+
+    async def next_due_in(self) -> Optional[float]:
+        """Seconds until the next pending email is due, or None if there are none"""
+        db = await self.connect()
+        cursor = await db.execute(
+            "SELECT MIN(next_attempt_at) FROM email_outbox WHERE status = 'pending'"
+        )
+        row = await cursor.fetchone()
+        if row[0] is None:
+            return None
+        return max(0.0, row[0] - time.time())
+
+    async def status_counts(self, job_id: str = None) -> Dict[str, int]:
+        """Number of emails per status, optionally for one job"""
+        db = await self.connect()
+        if job_id is None:
+            cursor = await db.execute("SELECT status, COUNT(*) FROM email_outbox GROUP BY status")
+        else:
+            cursor = await db.execute(
+                "SELECT status, COUNT(*) FROM email_outbox WHERE job_id = ? GROUP BY status", (job_id,)
+            )
+        return {status: count for status, count in await cursor.fetchall()}
+
+    async def close(self):
+        if self.connection is not None:
+            await self.connection.close()
+            self.connection = None
+
+class EmailOutboxWorker:
+    """Background task draining an EmailOutbox over one SMTP session"""
+
+    def __init__(
+        self,
+        outbox: EmailOutbox,
+        session: SMTPSession = None,
+        batch_size: int = 50,
+        poll_interval: float = 2,
+    ):
+        self.outbox = outbox
+        self.session = session
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.stats = {"sent": 0, "retried": 0, "failed": 0, "batches": 0}
+        self._wake = asyncio.Event()
+        self._task = None
+
+    def wake(self):
+        """Start sending now instead of at the next poll"""
+        self._wake.set()
+
+    def _send_one(self, row) -> tuple:
+        """Send a claimed email over the shared session (runs in a thread)"""
+        if self.session is None:
+            self.session = SMTPSession(get_email_config(), idle_timeout=settings.SMTP_IDLE_TIMEOUT)
+        sender = self.session.email_config["email_sender"]
+        try:
+            message = build_email_message(
+                sender, row["recipient"], row["subject"], row["text_content"], row["html_content"]
+            )
+            self.session.send(row["recipient"], message)
+            return row, None
+        except Exception as e:
+            logger.warning(f"Failed to send email {row['id']} to {row['recipient']}: {e}")
+            if not isinstance(e, (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException)):
+                # Connection-level error: start the next message on a fresh connection
+                self.session.close()
+            return row, e
+
+    async def run_once(self) -> int:
+        """Claim and send one batch; returns the number of emails claimed"""
+        rows = await self.outbox.claim_batch(self.batch_size)
+        if not rows:
+            return 0
+        for index, row in enumerate(rows):
+            result = await asyncio.to_thread(self._send_one, row)
+            counts = await self.outbox.record_results(
+                [result], still_claimed=[waiting["id"] for waiting in rows[index + 1:]]
+            )
+            self.stats["sent"] += counts["sent"]
+            self.stats["retried"] += counts["pending"]
+            self.stats["failed"] += counts["failed"]
+        self.stats["batches"] += 1
+        return len(rows)
+
+    async def _loop(self):
+        while True:
+            try:
+                while await self.run_once():
+                    pass
+                due_in = await self.outbox.next_due_in()
+            except Exception as e:
+                logger.error(f"Email outbox worker error: {e}")
+                due_in = None
+
+            timeout = self.poll_interval if due_in is None else min(due_in, self.poll_interval)
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                if self.session is not None:
+                    # Drop the SMTP connection once the server would time it out anyway
+                    if time.monotonic() - self.session.last_used > self.session.idle_timeout:
+                        await asyncio.to_thread(self.session.close)
+            self._wake.clear()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.session is not None:
+            await asyncio.to_thread(self.session.close)
+
+    def get_metrics(self):
+        connections = self.session.connections if self.session is not None else 0
+        return {**self.stats, "smtp_connections": connections}
+
+email_outbox = EmailOutbox(
+    settings.EMAIL_OUTBOX_DB_PATH,
+    max_attempts=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+    retry_base=settings.EMAIL_OUTBOX_RETRY_BASE
+)
+email_worker = EmailOutboxWorker(
+    email_outbox,
+    batch_size=settings.EMAIL_OUTBOX_BATCH_SIZE,
+    poll_interval=settings.EMAIL_OUTBOX_POLL_INTERVAL
+)
+register_metrics_source("email_outbox", email_worker.get_metrics)
+
+async def enqueue_email(
+    recipient: str,
+    subject: str,
+    text_content: str,
+    html_content: str = None,
+    job_id: str = None,
+) -> int:
+    """Queue an email for the background worker and wake it"""
+    email_id = await email_outbox.enqueue(recipient, subject, text_content, html_content, job_id)
+    email_worker.wake()
+    return email_id
+
+async def enqueue_emails(emails: List[Dict[str, Any]], job_id: str = None) -> int:
+    """Queue many emails in one transaction and wake the worker"""
+    count = await email_outbox.enqueue_many(emails, job_id)
+    email_worker.wake()
+    return count
+
+async def get_job_progress(job_id: str) -> Dict[str, int]:
+    """Number of a job's emails per outbox status"""
+    return await email_outbox.status_counts(job_id)
+
+def start_email_worker():
+    """Start the background task sending queued emails"""
+    email_worker.start()
+
+async def stop_email_worker():
+    """Stop the email worker and close the outbox"""
+    await email_worker.stop()
+    await email_outbox.close()
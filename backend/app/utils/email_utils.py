@@ -10,6 +10,7 @@ from ..config import settings
 import logging
 from typing import Optional, Dict, Any
 import asyncio
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -26,6 +27,101 @@ def get_email_config():
     
     return email_config
 
+def build_email_message(
+    sender: str,
+    recipient_email: str,
+    subject: str,
+    text_content: str,
+    html_content: str = None,
+) -> str:
+    """Build a plain text (and optional HTML) email and return it as a string"""
+    # Create a multipart message and set headers
+    message = MIMEMultipart("alternative")
+    message["From"] = sender
+    message["To"] = recipient_email
+    message["Subject"] = subject
+
+    # Add body to email
+    message.attach(MIMEText(text_content, "plain"))
+    if html_content:
+        message.attach(MIMEText(html_content, "html"))
+    
+    return message.as_string()
+
+def is_permanent_smtp_error(error: Exception) -> bool:
+    """Whether retrying the same message can not succeed (5xx replies)"""
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(500 <= code < 600 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 500 <= error.smtp_code < 600
+    return False
+
+class SMTPSession:
+    """
+    A reusable SMTP connection.
+    
+    Connects, does STARTTLS and logs in on first use, then keeps the
+    connection open for later messages. A connection idle for longer than
+    idle_timeout is checked with NOOP before reuse, and a dropped
+    connection is reopened once per message. Not thread-safe: use one
+    session from one thread at a time.
+    """
+    
+    def __init__(self, email_config: Optional[Dict[str, Any]] = None, idle_timeout: float = 60):
+        self.email_config = email_config or get_email_config()
+        self.idle_timeout = idle_timeout
+        self.server = None
+        self.last_used = 0.0
+        self.connections = 0
+    
+    def _connect(self):
+        config = self.email_config
+        server = smtplib.SMTP(config["smtp_server"], config["smtp_port"], timeout=30)
+        try:
+            if config["use_tls"]:
+                server.starttls(context=ssl.create_default_context())
+            if config["email_password"]:
+                server.login(config["email_username"], config["email_password"])
+        except Exception:
+            server.close()
+            raise
+        self.server = server
+        self.connections += 1
+    
+    def _is_alive(self) -> bool:
+        try:
+            return self.server.noop()[0] == 250
+        except smtplib.SMTPException:
+            return False
+        except OSError:
+            return False
+    
+    def send(self, recipient_email: str, message: str):
+        """Send one message, raising the smtplib error if it fails"""
+        if self.server is not None and time.monotonic() - self.last_used > self.idle_timeout:
+            if not self._is_alive():
+                self.close()
+        
+        for attempt in range(2):
+            if self.server is None:
+                self._connect()
+            try:
+                self.server.sendmail(self.email_config["email_sender"], recipient_email, message)
+                self.last_used = time.monotonic()
+                return
+            except smtplib.SMTPServerDisconnected:
+                self.close()
+                if attempt:
+                    raise
+    
+    def close(self):
+        if self.server is not None:
+            try:
+                self.server.quit()
+            except Exception:
+                self.server.close()
+            self.server = None
+
 def send_email(
     recipient_email: str,
     subject: str,
@@ -36,6 +132,9 @@ def send_email(
     """
     Send an email using the configured email settings.
     
+    Opens a dedicated SMTP connection; application emails go through the
+    outbox (see email_outbox.py) instead.
+    
     Args:
         recipient_email: The recipient's email address
         subject: Email subject
@@ -49,35 +148,16 @@ def send_email(
     if email_config is None:
         email_config = get_email_config()
 
+    session = SMTPSession(email_config)
     try:
-        # Create a multipart message and set headers
-        message = MIMEMultipart("alternative")
-        message["From"] = email_config["email_sender"]
-        message["To"] = recipient_email
-        message["Subject"] = subject
-
-        # Add body to email
-        message.attach(MIMEText(text_content, "plain"))
-        if html_content:
-            message.attach(MIMEText(html_content, "html"))
+        message = build_email_message(
+            email_config["email_sender"], recipient_email, subject, text_content, html_content
+        )
 
         # Log attempt to send email
         logger.info(f"Attempting to send email to {recipient_email}")
         
-        # Create secure connection with server and send email
-        with smtplib.SMTP(email_config["smtp_server"], email_config["smtp_port"]) as server:
-            if email_config["use_tls"]:
-                server.starttls()
-            
-            # Login to email account
-            server.login(email_config["email_username"], email_config["email_password"])
-            
-            # Send email
-            server.sendmail(
-                email_config["email_sender"],
-                recipient_email,
-                message.as_string(),
-            )
+        session.send(recipient_email, message)
         
         logger.info(f"Email sent successfully to {recipient_email}")
         return True
@@ -85,18 +165,19 @@ def send_email(
     except Exception as e:
         logger.error(f"Failed to send email: {str(e)}")
         return False
+    finally:
+        session.close()
 
-async def send_license_key_email(recipient_email, license_key, username=None):
+def build_license_key_email(license_key, username=None):
     """
-    Send an email with a license key to a user.
+    Build the license key email.
     
     Args:
-        recipient_email: The recipient's email address
         license_key: The license key to send
         username: The username (optional)
     
     Returns:
-        dict: Dictionary with 'success' boolean and 'message' string
+        tuple: (subject, text_content, html_content)
     """
     # Create the subject
     subject = "Your Language Tutor License Key"
@@ -132,22 +213,40 @@ The Language Tutor Team
 </html>
 """
     
-    # Send the email
-    success = await asyncio.to_thread(
-        send_email,
-        recipient_email=recipient_email,
-        subject=subject,
-        text_content=text_content,
-        html_content=html_content
-    )
+    return subject, text_content, html_content
+
+async def send_license_key_email(recipient_email, license_key, username=None):
+    """
+    Send an email with a license key to a user.
+    
+    Args:
+        recipient_email: The recipient's email address
+        license_key: The license key to send
+        username: The username (optional)
+    
+    Returns:
+        dict: Dictionary with 'success' boolean and 'message' string
+    """
+    subject, text_content, html_content = build_license_key_email(license_key, username)
     
-    if success:
+    # Queue the email; the outbox worker sends it in the background
+    if not get_email_config()["email_sender"]:
         return {
-            "success": True,
-            "message": f"Email sent successfully to {recipient_email}"
+            "success": False,
+            "message": "Email is not configured"
         }
-    else:
+    
+    from .email_outbox import enqueue_email
+    try:
+        await enqueue_email(recipient_email, subject, text_content, html_content)
+    except Exception as e:
+        logger.error(f"Failed to queue email: {str(e)}")
         return {
             "success": False,
-            "message": f"Failed to send email to {recipient_email}"
-        } 
\ No newline at end of file
+            "message": f"Failed to queue email to {recipient_email}"
+        }
+    
+    return {
+        "success": True,
+        "message": f"Email queued for delivery to {recipient_email}"
+    }
@@ -0,0 +1,132 @@
+"""
+Bounded worker pools for running blocking work off the event loop.
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class BoundedExecutor:
+    """Thread pool with a concurrency cap and queue-time metrics.
+
+    At most ``max_concurrency`` calls are admitted at once; the rest wait
+    on a semaphore. The time a call spends waiting before a worker starts
+    it is recorded as its queue time.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_concurrency: Optional[int] = None):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_concurrency = max_concurrency or max_workers
+        self._executor = None
+        self._semaphore = None
+        self._semaphore_loop = None
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "in_flight": 0,
+            "waiting": 0,
+            "max_waiting": 0,
+            "total_queue_time": 0.0,
+            "max_queue_time": 0.0,
+            "total_run_time": 0.0,
+        }
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix=self.name
+            )
+        return self._executor
+
+    def _get_semaphore(self):
+        # asyncio primitives are bound to the loop that first uses them,
+        # so recreate the semaphore if we are called from a different loop
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    async def run(self, func: Callable, *args, timeout: Optional[float] = None, **kwargs) -> Any:
+        """Run ``func(*args, **kwargs)`` on the pool and await the result
+
+        On timeout the caller gets ``asyncio.TimeoutError`` at once, but the
+        call keeps its slot until the worker thread has actually finished,
+        so timed-out calls still count against ``max_concurrency``.
+        """
+        stats = self.stats
+        stats["submitted"] += 1
+        stats["waiting"] += 1
+        stats["max_waiting"] = max(stats["max_waiting"], stats["waiting"])
+        enqueued_at = time.perf_counter()
+        started = {}
+
+        def call():
+            started["at"] = time.perf_counter()
+            return func(*args, **kwargs)
+
+        semaphore = self._get_semaphore()
+        try:
+            await semaphore.acquire()
+        finally:
+            stats["waiting"] -= 1
+        stats["in_flight"] += 1
+        loop = asyncio.get_running_loop()
+
+        def finished():
+            stats["in_flight"] -= 1
+            semaphore.release()
+            if "at" in started:
+                queue_time = started["at"] - enqueued_at
+                stats["total_queue_time"] += queue_time
+                stats["max_queue_time"] = max(stats["max_queue_time"], queue_time)
+                stats["total_run_time"] += time.perf_counter() - started["at"]
+
+        def worker_done(_):
+            # Runs on the worker thread (or here, if the call never started)
+            try:
+                loop.call_soon_threadsafe(finished)
+            except RuntimeError:
+                pass  # the event loop is gone, and with it the semaphore
+
+        try:
+            worker = self._get_executor().submit(call)
+        except BaseException:
+            finished()
+            raise
+        worker.add_done_callback(worker_done)
+        future = asyncio.wrap_future(worker)
+        try:
+            if timeout is not None:
+                result = await asyncio.wait_for(future, timeout)
+            else:
+                result = await future
+            stats["completed"] += 1
+            return result
+        except asyncio.TimeoutError:
+            stats["timeouts"] += 1
+            raise
+        except Exception:
+            stats["failed"] += 1
+            raise
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Return a snapshot of the pool counters"""
+        stats = dict(self.stats)
+        started = stats["completed"] + stats["failed"]
+        stats["avg_queue_time"] = stats["total_queue_time"] / started if started else 0.0
+        stats["avg_run_time"] = stats["total_run_time"] / started if started else 0.0
+        stats["max_workers"] = self.max_workers
+        stats["max_concurrency"] = self.max_concurrency
+        return stats
+
+    def shutdown(self, wait: bool = True):
+        """Shut down the worker threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
@@ -0,0 +1,148 @@
+"""
+Shared async HTTP client for calls to external APIs.
+
+One httpx.AsyncClient is reused for the whole app so connections to the
+same host are kept alive and pooled instead of being opened per request.
+Every request has connect/read/pool timeouts, and a per-host semaphore
+caps how many requests one upstream service sees at once. HTTP/2 is
+negotiated over TLS when the optional ``h2`` package is installed.
+"""
+import asyncio
+import importlib.util
+import logging
+import time
+from typing import Dict, Optional
+
+import httpx
+
+from ..config import settings
+from .metrics import register_metrics_source
+
+# httpx logs every request at INFO; keep only its warnings
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+class SharedHTTPClient:
+    """Pooled httpx.AsyncClient with per-host concurrency limits."""
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        per_host_limit: int = 20,
+        connect_timeout: float = 3.0,
+        read_timeout: float = 10.0,
+        pool_timeout: float = 5.0,
+        http2: bool = True,
+    ):
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(
+            read_timeout, connect=connect_timeout, pool=pool_timeout
+        )
+        self.per_host_limit = per_host_limit
+        self.http2 = http2 and importlib.util.find_spec("h2") is not None
+        self._client = None
+        self._client_loop = None
+        self._host_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.stats = {
+            "requests": 0,
+            "errors": 0,
+            "timeouts": 0,
+            "in_flight": 0,
+            "waiting": 0,
+            "max_waiting": 0,
+            "total_time": 0.0,
+        }
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # The client's connection pool belongs to one event loop, so a new
+        # loop (tests, reloads) gets a fresh client and fresh semaphores
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            self._client = httpx.AsyncClient(
+                limits=self.limits, timeout=self.timeout, http2=self.http2
+            )
+            self._client_loop = loop
+            self._host_semaphores = {}
+        return self._client
+
+    def _host_semaphore(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(self.per_host_limit)
+        return semaphore
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request, waiting for a free slot for the target host
+
+        Raises:
+            httpx.TimeoutException: if connecting, reading or waiting for a
+                pooled connection takes too long
+            httpx.HTTPError: for other transport errors
+        """
+        client = self._get_client()
+        semaphore = self._host_semaphore(httpx.URL(url).host)
+
+        self.stats["waiting"] += 1
+        self.stats["max_waiting"] = max(self.stats["max_waiting"], self.stats["waiting"])
+        try:
+            await semaphore.acquire()
+        finally:
+            self.stats["waiting"] -= 1
+
+        self.stats["requests"] += 1
+        self.stats["in_flight"] += 1
+        started = time.perf_counter()
+        try:
+            return await client.request(method, url, **kwargs)
+        except httpx.TimeoutException:
+            self.stats["timeouts"] += 1
+            raise
+        except httpx.HTTPError:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            self.stats["in_flight"] -= 1
+            self.stats["total_time"] += time.perf_counter() - started
+            semaphore.release()
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        """Close pooled connections (the client is recreated on next use)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._client_loop = None
+
+    def get_metrics(self) -> Dict[str, Optional[float]]:
+        requests = self.stats["requests"]
+        return {
+            "http2": self.http2,
+            "per_host_limit": self.per_host_limit,
+            **{k: v for k, v in self.stats.items() if k != "total_time"},
+            "avg_request_time_ms": round(self.stats["total_time"] / requests * 1000, 3) if requests else 0.0,
+        }
+
+
+http_client = SharedHTTPClient(
+    max_connections=settings.HTTP_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+    per_host_limit=settings.HTTP_PER_HOST_LIMIT,
+    connect_timeout=settings.HTTP_CONNECT_TIMEOUT,
+    read_timeout=settings.HTTP_READ_TIMEOUT,
+    pool_timeout=settings.HTTP_POOL_TIMEOUT,
+    http2=settings.HTTP2_ENABLED,
+)
+
+register_metrics_source("http_client", http_client.get_metrics)
@@ -1,40 +1,109 @@
 # app/utils/license_utils.py
 import uuid
 import hashlib
-import random
+import secrets
 import string
 import re
+import csv
+import io
 from datetime import datetime
 
+LICENSE_KEY_CHARS = string.ascii_uppercase + string.digits
+
 def generate_license_key():
     """Generate a license key in format AAAA-BBBB-CCCC-DDDD"""
-    segments = []
-    chars = string.ascii_uppercase + string.digits
-    
-    for _ in range(4):
-        segment = ''.join(random.choices(chars, k=4))
-        segments.append(segment)
+    # One CSPRNG draw per key, written out as 16 base-36 digits
+    value = secrets.randbelow(len(LICENSE_KEY_CHARS) ** 16)
+    chars = []
+    for _ in range(16):
+        value, digit = divmod(value, len(LICENSE_KEY_CHARS))
+        chars.append(LICENSE_KEY_CHARS[digit])
     
+    segments = [''.join(chars[i:i + 4]) for i in range(0, 16, 4)]
     return "-".join(segments)
 
+def generate_license_keys(count, exclude=()):
+    """Generate `count` distinct license keys, none of them in `exclude`"""
+    keys = set()
+    excluded = set(exclude)
+    while len(keys) < count:
+        key = generate_license_key()
+        if key not in excluded:
+            keys.add(key)
+    return list(keys)
+
+LICENSE_KEY_PATTERN = re.compile(r'[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}')
+
 def validate_license_format(license_key):
     """Validate the format of a license key"""
-    pattern = r'^[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}$'
-    return bool(re.match(pattern, license_key))
+    return LICENSE_KEY_PATTERN.fullmatch(license_key) is not None
+
+def split_license_file(file_content):
+    """Split a license file into its non-empty, cleaned-up entries"""
+    # Split by common separators and clean up whitespace and quotes
+    lines = file_content.replace(',', '\n').split('\n')
+    entries = (line.strip().replace('"', '').replace("'", '') for line in lines)
+    return [entry for entry in entries if entry]
+
+def parse_license_file_entries(file_content):
+    """Parse a license file into (valid keys, invalid entries)
+    
+    Valid keys are deduplicated and keep their order in the file.
+    """
+    valid_keys = {}
+    invalid_entries = []
+    fullmatch = LICENSE_KEY_PATTERN.fullmatch
+    
+    for entry in split_license_file(file_content):
+        if fullmatch(entry):
+            valid_keys[entry] = None
+        else:
+            invalid_entries.append(entry)
+    
+    return list(valid_keys), invalid_entries
 
 def parse_license_file(file_content):
     """Parse a license file and extract valid license keys"""
-    valid_keys = []
+    return parse_license_file_entries(file_content)[0]
+
+ROSTER_EMAIL_PATTERN = re.compile(r'[^@\s,;]+@[^@\s,;]+\.[^@\s,;]+')
+
+def parse_roster_csv(file_content):
+    """Parse a class roster CSV into students and rejected rows
     
-    # Split by common separators and clean up
-    lines = file_content.replace(',', '\n').split('\n')
+    Each row is `email[,username]`. A header row is used if it has an
+    "email" column; otherwise the first column is the email and the
+    second (optional) the username. Duplicate emails are rejected.
+    
+    Returns:
+        tuple: ([{"email", "username"}], [{"row", "value", "error"}])
+    """
+    rows = list(csv.reader(io.StringIO(file_content)))
+    email_col, username_col, start = 0, 1, 0
+    if rows:
+        header = [cell.strip().lower() for cell in rows[0]]
+        if "email" in header:
+            email_col = header.index("email")
+            username_col = header.index("username") if "username" in header else None
+            start = 1
     
-    for line in lines:
-        # Clean up whitespace and remove quotes
-        line = line.strip().replace('"', '').replace("'", '')
+    students = []
+    rejected = []
+    seen = set()
+    for number, row in enumerate(rows[start:], start=start + 1):
+        if not any(cell.strip() for cell in row):
+            continue
+        email = row[email_col].strip() if len(row) > email_col else ""
+        username = None
+        if username_col is not None and len(row) > username_col:
+            username = row[username_col].strip() or None
         
-        # Check if this line contains a valid license key
-        if validate_license_format(line):
-            valid_keys.append(line)
+        if not ROSTER_EMAIL_PATTERN.fullmatch(email):
+            rejected.append({"row": number, "value": email, "error": "Invalid email address"})
+        elif email.lower() in seen:
+            rejected.append({"row": number, "value": email, "error": "Duplicate email address"})
+        else:
+            seen.add(email.lower())
+            students.append({"email": email, "username": username})
     
-    return valid_keys
\ No newline at end of file
+    return students, rejected
@@ -0,0 +1,27 @@
+"""
+In-process metrics registry.
+
+Modules register a callable that returns a dict of counters, and
+``/utils/metrics`` collects them all into one snapshot.
+"""
+import logging
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+_metrics_sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+def register_metrics_source(name: str, source: Callable[[], Dict[str, Any]]):
+    """Register a callable returning metrics under the given name"""
+    _metrics_sources[name] = source
+
+def collect_metrics() -> Dict[str, Any]:
+    """Collect a snapshot from every registered metrics source"""
+    snapshot = {}
+    for name, source in _metrics_sources.items():
+        try:
+            snapshot[name] = source()
+        except Exception as e:
+            logger.error(f"Failed to collect metrics for {name}: {e}")
+            snapshot[name] = {"error": str(e)}
+    return snapshot
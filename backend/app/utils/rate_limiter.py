@@ -0,0 +1,312 @@
+"""
+Token-bucket quota scheduling for rate-limited upstream APIs.
+
+Each API key gets a bucket that refills at the quota rate (e.g. 100
+requests per hour) up to a burst capacity. Callers take one token per
+upstream request and wait for a refill when the bucket is empty, up to
+a per-lane maximum wait; past that they get QuotaExceededError with the
+time until a token is available, instead of sending a request the
+upstream would reject.
+
+There are two lanes. INTERACTIVE requests (a learner looking up a word)
+always go first: BULK requests (batch jobs) wait while any interactive
+request is waiting, and may not take the last `interactive_reserve`
+tokens of a bucket.
+
+The quota belongs to the API key, not to a process. With a db_path the
+buckets live in a WAL-mode SQLite file that every worker on the host
+shares, and each token is taken in one write transaction, so N workers
+together stay within the quota. The transactions run in a thread, since
+a write lock held by another worker must not stall this worker's event
+loop. Without a db_path each process has its own buckets and N workers
+allow N times the rate. Lane priority is always per process.
+"""
+import os
+import time
+import asyncio
+import sqlite3
+import threading
+from typing import Callable, Dict, Optional, Tuple
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+class QuotaExceededError(Exception):
+    """Raised when a request cannot get a token within its maximum wait"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} quota exhausted (retry in {retry_after:.1f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """Tokens refilled continuously at `rate` per second up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def available(self) -> float:
+        self._refill()
+        return self.tokens
+
+    def peek(self) -> float:
+        """Tokens in the bucket, for metrics"""
+        return self.available()
+
+    def take(self, tokens: float = 1):
+        self._refill()
+        self.tokens -= tokens
+
+    def time_until(self, tokens: float) -> float:
+        """Seconds until the bucket holds `tokens`"""
+        missing = tokens - self.available()
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate > 0 else float("inf")
+
+    def try_take(self, needed: float = 1) -> float:
+        """Take one token if the bucket holds `needed`; else seconds until it will"""
+        wait = self.time_until(needed)
+        if wait <= 0:
+            self.take()
+        return wait
+
+    def drain(self):
+        """Empty the bucket (the upstream reported we are over quota)"""
+        self._refill()
+        self.tokens = min(self.tokens, 0)
+
+class SharedBucketStore:
+    """Token buckets in a SQLite file shared across worker processes"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute('''
+            CREATE TABLE IF NOT EXISTS quota_buckets (
+                key TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated_at REAL NOT NULL
+            )
+            ''')
+            self._conn = conn
+        return self._conn
+
+    def transact(self, key: str, rate: float, capacity: float,
+                 update: Callable[[float], Tuple[float, float]]) -> float:
+        """
+        Refill a bucket and apply `update` in one write transaction
+
+        Args:
+            update: Takes the refilled token count, returns the new count
+                and the value to return
+
+        Buckets start full. Wall-clock time is used, since monotonic
+        clocks are not comparable between processes.
+        """
+        with self._lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT tokens, updated_at FROM quota_buckets WHERE key = ?", (key,)
+                ).fetchone()
+                now = time.time()
+                if row is None:
+                    tokens = capacity
+                else:
+                    tokens = min(capacity, row[0] + max(0.0, now - row[1]) * rate)
+                tokens, result = update(tokens)
+                conn.execute(
+                    "INSERT OR REPLACE INTO quota_buckets (key, tokens, updated_at) VALUES (?, ?, ?)",
+                    (key, tokens, now)
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return result
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+class SharedTokenBucket:
+    """A TokenBucket whose state lives in a SharedBucketStore"""
+
+    def __init__(self, store: SharedBucketStore, key: str, rate: float, capacity: float):
+        self.store = store
+        self.key = key
+        self.rate = rate
+        self.capacity = capacity
+        # Token count after this process's last transaction, and when
+        self._last_seen = (capacity, time.time())
+
+    def _transact(self, update):
+        def record(tokens):
+            tokens, result = update(tokens)
+            self._last_seen = (tokens, time.time())
+            return tokens, result
+        return self.store.transact(self.key, self.rate, self.capacity, record)
+
+    def peek(self) -> float:
+        """
+        Tokens as of this process's last transaction, refilled since
+
+        Reads no file, so metrics never wait on the shared bucket; other
+        workers' takes since then are not included.
+        """
+        tokens, seen_at = self._last_seen
+        return min(self.capacity, tokens + max(0.0, time.time() - seen_at) * self.rate)
+
+    def _wait_for(self, tokens: float, needed: float) -> float:
+        missing = needed - tokens
+        if missing <= 0:
+            return 0.0
+        return missing / self.rate if self.rate > 0 else float("inf")
+
+    def available(self) -> float:
+        return self._transact(lambda tokens: (tokens, tokens))
+
+    def take(self, tokens: float = 1):
+        self._transact(lambda available: (available - tokens, None))
+
+    def time_until(self, tokens: float) -> float:
+        return self._wait_for(self.available(), tokens)
+
+    def try_take(self, needed: float = 1) -> float:
+        def update(tokens):
+            wait = self._wait_for(tokens, needed)
+            return (tokens - 1 if wait <= 0 else tokens), wait
+        return self._transact(update)
+
+    def drain(self):
+        self._transact(lambda tokens: (min(tokens, 0), None))
+
+class QuotaScheduler:
+    """Per-key token buckets with an interactive and a bulk lane"""
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        capacity: float,
+        interactive_max_wait: float = 2.0,
+        bulk_max_wait: float = 30.0,
+        interactive_reserve: float = 1,
+        db_path: Optional[str] = None,
+    ):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.max_wait = {INTERACTIVE: interactive_max_wait, BULK: bulk_max_wait}
+        self.interactive_reserve = interactive_reserve
+        # Opened on first use, so importing the scheduler touches no files
+        self._store = SharedBucketStore(db_path) if db_path else None
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._interactive_waiting: Dict[str, int] = {}
+        self.stats = {
+            lane: {"granted": 0, "throttled": 0, "waited": 0, "total_wait": 0.0}
+            for lane in (INTERACTIVE, BULK)
+        }
+
+    def bucket(self, key: str) -> TokenBucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if self._store is not None:
+                bucket = SharedTokenBucket(self._store, key, self.rate, self.capacity)
+            else:
+                bucket = TokenBucket(self.rate, self.capacity)
+            self._buckets[key] = bucket
+        return bucket
+
+    async def _run(self, operation, *args):
+        """Run a bucket operation; shared buckets do SQLite I/O, so in a thread"""
+        if self._store is None:
+            return operation(*args)
+        return await asyncio.to_thread(operation, *args)
+
+    def _needed(self, key: str, lane: str) -> float:
+        """Tokens that must be in the bucket before this lane may take one"""
+        if lane == INTERACTIVE:
+            return 1
+        # Keep a reserve for interactive lookups, and never overtake one
+        reserve = self.interactive_reserve + self._interactive_waiting.get(key, 0)
+        return min(self.capacity, 1 + reserve)
+
+    async def acquire(self, key: str, lane: str = INTERACTIVE):
+        """
+        Take one token for `key`, waiting at most the lane's maximum wait
+
+        Raises:
+            QuotaExceededError: if no token becomes available in time
+        """
+        bucket = self.bucket(key)
+        stats = self.stats[lane]
+        started = time.monotonic()
+        deadline = started + self.max_wait[lane]
+        if lane == INTERACTIVE:
+            self._interactive_waiting[key] = self._interactive_waiting.get(key, 0) + 1
+        try:
+            while True:
+                wait = await self._run(bucket.try_take, self._needed(key, lane))
+                if wait <= 0:
+                    waited = time.monotonic() - started
+                    stats["granted"] += 1
+                    if waited > 0.001:
+                        stats["waited"] += 1
+                        stats["total_wait"] += waited
+                    return
+                if time.monotonic() + wait > deadline:
+                    stats["throttled"] += 1
+                    raise QuotaExceededError(self.name, wait)
+                await asyncio.sleep(wait)
+        finally:
+            if lane == INTERACTIVE:
+                self._interactive_waiting[key] -= 1
+
+    async def penalize(self, key: str):
+        """Empty a key's bucket after the upstream rejected us for quota"""
+        await self._run(self.bucket(key).drain)
+
+    def close(self):
+        if self._store is not None:
+            self._store.close()
+
+    def get_metrics(self):
+        return {
+            "rate_per_hour": round(self.rate * 3600, 3),
+            "capacity": self.capacity,
+            "shared": self._store is not None,
+            # Keys are API keys: only their last characters are shown
+            "tokens": {
+                f"...{key[-4:]}": round(bucket.peek(), 3) for key, bucket in self._buckets.items()
+            },
+            **{
+                lane: {
+                    "granted": s["granted"],
+                    "throttled": s["throttled"],
+                    "waited": s["waited"],
+                    "avg_wait_ms": round(s["total_wait"] / s["waited"] * 1000, 3) if s["waited"] else 0.0,
+                }
+                for lane, s in self.stats.items()
+            },
+        }
@@ -0,0 +1,63 @@
+"""
+Single-flight coalescing of identical concurrent calls.
+
+When many requests need the same result at the same time (a class
+looking up one word), only the first one runs the call; the others await
+the same task. The task runs independently of the request that started
+it, so a client disconnecting does not cancel it for everyone else; it
+is cancelled once every caller waiting on it has gone, so nobody spends
+upstream quota on a result no one will read.
+
+Nothing is remembered once the call finishes: a failure is raised to
+every waiter and the next request starts a fresh call. Caching results
+is left to the caller.
+"""
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[asyncio.Task, int] = {}
+        self.stats = {"calls": 0, "coalesced": 0, "failures": 0, "abandoned": 0}
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.stats["failures"] += 1
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Run `call`, or join the call already in flight for `key`"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+            self.stats["calls"] += 1
+        else:
+            self.stats["coalesced"] += 1
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                if not task.done():
+                    # Every caller was cancelled: stop the call, and let
+                    # the next caller start a fresh one
+                    if self._calls.get(key) is task:
+                        del self._calls[key]
+                    task.cancel()
+                    self.stats["abandoned"] += 1
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def get_metrics(self):
+        return {"in_flight": len(self._calls), **self.stats}
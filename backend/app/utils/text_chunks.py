@@ -0,0 +1,92 @@
+"""
+Splitting long texts into chunks that can be translated on their own.
+
+OCR'd passages can run to thousands of characters. Sent as one Youdao
+query they are slow, may exceed the upstream length limit, and nothing
+can be shown until the whole passage is back. Instead a text is cut at
+paragraph breaks (blank lines) and sentence ends:
+
+  - the first sentence is always a chunk of its own, so it comes back
+    as fast as a short lookup;
+  - following sentences of the same paragraph are packed together up to
+    max_chars, keeping the number of Youdao calls (and quota) low;
+  - a sentence longer than max_chars is cut at the last whitespace
+    before the limit (or at the limit, for text without spaces).
+
+Single line breaks are not treated as boundaries: OCR output breaks
+lines in the middle of sentences. Chunks are deterministic, so the same
+passage always produces the same chunks and hits the translation cache.
+"""
+import re
+from typing import List, Tuple
+
+# A blank line, possibly containing other whitespace
+PARAGRAPH_BREAK = re.compile(r"\n[^\S\n]*\n")
+
+# Western sentence ends need whitespace and no lowercase letter after them
+# ("e.g. this" is one sentence); CJK full stops end a sentence as they are
+SENTENCE_END = re.compile(
+    r"[.!?]+[\"'”’)\]]*(?=\s+[^\sa-z])"
+    r"|[。！？]+[”’」』）)\]]*"
+)
+
+def _hard_split(piece: str, max_chars: int) -> List[str]:
+    """Cut a piece whose text is longer than max_chars"""
+    parts = []
+    while len(piece.strip()) > max_chars:
+        offset = len(piece) - len(piece.lstrip())
+        window = piece[:offset + max_chars + 1]
+        cut = max(window.rfind(c) for c in " \t\n")
+        if cut <= offset:
+            cut = offset + max_chars
+        parts.append(piece[:cut])
+        piece = piece[cut:]
+    parts.append(piece)
+    return parts
+
+def split_sentences(text: str, max_chars: int) -> List[Tuple[str, str]]:
+    """
+    Split text at paragraph breaks and sentence ends
+
+    Returns:
+        (sentence, whitespace following it) pairs; joining them all gives
+        back the text without its leading whitespace
+    """
+    cuts = {0, len(text)}
+    cuts.update(match.end() for match in SENTENCE_END.finditer(text))
+    cuts.update(match.start() for match in PARAGRAPH_BREAK.finditer(text))
+    cuts = sorted(cuts)
+
+    sentences = []
+    for start, end in zip(cuts, cuts[1:]):
+        for piece in _hard_split(text[start:end], max_chars):
+            body = piece.strip()
+            leading = piece[:len(piece) - len(piece.lstrip())]
+            if sentences:
+                sentences[-1] = (sentences[-1][0], sentences[-1][1] + leading)
+            if body:
+                sentences.append((body, piece[len(leading) + len(body):]))
+    return sentences
+
+def split_text(text: str, max_chars: int) -> List[Tuple[str, str]]:
+    """
+    Chunks of text to translate separately, in order
+
+    Args:
+        text: Text to split
+        max_chars: Longest chunk, apart from the whitespace inside it
+
+    Returns:
+        (chunk, separator) pairs; a translation of the whole text is the
+        chunk translations each followed by its separator
+    """
+    chunks = []
+    for sentence, separator in split_sentences(text, max_chars):
+        if len(chunks) > 1:
+            previous, joiner = chunks[-1]
+            if (not PARAGRAPH_BREAK.search(joiner)
+                    and len(previous) + len(joiner) + len(sentence) <= max_chars):
+                chunks[-1] = (previous + joiner + sentence, separator)
+                continue
+        chunks.append((sentence, separator))
+    return chunks
@@ -0,0 +1,296 @@
+"""
+Two-tier cache of Youdao translations.
+
+Learners translate the same words over and over, and every Youdao call
+counts against the API quota. Translations are cached by (normalised
+text, source language, target language):
+
+  - a small in-process LRU answers hot entries without any I/O;
+  - a WAL-mode SQLite table keeps everything else across restarts and is
+    shared by every worker on the host.
+
+Entries expire after TRANSLATION_CACHE_TTL seconds. When the table grows
+past TRANSLATION_CACHE_MAX_ENTRIES the least recently used rows are
+deleted. The table can be warmed from the ch_meaning column of the local
+words table, so words already in the vocabulary never reach Youdao.
+"""
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Optional, Dict, Any, List
+
+import aiosqlite
+
+from ..config import settings
+from .metrics import register_metrics_source
+
+logger = logging.getLogger(__name__)
+
+# Evict over-limit rows once every this many stores
+EVICTION_CHECK_INTERVAL = 100
+
+def normalize_text(text: str) -> str:
+    """Cache form of a text: case-folded with whitespace collapsed"""
+    return " ".join(text.split()).casefold()
+
+class TranslationCache:
+    """In-memory LRU in front of a persistent SQLite translation table"""
+
+    def __init__(
+        self,
+        db_path: str,
+        memory_size: int = 10000,
+        max_entries: int = 200000,
+        ttl: float = 30 * 24 * 3600,
+    ):
+        self.db_path = db_path
+        self.memory_size = memory_size
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.connection = None
+        self._connect_lock = asyncio.Lock()
+        self._memory = OrderedDict()  # key -> (expires_at, translation)
+        self._stores_since_eviction = 0
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "warmed": 0,
+        }
+
+    async def connect(self):
+        """Open the cache database, creating the table if needed"""
+        async with self._connect_lock:
+            if self.connection is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+                connection = await aiosqlite.connect(self.db_path)
+                await connection.execute("PRAGMA journal_mode=WAL")
+                await connection.execute("PRAGMA busy_timeout=5000")
+                await connection.execute("""
+                    CREATE TABLE IF NOT EXISTS translation_cache (
+                        text TEXT NOT NULL,
+                        source TEXT NOT NULL,
+                        target TEXT NOT NULL,
+                        translation TEXT NOT NULL,
+                        detected_source TEXT,
+                        expires_at REAL NOT NULL,
+                        last_used_at REAL NOT NULL,
+                        PRIMARY KEY (text, source, target)
+                    )
+                """)
+                await connection.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_translation_last_used ON translation_cache (last_used_at)"
+                )
+                await connection.commit()
+                self.connection = connection
+        return self.connection
+
+    def _remember(self, key, expires_at: float, translation: Dict[str, Any]):
+        if self.memory_size <= 0:
+            return
+        self._memory[key] = (expires_at, translation)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    async def get(self, text: str, source: str, target: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached translation
+
+        Returns:
+            Dict with translated_text and detected_source, or None
+        """
+        if self.ttl <= 0:
+            return None
+        key = (normalize_text(text), source, target)
+        now = time.time()
+
+        entry = self._memory.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry[1]
+            del self._memory[key]
+
+        db = await self.connect()
+        cursor = await db.execute(
+            """SELECT translation, detected_source, expires_at FROM translation_cache
+               WHERE text = ? AND source = ? AND target = ? AND expires_at > ?""",
+            (*key, now)
+        )
+        row = await cursor.fetchone()
+        if row is None:
+            self.stats["misses"] += 1
+            return None
+
+        # Disk hits refresh last_used_at; memory hits never touch the disk
+        await db.execute(
+            "UPDATE translation_cache SET last_used_at = ? WHERE text = ? AND source = ? AND target = ?",
+            (now, *key)
+        )
+        await db.commit()
+        translation = {"translated_text": row[0], "detected_source": row[1]}
+        self._remember(key, row[2], translation)
+        self.stats["disk_hits"] += 1
+        return translation
+
+    async def get_many(self, texts: List[str], source: str, target: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Look up many cached translations with one query per 500 texts
+
+        Returns:
+            Dict from each cached input text to its translation; texts that
+            are not cached are left out
+        """
+        if self.ttl <= 0:
+            return {}
+        now = time.time()
+        found = {}
+        pending = {}  # normalised text -> input texts
+        for text in texts:
+            key = (normalize_text(text), source, target)
+            entry = self._memory.get(key)
+            if entry is not None and entry[0] > now:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                found[text] = entry[1]
+            else:
+                pending.setdefault(key[0], []).append(text)
+
+        normalized = list(pending)
+        if normalized:
+            db = await self.connect()
+            hits = []
+            for start in range(0, len(normalized), 500):
+                chunk = normalized[start:start + 500]
+                cursor = await db.execute(
+                    f"""SELECT text, translation, detected_source, expires_at FROM translation_cache
+                        WHERE text IN ({','.join('?' * len(chunk))})
+                        AND source = ? AND target = ? AND expires_at > ?""",
+                    (*chunk, source, target, now)
+                )
+                hits.extend(await cursor.fetchall())
+            for text, translated_text, detected_source, expires_at in hits:
+                translation = {"translated_text": translated_text, "detected_source": detected_source}
+                self._remember((text, source, target), expires_at, translation)
+                for original in pending.pop(text):
+                    found[original] = translation
+            self.stats["disk_hits"] += len(hits)
+            self.stats["misses"] += len(pending)
+            if hits:
+                await db.executemany(
+                    "UPDATE translation_cache SET last_used_at = ? WHERE text = ? AND source = ? AND target = ?",
+                    [(now, row[0], source, target) for row in hits]
+                )
+                await db.commit()
+        return found
+
+    async def put(self, text: str, source: str, target: str, translated_text: str, detected_source: str = None):
+        """Store a translation in both tiers"""
+        if self.ttl <= 0:
+            return
+        key = (normalize_text(text), source, target)
+        now = time.time()
+        expires_at = now + self.ttl
+
+        db = await self.connect()
+        await db.execute(
+            """INSERT OR REPLACE INTO translation_cache
+               (text, source, target, translation, detected_source, expires_at, last_used_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            (*key, translated_text, detected_source, expires_at, now)
+        )
+        await db.commit()
+        self._remember(key, expires_at, {"translated_text": translated_text, "detected_source": detected_source})
+        self.stats["stores"] += 1
+
+        self._stores_since_eviction += 1
+        if self._stores_since_eviction >= EVICTION_CHECK_INTERVAL:
+            self._stores_since_eviction = 0
+            await self.evict()
+
+    async def evict(self) -> int:
+        """Drop expired rows, then the least recently used rows over max_entries"""
+        db = await self.connect()
+        cursor = await db.execute("DELETE FROM translation_cache WHERE expires_at <= ?", (time.time(),))
+        removed = cursor.rowcount
+        cursor = await db.execute(
+            """DELETE FROM translation_cache WHERE rowid IN (
+                   SELECT rowid FROM translation_cache
+                   ORDER BY last_used_at
+                   LIMIT MAX(0, (SELECT COUNT(*) FROM translation_cache) - ?)
+               )""",
+            (self.max_entries,)
+        )
+        removed += cursor.rowcount
+        await db.commit()
+        self.stats["evictions"] += removed
+        return removed
+
+    async def warm_from_words(self, words_db_path: str, source: str = "auto", target: str = "zh-CHS") -> int:
+        """
+        Seed the cache from the ch_meaning column of the local words table
+
+        Existing cache entries are kept, so real Youdao translations are
+        never overwritten by vocabulary meanings.
+
+        Args:
+            words_db_path: Path to the SQLite word storage database
+            source: Source language the entries are cached under
+            target: Target language of ch_meaning
+
+        Returns:
+            Number of words read from the vocabulary
+        """
+        if self.ttl <= 0 or not os.path.exists(words_db_path):
+            return 0
+        async with aiosqlite.connect(words_db_path) as words_db:
+            cursor = await words_db.execute(
+                "SELECT word, ch_meaning FROM words WHERE ch_meaning IS NOT NULL AND ch_meaning != ''"
+            )
+            rows = await cursor.fetchall()
+
+        now = time.time()
+        db = await self.connect()
+        await db.executemany(
+            """INSERT OR IGNORE INTO translation_cache
+               (text, source, target, translation, detected_source, expires_at, last_used_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?)""",
+            [(normalize_text(word), source, target, meaning, "en", now + self.ttl, now)
+             for word, meaning in rows]
+        )
+        await db.commit()
+        self.stats["warmed"] += len(rows)
+        return len(rows)
+
+    def clear_memory(self):
+        self._memory.clear()
+
+    async def close(self):
+        if self.connection is not None:
+            await self.connection.close()
+            self.connection = None
+
+    def get_metrics(self):
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            "memory_entries": len(self._memory),
+            **self.stats,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            # Every hit is a Youdao call that did not happen
+            "saved_upstream_calls": hits,
+        }
+
+translation_cache = TranslationCache(
+    db_path=settings.TRANSLATION_CACHE_DB_PATH,
+    memory_size=settings.TRANSLATION_CACHE_MEMORY_SIZE,
+    max_entries=settings.TRANSLATION_CACHE_MAX_ENTRIES,
+    ttl=settings.TRANSLATION_CACHE_TTL,
+)
+register_metrics_source("translation_cache", translation_cache.get_metrics)
@@ -12,6 +12,12 @@ from bson import ObjectId
 from app.main import app
 from app.database.mongodb_connection import get_db
 from app.auth.auth_handler import get_password_hash
+from app.routes import translation_routes, word_routes
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.dictionary_index import DictionaryIndex
+from app.utils.rate_limiter import QuotaScheduler
+from app.utils.single_flight import SingleFlight
+from app.utils.translation_cache import TranslationCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -110,4 +116,56 @@ def admin_token(client, test_admin):
     )
     token = response.json()["access_token"]
     logger.info(f"Got admin token: {token[:20]}...")
-    return token
\ No newline at end of file
+    return token
+
+# translation_routes globals that word_routes imports as well
+SHARED_WITH_WORD_ROUTES = {"translation_cache", "dictionary_index"}
+
+class TranslationRoutesState:
+    """Test instances of the translation routes' module-level state"""
+
+    def __init__(self, tmp_path, monkeypatch):
+        self.tmp_path = tmp_path
+        self._monkeypatch = monkeypatch
+        self._caches = []
+        self.replace(
+            YOUDAO_APP_KEY="test-key",
+            YOUDAO_APP_SECRET="test-secret",
+            youdao_quota=QuotaScheduler("youdao", rate=1000, capacity=1000),
+            youdao_breaker=CircuitBreaker("youdao"),
+            translation_flight=SingleFlight("translation"),
+            translation_cache=TranslationCache(str(tmp_path / "translation_cache.db")),
+            dictionary_index=DictionaryIndex(str(tmp_path / "missing_dictionary_index.db")),
+        )
+
+    def replace(self, **values):
+        """Set translation_routes globals (e.g. the upstream stub) for this test"""
+        for name, value in values.items():
+            self._monkeypatch.setattr(translation_routes, name, value)
+            if name in SHARED_WITH_WORD_ROUTES:
+                self._monkeypatch.setattr(word_routes, name, value)
+            if isinstance(value, TranslationCache):
+                self._caches.append(value)
+            setattr(self, name, value)
+
+    def use_cache(self, **options):
+        """Replace the translation cache with one built with `options` (e.g. ttl=0)"""
+        cache = TranslationCache(str(self.tmp_path / f"translation_cache_{len(self._caches)}.db"), **options)
+        self.replace(translation_cache=cache)
+        return cache
+
+    def close(self):
+        for cache in self._caches:
+            if cache.connection is not None:
+                asyncio.run(cache.close())
+
+@pytest.fixture
+def translation_state(tmp_path, monkeypatch):
+    """
+    Fresh quota, circuit breaker, single flight, translation cache and
+    dictionary index for the translation routes, with test credentials.
+    Tests add their upstream stub with translation_state.replace(...)
+    """
+    state = TranslationRoutesState(tmp_path, monkeypatch)
+    yield state
+    state.close()
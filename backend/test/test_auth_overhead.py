@@ -0,0 +1,97 @@
+# test/test_auth_overhead.py
+import sys
+import os
+import time
+import asyncio
+from fastapi import FastAPI, Depends
+from fastapi.testclient import TestClient
+from jose import jwt
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.auth.auth_context import (
+    decode_token, get_token_claims, get_bearer_token, set_request_claims,
+    token_revocation_id, verified_token_cache
+)
+from app.auth.jwt_handler import create_access_token, create_refresh_token
+from app.auth.token_blacklist import is_blacklisted, add_to_blacklist
+
+REQUESTS = 5000
+
+def _build_app():
+    """Minimal app wired like main.py: auth middleware plus a protected route"""
+    app = FastAPI()
+
+    @app.middleware("http")
+    async def auth_middleware(request, call_next):
+        token = get_bearer_token(request)
+        if token:
+            claims = decode_token(token)
+            if not is_blacklisted(token_revocation_id(claims)):
+                set_request_claims(request, token, claims)
+        return await call_next(request)
+
+    @app.get("/protected")
+    async def protected(claims: dict = Depends(get_token_claims)):
+        return {"username": claims["sub"]}
+
+    return app
+
+def test_token_decoded_once_per_request():
+    """The middleware verifies the token and dependencies reuse the claims"""
+    client = TestClient(_build_app())
+    token = create_access_token({"sub": "overhead_user"})
+    verified_token_cache.clear()
+    before = dict(verified_token_cache.stats)
+
+    response = client.get("/protected", headers={"Authorization": f"Bearer {token}"})
+
+    assert response.status_code == 200
+    assert response.json() == {"username": "overhead_user"}
+    # One cache miss (the middleware verification) and no second lookup
+    assert verified_token_cache.stats["misses"] - before["misses"] == 1
+    assert verified_token_cache.stats["hits"] - before["hits"] == 0
+
+def test_refresh_token_rejected_as_access_token():
+    """A refresh token cannot be used to call protected routes"""
+    client = TestClient(_build_app())
+    token = create_refresh_token({"sub": "overhead_user", "fid": "family"})
+    response = client.get("/protected", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
+
+def test_revoked_token_rejected():
+    """Revocation is checked even when the token is served from the cache"""
+    token = create_access_token({"sub": "overhead_user"})
+    claims = decode_token(token)
+    assert decode_token(token) is claims
+    asyncio.run(add_to_blacklist(token_revocation_id(claims), claims["exp"]))
+    assert is_blacklisted(token_revocation_id(decode_token(token)))
+
+def test_auth_overhead_benchmark():
+    """Per-request auth cost: three full decodes before, one cached decode now"""
+    token = create_access_token({"sub": "overhead_user"})
+
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        # Middleware, get_current_user and logout each decoded the token
+        for _ in range(3):
+            payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+        is_blacklisted(payload["sub"])
+    before = (time.perf_counter() - started) / REQUESTS
+
+    started = time.perf_counter()
+    for _ in range(REQUESTS):
+        claims = decode_token(token)
+        is_blacklisted(token_revocation_id(claims))
+    after = (time.perf_counter() - started) / REQUESTS
+
+    print(f"\nAuth overhead per request: {before * 1e6:.1f} us before, {after * 1e6:.1f} us after")
+    assert after < before
+
+if __name__ == "__main__":
+    test_token_decoded_once_per_request()
+    test_refresh_token_rejected_as_access_token()
+    test_revoked_token_rejected()
+    test_auth_overhead_benchmark()
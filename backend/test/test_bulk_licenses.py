@@ -0,0 +1,108 @@
+# test/test_bulk_licenses.py
+import sys
+import os
+import time
+import asyncio
+import threading
+from pymongo.errors import BulkWriteError
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.license_db import create_bulk_licenses, BULK_LICENSE_RETRIES, MAX_BULK_LICENSES
+from app.utils.license_utils import generate_license_keys, validate_license_format
+
+class _UniqueLicenses:
+    """In-memory licenses collection enforcing the unique license_key index"""
+
+    def __init__(self, existing=()):
+        self.keys = set(existing)
+        self.insert_calls = []
+
+    async def insert_many(self, documents, ordered=True):
+        assert not ordered
+        self.insert_calls.append(len(documents))
+        errors = []
+        for index, doc in enumerate(documents):
+            if doc["license_key"] in self.keys:
+                errors.append({"index": index, "code": 11000, "errmsg": "duplicate key"})
+            else:
+                self.keys.add(doc["license_key"])
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(documents) - len(errors)})
+
+class _FakeDB:
+    def __init__(self, existing=()):
+        self.licenses = _UniqueLicenses(existing)
+
+def test_generated_keys_are_distinct_and_valid():
+    """Keys from one batch never repeat and match the license format"""
+    keys = generate_license_keys(10_000)
+    assert len(set(keys)) == 10_000
+    assert all(validate_license_format(key) for key in keys)
+
+def test_only_colliding_keys_are_retried():
+    """Keys that already exist are regenerated; the rest are inserted once"""
+    import app.utils.license_utils as license_utils
+    existing = generate_license_keys(5)
+    original = license_utils.generate_license_keys
+    # First batch deliberately contains the 5 existing keys
+    first_batch = existing + original(95, exclude=existing)
+    calls = []
+    def fake_generate(count, exclude=()):
+        calls.append(count)
+        return first_batch if len(calls) == 1 else original(count, exclude)
+    license_utils.generate_license_keys = fake_generate
+    try:
+        db = _FakeDB(existing)
+        result = asyncio.run(create_bulk_licenses(db, 100))
+    finally:
+        license_utils.generate_license_keys = original
+
+    assert result["success"] and result["count"] == 100
+    assert len(set(result["licenses"])) == 100
+    assert not set(existing) & set(result["licenses"])
+    assert db.licenses.insert_calls == [100, 5]
+
+def test_shortfall_is_reported():
+    """Keys still colliding after every retry make the result a failure, with counts"""
+    import app.utils.license_utils as license_utils
+    existing = generate_license_keys(5)
+    original = license_utils.generate_license_keys
+    threads = []
+    def always_colliding(count, exclude=()):
+        threads.append(threading.current_thread())
+        if len(threads) == 1:
+            return existing + original(95, exclude=existing)
+        return existing[:count]
+    license_utils.generate_license_keys = always_colliding
+    try:
+        db = _FakeDB(existing)
+        result = asyncio.run(create_bulk_licenses(db, 100))
+    finally:
+        license_utils.generate_license_keys = original
+
+    assert not result["success"]
+    assert result["count"] == 95 and result["requested"] == 100
+    assert result["message"] == "Created only 95 of 100 license keys"
+    assert len(db.licenses.insert_calls) == BULK_LICENSE_RETRIES
+    # Generation runs off the event loop
+    assert threading.main_thread() not in threads
+
+def test_bulk_generation_100k():
+    """A 100k batch is one insert_many and takes well under a minute to prepare"""
+    db = _FakeDB()
+    started = time.perf_counter()
+    result = asyncio.run(create_bulk_licenses(db, MAX_BULK_LICENSES))
+    elapsed = time.perf_counter() - started
+
+    print(f"\nGenerated {result['count']:,} license keys in {elapsed:.2f}s")
+    assert result["count"] == MAX_BULK_LICENSES
+    assert db.licenses.insert_calls == [MAX_BULK_LICENSES]
+    assert not asyncio.run(create_bulk_licenses(db, MAX_BULK_LICENSES + 1))["success"]
+
+if __name__ == "__main__":
+    test_generated_keys_are_distinct_and_valid()
+    test_only_colliding_keys_are_retried()
+    test_shortfall_is_reported()
+    test_bulk_generation_100k()
@@ -0,0 +1,189 @@
+# test/test_dictionary_index.py
+import sys
+import os
+import json
+import time
+import random
+import asyncio
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.routes.translation_routes as translation_routes
+import app.routes.word_routes as word_routes
+import app.utils.dictionary_index as dictionary_index_module
+from app.utils.dictionary_data import MANIFEST_NAME, local_nltk_wordnet, provision_data_dir
+from app.utils.dictionary_index import DictionaryIndex, build_dictionary_index
+
+# A tiny WordNet: (pos, synset pos, lemmas, gloss) in file order
+SYNSETS = [
+    ("n", "n", ["dog", "domestic_dog"], 'a domesticated canine; "the dog barked"'),
+    ("n", "n", ["frump", "dog"], "a dull unattractive woman"),
+    ("n", "n", ["goose"], "a web-footed water bird"),
+    ("n", "n", ["box"], "a rectangular container"),
+    ("n", "n", ["run"], 'a score in baseball; "he hit a run"'),
+    ("v", "v", ["run"], 'move fast on foot; "she ran to the door"'),
+    ("v", "v", ["box"], "fight with the fists"),
+    ("a", "a", ["good"], "having desirable qualities"),
+    ("a", "s", ["fast"], "acting or moving quickly"),
+    ("r", "r", ["fast"], "quickly or rapidly"),
+    ("r", "r", ["well"], "in a good manner"),
+]
+EXCEPTIONS = {"n": ["geese goose"], "v": ["ran run"], "a": ["better good"], "r": ["better well"]}
+FILES = {"n": "noun", "v": "verb", "a": "adj", "r": "adv"}
+WORDS = ["dog", "Dogs", "geese", "ran", "runs", "running", "boxes", "better", "fast", "well", "cat", ""]
+
+def _write_wordnet(directory):
+    """Write WordNet database files with real byte offsets, as NLTK expects"""
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, "lexnames"), "w") as f:
+        f.write("00\tall.all\t1\n")
+    open(os.path.join(directory, "index.sense"), "w").close()
+    for pos, suffix in FILES.items():
+        header = "  synthetic WordNet test data\n"
+        lines, offsets, offset = [], {}, len(header)
+        for i, (file_pos, synset_pos, lemmas, gloss) in enumerate(SYNSETS):
+            if file_pos != pos:
+                continue
+            words = " ".join(f"{lemma} 0" for lemma in lemmas)
+            # A satellite adjective points at its head (the first adjective)
+            pointers = f"001 & {offsets[7]:08d} a 0000" if synset_pos == "s" else "000"
+            frames = " 00" if pos == "v" else ""
+            line = f"{offset:08d} 00 {synset_pos} {len(lemmas):02x} {words} {pointers}{frames} | {gloss}  \n"
+            lines.append(line)
+            offsets[i] = offset
+            offset += len(line.encode())
+        with open(os.path.join(directory, f"data.{suffix}"), "w") as f:
+            f.write(header + "".join(lines))
+
+        index = {}
+        for i, (file_pos, _, lemmas, _) in enumerate(SYNSETS):
+            if file_pos == pos:
+                for lemma in lemmas:
+                    index.setdefault(lemma, []).append(offsets[i])
+        with open(os.path.join(directory, f"index.{suffix}"), "w") as f:
+            f.write(header)
+            for lemma in sorted(index):
+                found = index[lemma]
+                f.write(f"{lemma} {pos} {len(found)} 0 {len(found)} 0 {' '.join(f'{o:08d}' for o in found)}  \n")
+        with open(os.path.join(directory, f"{suffix}.exc"), "w") as f:
+            f.write("".join(line + "\n" for line in EXCEPTIONS[pos]))
+
+def _nltk_meanings(reader, word):
+    meanings = {}
+    for synset in reader.synsets(word):
+        meanings.setdefault(synset.pos(), []).append(synset.definition())
+    return meanings
+
+@pytest.fixture
+def index(tmp_path):
+    _write_wordnet(str(tmp_path / "wordnet"))
+    index = DictionaryIndex(str(tmp_path / "dictionary_index.db"))
+    assert index.ensure_built(str(tmp_path / "wordnet"))
+    return index
+
+def test_lookup_reduces_inflected_forms(index):
+    """Definitions are grouped by part of speech, reached through morphology"""
+    assert index.lookup("Dogs") == {"n": ["a domesticated canine", "a dull unattractive woman"]}
+    assert index.lookup("geese") == {"n": ["a web-footed water bird"]}
+    assert index.lookup("ran") == {"v": ["move fast on foot"]}
+    assert index.lookup("boxes") == {"n": ["a rectangular container"], "v": ["fight with the fists"]}
+    assert index.lookup("better") == {"a": ["having desirable qualities"], "r": ["in a good manner"]}
+    assert index.lookup("fast") == {"s": ["acting or moving quickly"], "r": ["quickly or rapidly"]}
+    assert index.lookup("cat") == {}
+
+    metrics = index.get_metrics()
+    assert metrics["lookups"] == 7 and metrics["not_found"] == 1
+    index.lookup("dogs")["n"].append("changed")
+    assert index.lookup("dogs")["n"] == ["a domesticated canine", "a dull unattractive woman"]
+    assert index.get_metrics()["memory_hits"] == 2
+
+def test_lookup_matches_nltk_on_same_data(index, tmp_path):
+    """The index gives what grouping wordnet.synsets(word) by pos gave"""
+    from nltk.corpus.reader.wordnet import WordNetCorpusReader
+    reader = WordNetCorpusReader(str(tmp_path / "wordnet"), None)
+    for word in WORDS:
+        assert index.lookup(word) == _nltk_meanings(reader, word), word
+
+def test_missing_data_gives_empty_lookups(tmp_path, monkeypatch):
+    """Without an index or WordNet data lookups are empty rather than failing"""
+    monkeypatch.setattr(dictionary_index_module, "resolve_wordnet_source", lambda directory: (None, None))
+    index = DictionaryIndex(str(tmp_path / "missing.db"), data_dir=str(tmp_path / "no-data"))
+    assert not index.ensure_built()
+    assert index.lookup("dog") == {} and not index.get_metrics()["available"]
+
+def test_provisioned_data_is_verified(tmp_path):
+    """The index is built from checksummed data, rebuilt when it changes, never from corrupt files"""
+    _write_wordnet(str(tmp_path / "source"))
+    data_dir = str(tmp_path / "data" / "wordnet")
+    provision_data_dir(data_dir, source=str(tmp_path / "source"))
+    with open(os.path.join(data_dir, MANIFEST_NAME)) as f:
+        assert len(f.readlines()) == 12
+
+    index = DictionaryIndex(str(tmp_path / "index.db"), data_dir=data_dir)
+    index.start_background_build().join()
+    assert index.lookup("geese") == {"n": ["a web-footed water bird"]}
+    assert index.ensure_built()  # up to date: nothing to do
+
+    # Re-provisioned data with a changed gloss triggers a rebuild
+    with open(str(tmp_path / "source" / "data.noun")) as f:
+        text = f.read()
+    with open(str(tmp_path / "source" / "data.noun"), "w") as f:
+        f.write(text.replace("water bird", "water fowl"))
+    provision_data_dir(data_dir, source=str(tmp_path / "source"))
+    assert index.ensure_built()
+    assert index.lookup("goose") == {"n": ["a web-footed water fowl"]}
+
+    # Files that no longer match the manifest are refused
+    with open(os.path.join(data_dir, "noun.exc"), "a") as f:
+        f.write("mice mouse\n")
+    os.remove(index.path)
+    assert not index.ensure_built()
+    assert index.lookup("dog") == {}
+
+def test_translate_word_and_word_fields_use_index(index, translation_state):
+    """translate_word and word creation read meanings from the index"""
+    translation_state.replace(dictionary_index=index, YOUDAO_APP_KEY="")
+
+    result = asyncio.run(translation_routes.translate_word({"word": "fast", "target_language": "zh"}, None))
+    assert result["part_of_speech"] == ["s", "r"]
+    assert result["english_meanings"] == [["acting or moving quickly"], ["quickly or rapidly"]]
+
+    en_meaning, part_of_speech = word_routes.dictionary_fields("fast")
+    assert part_of_speech == ["a", "r"]
+    assert json.loads(en_meaning) == {"a": "acting or moving quickly", "r": "quickly or rapidly"}
+
+@pytest.mark.skipif(local_nltk_wordnet() is None, reason="NLTK WordNet data not installed")
+def test_full_wordnet_parity_and_speed(tmp_path):
+    """On the real WordNet the index agrees with NLTK for lemmas and inflections"""
+    from nltk.corpus import wordnet
+
+    started = time.perf_counter()
+    count = build_dictionary_index(local_nltk_wordnet(), str(tmp_path / "index.db"))
+    build_time = time.perf_counter() - started
+    index = DictionaryIndex(str(tmp_path / "index.db"), memory_size=0)
+
+    started = time.perf_counter()
+    _nltk_meanings(wordnet, "dog")
+    nltk_first = time.perf_counter() - started
+
+    rng = random.Random(7)
+    lemmas = rng.sample(sorted(wordnet.all_lemma_names()), 1000)
+    words = lemmas + [w + "s" for w in lemmas[:300]] + [w + "ed" for w in lemmas[300:500]] + [
+        w + "ing" for w in lemmas[500:700]
+    ] + ["geese", "ran", "better", "Women", "happiest"]
+
+    started = time.perf_counter()
+    ours = [index.lookup(w) for w in words]
+    index_time = time.perf_counter() - started
+    started = time.perf_counter()
+    theirs = [_nltk_meanings(wordnet, w) for w in words]
+    nltk_time = time.perf_counter() - started
+
+    print(
+        f"\n{count} lemmas indexed in {build_time:.1f}s; first NLTK lookup {nltk_first * 1000:.0f} ms; "
+        f"per lookup: index {index_time / len(words) * 1000:.3f} ms, "
+        f"warm NLTK {nltk_time / len(words) * 1000:.3f} ms"
+    )
+    assert ours == theirs
@@ -0,0 +1,201 @@
+# test/test_email_outbox.py
+import sys
+import os
+import time
+import socket
+import asyncio
+import tempfile
+import pytest
+from aiosmtpd.controller import Controller
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.utils.email_outbox as email_outbox
+from app.utils.email_outbox import EmailOutbox, EmailOutboxWorker
+from app.utils.email_utils import SMTPSession
+
+class _RecordingHandler:
+    """aiosmtpd handler that records messages and can refuse recipients"""
+
+    def __init__(self):
+        self.messages = []
+        self.sessions = 0
+        self.temporary_failures = {}  # recipient -> remaining 451 replies
+        self.rejected = set()
+        self.delay = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.rejected:
+            return "550 No such user"
+        if self.temporary_failures.get(address, 0) > 0:
+            self.temporary_failures[address] -= 1
+            return "451 Try again later"
+        envelope.rcpt_tos.append(address)
+        return "250 OK"
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.delay)
+        self.messages.append((envelope.rcpt_tos[0], envelope.content.decode("utf8", errors="replace")))
+        return "250 Message accepted for delivery"
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _start_smtp_server():
+    handler = _RecordingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+    return controller, handler
+
+def _session(controller):
+    return SMTPSession({
+        "smtp_server": controller.hostname,
+        "smtp_port": controller.port,
+        "email_sender": "tutor@example.com",
+        "email_username": "tutor@example.com",
+        "email_password": None,
+        "use_tls": False,
+    })
+
+def _outbox(**kwargs):
+    return EmailOutbox(os.path.join(tempfile.mkdtemp(), "email_outbox.db"), **kwargs)
+
+def test_outbox_reuses_one_smtp_session():
+    """A batch of queued emails goes out over a single SMTP connection"""
+    controller, handler = _start_smtp_server()
+    try:
+        async def scenario():
+            outbox = _outbox()
+            worker = EmailOutboxWorker(outbox, _session(controller), batch_size=50)
+            for i in range(120):
+                await outbox.enqueue(f"student{i}@example.com", "Your key", f"Key {i}", "<p>Key</p>")
+
+            started = time.perf_counter()
+            while await worker.run_once():
+                pass
+            elapsed = time.perf_counter() - started
+            counts = await outbox.status_counts()
+            await worker.stop()
+            await outbox.close()
+            return elapsed, counts, worker.get_metrics()
+
+        elapsed, counts, metrics = asyncio.run(scenario())
+    finally:
+        controller.stop()
+
+    print(f"\nSent 120 queued emails in {elapsed:.2f}s over {handler.sessions} SMTP session(s)")
+    assert counts == {"sent": 120}
+    assert len(handler.messages) == 120
+    assert handler.sessions == 1
+    assert metrics["batches"] == 3 and metrics["smtp_connections"] == 1
+
+def test_outbox_retries_with_backoff():
+    """Temporary failures are retried later; permanent ones fail at once"""
+    controller, handler = _start_smtp_server()
+    handler.temporary_failures["flaky@example.com"] = 1
+    handler.rejected.add("missing@example.com")
+    try:
+        async def scenario():
+            outbox = _outbox(retry_base=0.2)
+            worker = EmailOutboxWorker(outbox, _session(controller))
+            for recipient in ("ok@example.com", "flaky@example.com", "missing@example.com"):
+                await outbox.enqueue(recipient, "Your key", "Key")
+
+            await worker.run_once()
+            first = await outbox.status_counts()
+            # The retry is not due yet
+            assert await worker.run_once() == 0
+            await asyncio.sleep(0.25)
+            await worker.run_once()
+            second = await outbox.status_counts()
+            await worker.stop()
+            await outbox.close()
+            return first, second
+
+        first, second = asyncio.run(scenario())
+    finally:
+        controller.stop()
+
+    assert first == {"sent": 1, "pending": 1, "failed": 1}
+    assert second == {"sent": 2, "failed": 1}
+    assert sorted(recipient for recipient, _ in handler.messages) == ["flaky@example.com", "ok@example.com"]
+
+def test_outbox_survives_restart():
+    """Queued emails persist until a worker sends them"""
+    controller, handler = _start_smtp_server()
+    path = os.path.join(tempfile.mkdtemp(), "email_outbox.db")
+    try:
+        async def scenario():
+            outbox = EmailOutbox(path)
+            await outbox.enqueue("later@example.com", "Your key", "Key")
+            await outbox.close()
+
+            restarted = EmailOutbox(path)
+            worker = EmailOutboxWorker(restarted, _session(controller))
+            worker.start()
+            worker.wake()
+            for _ in range(50):
+                if (await restarted.status_counts()).get("sent"):
+                    break
+                await asyncio.sleep(0.02)
+            await worker.stop()
+            counts = await restarted.status_counts()
+            await restarted.close()
+            return counts
+
+        counts = asyncio.run(scenario())
+    finally:
+        controller.stop()
+
+    assert counts == {"sent": 1}
+    assert handler.messages[0][0] == "later@example.com"
+
+def test_slow_batch_is_not_reclaimed(monkeypatch):
+    """A batch taking longer than the stale timeout stays with its worker"""
+    monkeypatch.setattr(email_outbox, "STALE_CLAIM_TIMEOUT", 0.2)
+    controller, handler = _start_smtp_server()
+    handler.delay = 0.1
+    path = os.path.join(tempfile.mkdtemp(), "email_outbox.db")
+    try:
+        async def scenario():
+            outbox = EmailOutbox(path)
+            other_worker = EmailOutbox(path)
+            for i in range(6):
+                await outbox.enqueue(f"student{i}@example.com", "Your key", f"Key {i}")
+            worker = EmailOutboxWorker(outbox, _session(controller), batch_size=6)
+            sending = asyncio.create_task(worker.run_once())
+            while "sending" not in await outbox.status_counts():
+                await asyncio.sleep(0.01)
+            # Another worker polls while the batch is being sent
+            stolen = []
+            while not sending.done():
+                stolen.extend(await other_worker.claim_batch(6))
+                await asyncio.sleep(0.05)
+            await sending
+            counts = await outbox.status_counts()
+            await worker.stop()
+            await outbox.close()
+            await other_worker.close()
+            return stolen, counts
+
+        stolen, counts = asyncio.run(scenario())
+    finally:
+        controller.stop()
+
+    assert stolen == []
+    assert counts == {"sent": 6}
+    assert len(handler.messages) == 6
+
+if __name__ == "__main__":
+    test_outbox_reuses_one_smtp_session()
+    test_outbox_retries_with_backoff()
+    test_outbox_survives_restart()
+    test_slow_batch_is_not_reclaimed(pytest.MonkeyPatch())
@@ -0,0 +1,111 @@
+# test/test_license_cache.py
+import sys
+import os
+import time
+import asyncio
+from bson import ObjectId
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.license_cache import LicenseStatusCache, license_cache
+from app.database.license_db import get_user_license_status, activate_license, revoke_license
+from app.dependencies import UserInToken
+from app.routes import user_routes
+
+class _CountingCollection:
+    """In-memory collection that counts round trips"""
+
+    def __init__(self, docs):
+        self.docs = docs
+        self.calls = 0
+
+    def _match(self, doc, query):
+        return all(doc.get(k) == v for k, v in query.items())
+
+    async def find_one(self, query):
+        self.calls += 1
+        return next((d for d in self.docs if self._match(d, query)), None)
+
+    async def update_one(self, query, update):
+        self.calls += 1
+        for doc in self.docs:
+            if self._match(doc, query):
+                doc.update(update["$set"])
+                return type("Result", (), {"modified_count": 1})()
+        return type("Result", (), {"modified_count": 0})()
+
+class _FakeDB:
+    def __init__(self, user_id):
+        self.users = _CountingCollection([{"_id": user_id, "has_valid_license": False}])
+        self.licenses = _CountingCollection([{"license_key": "KEY-1", "status": "active", "user_id": None}])
+
+    @property
+    def calls(self):
+        return self.users.calls + self.licenses.calls
+
+def test_cache_ttl_and_invalidation():
+    """Entries expire after their TTL and negative results use the shorter TTL"""
+    cache = LicenseStatusCache(ttl=0.2, negative_ttl=0.05)
+    cache.put("licensed", {"has_license": True})
+    cache.put("unlicensed", {"has_license": False})
+    assert cache.get("licensed") == {"has_license": True}
+    assert cache.get("unlicensed") == {"has_license": False}
+
+    time.sleep(0.1)
+    assert cache.get("unlicensed") is None
+    assert cache.get("licensed") is not None
+
+    cache.invalidate("licensed")
+    assert cache.get("licensed") is None
+    assert cache.stats["invalidations"] == 1
+
+def test_license_gate_hot_path_skips_database():
+    """Repeated checks are answered from the cache until the license changes"""
+    user_id = ObjectId()
+    db = _FakeDB(user_id)
+    license_cache.clear()
+
+    async def scenario():
+        assert not (await get_user_license_status(db, str(user_id)))["has_license"]
+
+        assert (await activate_license(db, "KEY-1", str(user_id)))["success"]
+        # Activation invalidated the cached negative result
+        calls = db.calls
+        assert (await get_user_license_status(db, str(user_id)))["has_license"]
+        assert db.calls > calls
+
+        calls = db.calls
+        for _ in range(100):
+            assert (await get_user_license_status(db, str(user_id)))["has_license"]
+        assert db.calls == calls
+
+        assert (await revoke_license(db, "KEY-1"))["success"]
+        assert not (await get_user_license_status(db, str(user_id)))["has_license"]
+
+    asyncio.run(scenario())
+
+def test_license_status_route_uses_cache():
+    """GET /users/license-status answers through the cached license check"""
+    user_id = ObjectId()
+    db = _FakeDB(user_id)
+    license_cache.clear()
+    user = UserInToken(username="learner", user_id=str(user_id))
+
+    async def scenario():
+        before = await user_routes.get_user_license_status(current_user=user, db=db)
+        assert (await activate_license(db, "KEY-1", str(user_id)))["success"]
+        after = await user_routes.get_user_license_status(current_user=user, db=db)
+        calls = db.calls
+        again = await user_routes.get_user_license_status(current_user=user, db=db)
+        return before, after, again, db.calls - calls
+
+    before, after, again, extra_calls = asyncio.run(scenario())
+    assert before["has_valid_license"] is False
+    assert after["has_valid_license"] is True and after["license_key"] == "KEY-1"
+    assert again == after and extra_calls == 0
+
+if __name__ == "__main__":
+    test_cache_ttl_and_invalidation()
+    test_license_gate_hot_path_skips_database()
+    test_license_status_route_uses_cache()
@@ -0,0 +1,175 @@
+# test/test_license_file_batch.py
+import sys
+import os
+import re
+import time
+import asyncio
+from bson import ObjectId
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.license_db import activate_license, activate_license_batch
+from app.utils.license_utils import generate_license_keys, parse_license_file_entries
+
+FILE_KEYS = 10_000
+SIMULATED_RTT = 0.0002  # seconds per database round trip
+
+class _Result:
+    def __init__(self, modified_count):
+        self.modified_count = modified_count
+
+class _Collection:
+    """In-memory collection with a simulated round-trip latency"""
+
+    def __init__(self, docs):
+        self.docs = {doc["key"]: doc for doc in docs}
+        self.round_trips = 0
+
+    async def _round_trip(self):
+        self.round_trips += 1
+        await asyncio.sleep(SIMULATED_RTT)
+
+    def _matches(self, doc, query):
+        for field, condition in query.items():
+            if isinstance(condition, dict):
+                if "$in" in condition and doc.get(field) not in condition["$in"]:
+                    return False
+                if "$ne" in condition and doc.get(field) == condition["$ne"]:
+                    return False
+            elif doc.get(field) != condition:
+                return False
+        return True
+
+    def _lookup(self, query):
+        # Index lookups on the unique key, a scan otherwise
+        key_field = "license_key" if "license_key" in query else "_id"
+        value = query.get(key_field)
+        if isinstance(value, dict) and "$in" in value:
+            candidates = [self.docs[k] for k in value["$in"] if k in self.docs]
+        elif value is not None:
+            candidates = [self.docs[value]] if value in self.docs else []
+        else:
+            candidates = list(self.docs.values())
+        return [doc for doc in candidates if self._matches(doc, query)]
+
+    async def find_one(self, query):
+        await self._round_trip()
+        found = self._lookup(query)
+        return found[0] if found else None
+
+    def find(self, query, projection=None):
+        collection = self
+
+        class Cursor:
+            async def to_list(self, length):
+                await collection._round_trip()
+                return collection._lookup(query)
+
+        return Cursor()
+
+    async def update_one(self, query, update):
+        await self._round_trip()
+        found = self._lookup(query)
+        if found:
+            found[0].update(update["$set"])
+        return _Result(len(found))
+
+class _FakeDB:
+    def __init__(self, license_keys, user_id):
+        self.licenses = _Collection([
+            {"key": key, "license_key": key, "status": "active", "user_id": None}
+            for key in license_keys
+        ])
+        self.users = _Collection([{"key": ObjectId(user_id), "_id": ObjectId(user_id)}])
+
+    @property
+    def round_trips(self):
+        return self.licenses.round_trips + self.users.round_trips
+
+def _legacy_parse_license_file(file_content):
+    """parse_license_file before batching: an uncompiled regex per line"""
+    valid_keys = []
+    for line in file_content.replace(',', '\n').split('\n'):
+        line = line.strip().replace('"', '').replace("'", '')
+        if bool(re.match(r'^[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}-[A-Z0-9]{4}$', line)):
+            valid_keys.append(line)
+    return valid_keys
+
+async def _legacy_upload(db, file_content, user_id):
+    """upload_license_file before batching: one activation attempt per key"""
+    for key in _legacy_parse_license_file(file_content):
+        result = await activate_license(db, key, user_id)
+        if result["success"]:
+            return key
+    return None
+
+async def _batch_upload(db, file_content, user_id):
+    license_keys, invalid_entries = parse_license_file_entries(file_content)
+    result = await activate_license_batch(db, license_keys, user_id, invalid_entries)
+    return result["activated"]
+
+def test_batch_activation_report():
+    """Each key in the file gets a status and only one key is claimed"""
+    user_id = str(ObjectId())
+    other_user = str(ObjectId())
+    keys = generate_license_keys(5)
+    db = _FakeDB(keys[:4], user_id)
+    db.licenses.docs[keys[0]]["status"] = "revoked"
+    db.licenses.docs[keys[1]]["user_id"] = other_user
+
+    file_content = "\n".join(["License file", *keys, keys[2]])
+    license_keys, invalid_entries = parse_license_file_entries(file_content)
+    result = asyncio.run(activate_license_batch(db, license_keys, user_id, invalid_entries))
+
+    assert result["success"] and result["activated"] == keys[2]
+    assert {r["license_key"]: r["status"] for r in result["results"]} == {
+        keys[0]: "revoked",
+        keys[1]: "in_use",
+        keys[2]: "activated",
+        keys[3]: "not_needed",
+        keys[4]: "not_found",
+        "License file": "invalid_format",
+    }
+    assert db.users.docs[ObjectId(user_id)]["license_key"] == keys[2]
+
+    # Uploading again reports the key the user already holds
+    again = asyncio.run(activate_license_batch(db, license_keys, user_id))
+    assert again["success"] and again["activated"] is None
+    assert {"license_key": keys[2], "status": "already_activated"} in again["results"]
+
+def test_license_file_benchmark_10k_keys():
+    """10k-key file where only the last key is usable: batch vs per-key flow"""
+    user_id = str(ObjectId())
+    keys = generate_license_keys(FILE_KEYS)
+    file_content = "\n".join(keys)
+
+    started = time.perf_counter()
+    for _ in range(10):
+        _legacy_parse_license_file(file_content)
+    legacy_parse = (time.perf_counter() - started) / 10
+    started = time.perf_counter()
+    for _ in range(10):
+        parse_license_file_entries(file_content)
+    batch_parse = (time.perf_counter() - started) / 10
+
+    timings = {}
+    round_trips = {}
+    for name, upload in (("per-key", _legacy_upload), ("batch", _batch_upload)):
+        db = _FakeDB(keys[-1:], user_id)
+        started = time.perf_counter()
+        assert asyncio.run(upload(db, file_content, user_id)) == keys[-1]
+        timings[name] = time.perf_counter() - started
+        round_trips[name] = db.round_trips
+
+    print(
+        f"\nParse {FILE_KEYS:,} keys: {legacy_parse * 1000:.1f} ms before, {batch_parse * 1000:.1f} ms after"
+        f"\nActivate: per-key {timings['per-key']:.2f}s / {round_trips['per-key']} round trips, "
+        f"batch {timings['batch'] * 1000:.1f} ms / {round_trips['batch']} round trips"
+    )
+    assert round_trips["batch"] == 3
+    assert timings["batch"] < timings["per-key"]
+
+if __name__ == "__main__":
+    test_batch_activation_report()
+    test_license_file_benchmark_10k_keys()
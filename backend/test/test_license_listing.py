@@ -0,0 +1,214 @@
+# test/test_license_listing.py
+import sys
+import os
+import csv
+import io
+import asyncio
+import tracemalloc
+from datetime import datetime, timedelta
+from bson import ObjectId
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.routes.license_routes import router, _license_csv_rows
+from app.auth.auth_handler import is_admin
+from app.database.mongodb_connection import get_db
+
+START = datetime(2025, 1, 1)
+
+def _license(i, minutes=None):
+    """Deterministic license document number i, issued `minutes` (default i) after START"""
+    return {
+        "_id": ObjectId(f"{i:024x}"),
+        "license_key": f"KEY-{i:012d}",
+        "status": "used" if i % 3 == 0 else "active",
+        "issued_date": START + timedelta(minutes=i if minutes is None else minutes(i)),
+        "user_id": None,
+        "activated_at": None,
+        "created_by": "admin-a" if i % 2 == 0 else "admin-b",
+        "notes": "x" * 200,  # not part of the listing projection
+    }
+
+def _matches(doc, query):
+    for field, condition in query.items():
+        if field == "$or":
+            if not any(_matches(doc, option) for option in condition):
+                return False
+            continue
+        value = doc.get(field)
+        if isinstance(condition, dict):
+            if "$gt" in condition and not value > condition["$gt"]:
+                return False
+            if "$gte" in condition and not value >= condition["$gte"]:
+                return False
+            if "$lt" in condition and not value < condition["$lt"]:
+                return False
+        elif value != condition:
+            return False
+    return True
+
+class _Cursor:
+    """Lazy cursor over generated licenses; sorted in memory unless by _id"""
+
+    def __init__(self, total, query, projection, minutes, sorts):
+        self.total = total
+        self.query = query
+        self.projection = projection
+        self.minutes = minutes
+        self.sorts = sorts
+        self._limit = None
+        self._sort = None
+
+    def sort(self, keys):
+        self._sort = keys
+        self.sorts.append(keys)
+        return self
+
+    def limit(self, limit):
+        self._limit = limit
+        return self
+
+    def _docs(self):
+        docs = (_license(i, self.minutes) for i in range(self.total))
+        if self._sort == [("_id", 1)]:
+            return docs
+        return sorted(docs, key=lambda doc: tuple(doc[field] for field, _ in self._sort))
+
+    def _iter(self):
+        returned = 0
+        for doc in self._docs():
+            if _matches(doc, self.query):
+                yield {k: v for k, v in doc.items() if k == "_id" or k in self.projection}
+                returned += 1
+                if self._limit and returned >= self._limit:
+                    return
+
+    async def to_list(self, length):
+        return list(self._iter())
+
+    async def __aiter__(self):
+        for doc in self._iter():
+            yield doc
+
+class _Licenses:
+    def __init__(self, total, minutes):
+        self.total = total
+        self.minutes = minutes
+        self.sorts = []
+
+    def find(self, query, projection=None, batch_size=None):
+        return _Cursor(self.total, query, projection, self.minutes, self.sorts)
+
+class _FakeDB:
+    def __init__(self, total, minutes=None):
+        self.licenses = _Licenses(total, minutes)
+
+def _client(total, db=None):
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[is_admin] = lambda: {"username": "admin"}
+    app.dependency_overrides[get_db] = lambda: db or _FakeDB(total)
+    return TestClient(app)
+
+def test_keyset_pagination_walks_every_license():
+    """Following X-Next-Cursor visits every license exactly once"""
+    client = _client(250)
+    seen = []
+    params = {"limit": 100}
+    while True:
+        response = client.get("/licenses/all", params=params)
+        assert response.status_code == 200
+        page = response.json()
+        seen.extend(license["license_key"] for license in page)
+        assert all("notes" not in license for license in page)
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params["after"] = cursor
+
+    assert seen == [f"KEY-{i:012d}" for i in range(250)]
+
+def test_filters():
+    """status, created_by and the issued date range are applied server side"""
+    client = _client(300)
+    response = client.get("/licenses/all", params={
+        "status": "used",
+        "created_by": "admin-a",
+        "issued_from": (START + timedelta(minutes=60)).isoformat(),
+        "issued_to": (START + timedelta(minutes=120)).isoformat(),
+    })
+    keys = [license["license_key"] for license in response.json()]
+    assert keys == [f"KEY-{i:012d}" for i in range(60, 120) if i % 6 == 0]
+
+    assert client.get("/licenses/all", params={"after": "not-an-id"}).status_code == 400
+    assert client.get("/licenses/all", params={"status": "bogus"}).status_code == 422
+
+def test_date_range_pages_follow_the_date_index():
+    """With a date range, pages are sorted and paginated on (issued_date, _id)"""
+    # Issue dates out of _id order, two licenses per minute
+    shuffled = lambda i: (i * 37) % 300 // 2
+    db = _FakeDB(300, minutes=shuffled)
+    client = _client(300, db)
+    issued = {"issued_from": (START + timedelta(minutes=20)).isoformat(),
+              "issued_to": (START + timedelta(minutes=90)).isoformat()}
+    seen = []
+    params = {"limit": 7, **issued}
+    while True:
+        response = client.get("/licenses/all", params=params)
+        assert response.status_code == 200
+        seen.extend(license["license_key"] for license in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        params["after"] = cursor
+
+    expected = sorted(
+        (doc for doc in (_license(i, shuffled) for i in range(300))
+         if START + timedelta(minutes=20) <= doc["issued_date"] < START + timedelta(minutes=90)),
+        key=lambda doc: (doc["issued_date"], doc["_id"])
+    )
+    assert seen == [doc["license_key"] for doc in expected]
+    assert set(map(tuple, db.licenses.sorts)) == {(("issued_date", 1), ("_id", 1))}
+
+    # An _id cursor is not a date cursor
+    bad = client.get("/licenses/all", params={"after": str(ObjectId()), **issued})
+    assert bad.status_code == 400
+
+def _csv_peak_memory(total):
+    # Drain the response generator directly: TestClient buffers whole bodies
+    async def drain():
+        rows = 0
+        async for chunk in _license_csv_rows(_FakeDB(total), {}):
+            rows += chunk.count("\n")
+        return rows
+
+    tracemalloc.start()
+    rows = asyncio.run(drain())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert rows == total + 1  # header
+    return peak
+
+def test_csv_export_memory_is_constant():
+    """Streaming the CSV export does not grow with the number of licenses"""
+    small = _csv_peak_memory(10_000)
+    large = _csv_peak_memory(100_000)
+    print(f"\nCSV export peak memory: {small / 1024:.0f} KiB for 10k, {large / 1024:.0f} KiB for 100k")
+    assert large < small * 2
+
+def test_csv_export_content():
+    """The CSV export contains the projected fields for every license"""
+    response = _client(10).get("/licenses/all", params={"format": "csv", "status": "used"})
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["license_key"] for row in rows] == [f"KEY-{i:012d}" for i in (0, 3, 6, 9)]
+    assert "notes" not in rows[0]
+
+if __name__ == "__main__":
+    test_keyset_pagination_walks_every_license()
+    test_filters()
+    test_date_range_pages_follow_the_date_index()
+    test_csv_export_memory_is_constant()
+    test_csv_export_content()
@@ -0,0 +1,156 @@
+# test/test_license_roster.py
+import sys
+import os
+import time
+import base64
+import socket
+import asyncio
+import tempfile
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from aiosmtpd.controller import Controller
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.utils.email_outbox as outbox_module
+from app.config import settings
+from app.routes.license_routes import router
+from app.auth.auth_handler import is_admin
+from app.database.mongodb_connection import get_db
+from app.utils.email_outbox import EmailOutbox, EmailOutboxWorker
+from app.utils.email_utils import SMTPSession
+from app.utils.license_utils import parse_roster_csv
+
+STUDENTS = 2000
+
+class _Admin:
+    user_id = "admin-1"
+
+class _Licenses:
+    def __init__(self):
+        self.docs = []
+        self.insert_calls = 0
+
+    async def insert_many(self, documents, ordered=True):
+        self.insert_calls += 1
+        self.docs.extend(documents)
+
+class _Jobs:
+    def __init__(self):
+        self.docs = {}
+
+    async def insert_one(self, document):
+        self.docs[document["job_id"]] = document
+
+    async def find_one(self, query, projection=None):
+        return self.docs.get(query["job_id"])
+
+class _FakeDB:
+    def __init__(self):
+        self.licenses = _Licenses()
+        self.license_jobs = _Jobs()
+
+class _CountingHandler:
+    def __init__(self):
+        self.sessions = 0
+        self.recipients = []
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.sessions += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.recipients.extend(envelope.rcpt_tos)
+        return "250 Message accepted for delivery"
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _roster_csv(count):
+    lines = ["username,email"] + [f"student{i},student{i}@example.edu" for i in range(count)]
+    return base64.b64encode("\n".join(lines).encode()).decode()
+
+def test_parse_roster_csv():
+    """Header detection, optional usernames and rejected rows"""
+    students, rejected = parse_roster_csv("a@example.edu,Alice\nnot-an-email\nb@example.edu\nA@example.edu\n")
+    assert students == [
+        {"email": "a@example.edu", "username": "Alice"},
+        {"email": "b@example.edu", "username": None},
+    ]
+    assert [(r["row"], r["error"]) for r in rejected] == [
+        (2, "Invalid email address"), (4, "Duplicate email address")
+    ]
+
+def test_roster_onboarding_2000_students():
+    """2000 licenses are created in one insert and mailed over one SMTP session"""
+    handler = _CountingHandler()
+    controller = Controller(handler, hostname="127.0.0.1", port=_free_port())
+    controller.start()
+
+    db = _FakeDB()
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[is_admin] = lambda: _Admin()
+    app.dependency_overrides[get_db] = lambda: db
+
+    original_outbox, original_sender = outbox_module.email_outbox, settings.EMAIL_SENDER
+    outbox = EmailOutbox(os.path.join(tempfile.mkdtemp(), "email_outbox.db"))
+    outbox_module.email_outbox = outbox
+    settings.EMAIL_SENDER = "tutor@example.com"
+    try:
+        client = TestClient(app)
+        started = time.perf_counter()
+        response = client.post("/licenses/roster", json={"file_content": _roster_csv(STUDENTS)})
+        api_time = time.perf_counter() - started
+        assert response.status_code == 202, response.text
+        job_id = response.json()["job_id"]
+
+        progress = client.get(f"/licenses/roster/{job_id}").json()
+        assert progress["total"] == STUDENTS and progress["pending"] == STUDENTS
+        assert not progress["done"]
+
+        session = SMTPSession({
+            "smtp_server": "127.0.0.1",
+            "smtp_port": controller.port,
+            "email_sender": "tutor@example.com",
+            "email_username": "tutor@example.com",
+            "email_password": None,
+            "use_tls": False,
+        })
+        worker = EmailOutboxWorker(outbox, session, batch_size=500)
+
+        async def drain():
+            while await worker.run_once():
+                pass
+            await worker.stop()
+            await outbox.close()
+
+        # The outbox connection belongs to the TestClient loop; drain it over a fresh one
+        asyncio.run(outbox.close())
+        started = time.perf_counter()
+        asyncio.run(drain())
+        delivery_time = time.perf_counter() - started
+
+        progress = client.get(f"/licenses/roster/{job_id}").json()
+        asyncio.run(outbox.close())
+    finally:
+        outbox_module.email_outbox, settings.EMAIL_SENDER = original_outbox, original_sender
+        controller.stop()
+
+    print(
+        f"\nRoster of {STUDENTS}: API {api_time * 1000:.0f} ms, "
+        f"delivery {delivery_time:.2f}s over {handler.sessions} SMTP session(s)"
+    )
+    assert progress["sent"] == STUDENTS and progress["done"]
+    assert db.licenses.insert_calls == 1 and len(db.licenses.docs) == STUDENTS
+    assert len(set(handler.recipients)) == STUDENTS
+    assert handler.sessions == 1
+    assert api_time < 5
+
+if __name__ == "__main__":
+    test_parse_roster_csv()
+    test_roster_onboarding_2000_students()
@@ -0,0 +1,133 @@
+# test/test_login_latency.py
+import sys
+import os
+import time
+import asyncio
+import uuid
+import pytest
+from urllib.parse import urlparse
+from pymongo import MongoClient
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.database.mongodb_utils as mdb
+from app.database.mongodb_utils import MongoDBClient
+from app.auth.refresh_tokens import new_token_family, refresh_token_record
+from app.utils.timezone_utils import get_hk_time
+
+# Local mongod the benchmark talks to through a latency proxy
+MONGODB_BENCH_URL = os.getenv("MONGODB_BENCH_URL", "mongodb://localhost:27017")
+ONE_WAY_DELAY = 0.010  # 20 ms round trip
+LOGINS = 20
+
+async def _pipe(reader, writer, delay):
+    """Forward bytes from reader to writer, delaying each chunk"""
+    try:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            await asyncio.sleep(delay)
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+async def _start_latency_proxy(target_host, target_port, delay):
+    """TCP proxy adding `delay` seconds in each direction"""
+    async def handle(client_reader, client_writer):
+        server_reader, server_writer = await asyncio.open_connection(target_host, target_port)
+        await asyncio.gather(
+            _pipe(client_reader, server_writer, delay),
+            _pipe(server_reader, client_writer, delay),
+        )
+
+    return await asyncio.start_server(handle, "127.0.0.1", 0)
+
+def _mongod_available():
+    try:
+        MongoClient(MONGODB_BENCH_URL, serverSelectionTimeoutMS=500).admin.command("ping")
+        return True
+    except Exception:
+        return False
+
+async def _legacy_login(client, username):
+    """Login write path before coalescing: every step awaited in sequence"""
+    db = client.async_db
+    await db.users.find_one({"username": username})  # authenticate_user
+    time_now = get_hk_time()
+    await db.users.update_one({"username": username}, {"$set": {"last_login": time_now}})
+    user_doc = await mdb.get_user(client, username=username)
+    await mdb.add_event(client, user_doc["userid"], "login", time_now)
+    family_id = new_token_family()
+    await db.users.update_one(
+        {"username": username},
+        {"$set": {"refresh_token": refresh_token_record(family_id, uuid.uuid4().hex)}}
+    )
+
+async def _coalesced_login(client, username):
+    """Current login write path: one update, event written in the background"""
+    db = client.async_db
+    await db.users.find_one({"username": username})  # authenticate_user
+    time_now = get_hk_time()
+    family_id = new_token_family()
+    user_doc = await mdb.record_login(
+        client, username, time_now,
+        refresh_token_record(family_id, uuid.uuid4().hex, issued_at=time_now)
+    )
+    mdb.schedule_event(client, user_doc["userid"], "login", time_now)
+
+async def _run_benchmark(monkeypatch):
+    target = urlparse(MONGODB_BENCH_URL)
+    proxy = await _start_latency_proxy(target.hostname, target.port or 27017, ONE_WAY_DELAY)
+    proxy_port = proxy.sockets[0].getsockname()[1]
+
+    monkeypatch.setenv("MONGODB_URL", f"mongodb://127.0.0.1:{proxy_port}/?directConnection=true")
+    monkeypatch.setenv("MONGODB_DB_NAME", f"login_bench_{uuid.uuid4().hex[:8]}")
+    client = MongoDBClient()
+    await client.connect_async()
+    username = "login_bench_user"
+    await client.async_db.users.insert_one({"userid": 1, "username": username})
+
+    try:
+        timings = {}
+        for name, login in (("legacy", _legacy_login), ("coalesced", _coalesced_login)):
+            await login(client, username)  # warm up the connection pool
+            started = time.perf_counter()
+            for _ in range(LOGINS):
+                await login(client, username)
+            timings[name] = (time.perf_counter() - started) / LOGINS
+
+        # Background event writes still land
+        await asyncio.sleep(ONE_WAY_DELAY * 10)
+        events = await client.async_db.usage_logs.count_documents({"event_type": "login"})
+        user_doc = await client.async_db.users.find_one({"username": username})
+    finally:
+        await client.async_client.drop_database(client.db_name)
+        await client.close_async()
+        proxy.close()
+        await proxy.wait_closed()
+
+    return timings, events, user_doc
+
+def test_login_latency_with_20ms_rtt(monkeypatch):
+    """Coalesced login needs far fewer round trips than the old sequence"""
+    if not _mongod_available():
+        pytest.skip(f"no mongod reachable at {MONGODB_BENCH_URL}")
+
+    timings, events, user_doc = asyncio.run(_run_benchmark(monkeypatch))
+
+    print(
+        f"\nLogin write path at 20 ms RTT: legacy {timings['legacy'] * 1000:.1f} ms, "
+        f"coalesced {timings['coalesced'] * 1000:.1f} ms"
+    )
+    assert events == 2 * (LOGINS + 1)
+    assert "last_login" in user_doc and "digest" in user_doc["refresh_token"]
+    assert timings["coalesced"] < timings["legacy"] / 2
+
+if __name__ == "__main__":
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        test_login_latency_with_20ms_rtt(monkeypatch)
@@ -0,0 +1,168 @@
+# test/test_mongodb_connection.py
+import sys
+import os
+import time
+import asyncio
+import threading
+from types import SimpleNamespace
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.mongodb_connection import MongoConnectionManager, MongoUnavailableError
+from app.database.mongodb_utils.failure_monitor import failure_monitor
+from app.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+class _FlakyClient:
+    """Stand-in for MongoDBClient whose server can be switched off"""
+    instances = 0
+    down = True
+
+    def __init__(self):
+        type(self).instances += 1
+        self.pings = 0
+        self.async_db = object()
+
+    async def connect_async(self):
+        self.pings += 1
+        await asyncio.sleep(0.01)
+        if type(self).down:
+            raise ConnectionError("server selection timed out")
+        return True
+
+    async def close_async(self):
+        pass
+
+def test_circuit_breaker_states():
+    """Opens after the threshold, half-opens after the timeout, closes on success"""
+    breaker = CircuitBreaker("service", failure_threshold=2, reset_timeout=0.05)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    try:
+        breaker.check()
+        assert False, "open circuit should refuse calls"
+    except CircuitOpenError as e:
+        assert 0 < e.retry_after <= 0.05
+
+    time.sleep(0.06)
+    assert breaker.state == "half_open" and breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.get_metrics()["opened"] == 2
+
+def test_readiness_gate_fails_fast_and_reconnects():
+    """One client, one shared readiness future, fail fast while down, recover in the background"""
+    _FlakyClient.instances = 0
+    _FlakyClient.down = True
+
+    async def scenario():
+        manager = MongoConnectionManager(
+            client_factory=_FlakyClient,
+            ready_timeout=0.3,
+            health_check_interval=0.05,
+            reconnect_max_delay=0.05,
+            breaker=CircuitBreaker("mongodb", failure_threshold=3, reset_timeout=1),
+        )
+        manager.start()
+
+        # Requests arriving before the first attempt fails wait, then give up
+        results = await asyncio.gather(
+            *(manager.wait_ready() for _ in range(100)), return_exceptions=True
+        )
+        assert all(isinstance(r, MongoUnavailableError) for r in results)
+
+        # With the circuit open, new requests fail without waiting
+        started = time.perf_counter()
+        for _ in range(100):
+            try:
+                await manager.wait_ready()
+            except MongoUnavailableError:
+                pass
+        fail_fast = (time.perf_counter() - started) / 100
+
+        # The server comes back: the background task reconnects on its own
+        _FlakyClient.down = False
+        manager.breaker.record_success()  # let requests wait on the future again
+        clients = await asyncio.gather(*(manager.wait_ready(timeout=1) for _ in range(100)))
+        assert len({id(c) for c in clients}) == 1
+
+        # A later outage is noticed by the health check
+        _FlakyClient.down = True
+        await asyncio.sleep(0.1)
+        assert not manager.is_ready
+        metrics = manager.get_metrics()
+        await manager.stop()
+        return fail_fast, metrics
+
+    fail_fast, metrics = asyncio.run(scenario())
+
+    print(f"\nFail-fast while MongoDB is down: {fail_fast * 1e6:.1f} us per request")
+    assert fail_fast < 0.001
+    assert _FlakyClient.instances == 1
+    assert metrics["connects"] == 1 and metrics["disconnects"] == 1
+    assert metrics["circuit"]["state"] == "open"
+
+def test_ready_callbacks_run_once():
+    """Startup work (init_db) runs after the first successful connection only"""
+    _FlakyClient.down = False
+    calls = []
+
+    async def scenario():
+        manager = MongoConnectionManager(client_factory=_FlakyClient, health_check_interval=0.01)
+
+        async def on_ready():
+            calls.append(time.perf_counter())
+
+        manager.on_ready(on_ready)
+        await manager.wait_ready()
+        await asyncio.sleep(0.05)
+        await manager.stop()
+
+    asyncio.run(scenario())
+    assert len(calls) == 1
+
+def test_driver_failures_reach_the_manager():
+    """Network errors seen on driver threads re-check the connection right away"""
+    _FlakyClient.down = False
+
+    def command_failed(errtype):
+        event = SimpleNamespace(failure={"errtype": errtype, "errmsg": "boom"})
+        thread = threading.Thread(target=failure_monitor.failed, args=(event,))
+        thread.start()
+        thread.join()
+
+    async def scenario():
+        manager = MongoConnectionManager(client_factory=_FlakyClient, health_check_interval=10)
+        await manager.wait_ready()
+
+        # A server error says nothing about reachability
+        command_failed("DuplicateKeyError")
+        await asyncio.sleep(0.05)
+        ignored = manager.breaker.get_metrics()["failures"]
+
+        # A dropped connection wakes the health check instead of waiting 10s
+        _FlakyClient.down = True
+        command_failed("AutoReconnect")
+        await asyncio.sleep(0.1)
+        ready = manager.is_ready
+        metrics = manager.get_metrics()
+        await manager.stop()
+        return ignored, ready, metrics
+
+    ignored, ready, metrics = asyncio.run(scenario())
+    assert ignored == 0
+    assert not ready
+    assert metrics["disconnects"] == 1
+    assert metrics["circuit"]["state"] == "open"
+
+if __name__ == "__main__":
+    test_circuit_breaker_states()
+    test_readiness_gate_fails_fast_and_reconnects()
+    test_ready_callbacks_run_once()
+    test_driver_failures_reach_the_manager()
@@ -0,0 +1,64 @@
+# test/test_mongodb_pool.py
+import sys
+import os
+import time
+import threading
+from pymongo import MongoClient, monitoring
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.mongodb_utils.client import mongo_client_options
+from app.database.mongodb_utils.pool_metrics import PoolMetricsListener
+from app.config import settings
+
+ADDRESS = ("localhost", 27017)
+
+def test_client_options_applied():
+    """Pool size, idle time, compression and read preference reach the client"""
+    client = MongoClient("mongodb://localhost:27017", connect=False, **mongo_client_options())
+    try:
+        pool_options = client.options.pool_options
+        assert pool_options.max_pool_size == settings.MONGODB_MAX_POOL_SIZE
+        assert pool_options.min_pool_size == settings.MONGODB_MIN_POOL_SIZE
+        assert pool_options.max_idle_time_seconds == settings.MONGODB_MAX_IDLE_TIME_MS / 1000
+        assert client.options.read_preference.mongos_mode == settings.MONGODB_READ_PREFERENCE
+        # zstd and snappy need their libraries; zlib is always available
+        assert "zlib" in client.options.pool_options._PoolOptions__compression_settings.compressors
+    finally:
+        client.close()
+
+def test_pool_listener_counts_checkout_wait():
+    """Checkout waits are timed per thread and connection events are counted"""
+    listener = PoolMetricsListener()
+    listener.connection_created(monitoring.ConnectionCreatedEvent(ADDRESS, 1))
+
+    def checkout(connection_id, wait):
+        listener.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+        time.sleep(wait)
+        listener.connection_checked_out(monitoring.ConnectionCheckedOutEvent(ADDRESS, connection_id))
+
+    threads = [threading.Thread(target=checkout, args=(i, 0.01 * i)) for i in range(1, 4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    listener.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(ADDRESS))
+    listener.connection_check_out_failed(monitoring.ConnectionCheckOutFailedEvent(
+        ADDRESS, monitoring.ConnectionCheckOutFailedReason.TIMEOUT
+    ))
+    listener.connection_checked_in(monitoring.ConnectionCheckedInEvent(ADDRESS, 1))
+    listener.connection_closed(monitoring.ConnectionClosedEvent(ADDRESS, 1, "idle"))
+
+    metrics = listener.get_metrics()
+    assert metrics["checkouts"] == 3
+    assert metrics["connections_in_use"] == 2
+    assert metrics["checkout_timeouts"] == 1
+    assert metrics["connections_created"] == 1 and metrics["connections_open"] == 0
+    assert 20 <= metrics["avg_checkout_wait_ms"] < 100
+    assert metrics["max_checkout_wait_ms"] >= 30
+
+if __name__ == "__main__":
+    test_client_options_applied()
+    test_pool_listener_counts_checkout_wait()
@@ -0,0 +1,137 @@
+# test/test_ocr_pool.py
+import sys
+import os
+import time
+import asyncio
+import httpx
+import pytest
+from types import SimpleNamespace
+from fastapi import FastAPI
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.routes.ocr_routes as ocr_routes
+import app.routes.translation_routes as translation_routes
+from app.auth.auth_handler import get_current_user as auth_current_user
+from app.config import settings
+from app.dependencies import UserInToken, get_current_user
+from app.utils.executor_pool import BoundedExecutor
+
+OCR_JOBS = 20
+VISION_DELAY = 0.15
+PROBE_INTERVAL = 0.02
+
+class FakeVisionClient:
+    """Blocks like the real client: a synchronous call per image"""
+
+    def __init__(self, delay=VISION_DELAY):
+        self.delay = delay
+        self.calls = []
+
+    def text_detection(self, image, timeout=None):
+        self.calls.append(timeout)
+        time.sleep(self.delay * 4 if image.content == b"slow" else self.delay)
+        return SimpleNamespace(
+            error=SimpleNamespace(message=""),
+            text_annotations=[SimpleNamespace(description=f"text of {len(image.content)} bytes")],
+        )
+
+@pytest.fixture
+def client(monkeypatch, translation_state):
+    vision = FakeVisionClient()
+    monkeypatch.setattr(ocr_routes, "vision_client", vision)
+    monkeypatch.setattr(ocr_routes, "_vision_client_initialized", True)
+    monkeypatch.setattr(ocr_routes, "ocr_pool", BoundedExecutor("ocr-test", max_workers=4, max_concurrency=4))
+    monkeypatch.setattr(ocr_routes, "ocr_stats", {"rejected": 0})
+    # /translate answers locally without Youdao credentials
+    translation_state.replace(YOUDAO_APP_KEY="")
+
+    app = FastAPI()
+    app.include_router(ocr_routes.router)
+    app.include_router(translation_routes.router)
+    user = UserInToken(username="learner", user_id="user-1")
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[auth_current_user] = lambda: user
+
+    async def run(scenario):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as http:
+            return await scenario(http)
+
+    yield run, vision
+    ocr_routes.ocr_pool.shutdown()
+
+def _upload(http, content=b"page image"):
+    return http.post("/extract-text", files={"file": ("page.png", content, "image/png")})
+
+async def _ocr_with_probes(http):
+    """Run OCR_JOBS uploads while timing a cheap endpoint alongside them"""
+    latencies = []
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            started = time.perf_counter()
+            response = await http.post("/translate", json={"text": "hello", "target_language": "zh"})
+            assert response.status_code == 200
+            latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(PROBE_INTERVAL)
+
+    prober = asyncio.create_task(probe())
+    await asyncio.sleep(PROBE_INTERVAL)
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(_upload(http, b"x" * (i + 1)) for i in range(OCR_JOBS)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await prober
+    return responses, elapsed, latencies
+
+def test_other_endpoints_stay_responsive_during_ocr(client, monkeypatch):
+    """20 OCR jobs run on the pool while /translate keeps answering at once"""
+    run, vision = client
+
+    async def inline(func, *args):
+        # What detect_text used to do: the Vision call on the event loop
+        return func(*args)
+
+    with monkeypatch.context() as patched:
+        patched.setattr(ocr_routes, "run_ocr_job", inline)
+        _, blocking_elapsed, blocking_latencies = asyncio.run(run(_ocr_with_probes))
+    responses, elapsed, latencies = asyncio.run(run(_ocr_with_probes))
+    metrics = ocr_routes.ocr_pool.get_metrics()
+    print(
+        f"\n{OCR_JOBS} OCR jobs: on the event loop {blocking_elapsed * 1000:.0f} ms, worst probe "
+        f"{max(blocking_latencies) * 1000:.0f} ms; on the pool {elapsed * 1000:.0f} ms, worst probe "
+        f"{max(latencies) * 1000:.0f} ms over {len(latencies)} probes; max queue depth {metrics['max_waiting']}"
+    )
+    assert all(r.status_code == 200 for r in responses)
+    assert [r.json()["text"] for r in responses] == [f"text of {i + 1} bytes" for i in range(OCR_JOBS)]
+    assert max(blocking_latencies) >= VISION_DELAY
+    assert max(latencies) < VISION_DELAY / 2
+    assert elapsed < blocking_elapsed / 2
+    assert metrics["completed"] == OCR_JOBS and metrics["in_flight"] == 0
+    assert metrics["max_waiting"] >= OCR_JOBS - 4 and metrics["max_queue_time"] >= VISION_DELAY
+    assert set(vision.calls) == {settings.OCR_TIMEOUT}
+
+def test_ocr_timeout_and_full_queue(client, monkeypatch):
+    """Jobs past OCR_TIMEOUT get 504; uploads beyond OCR_MAX_QUEUE get 503"""
+    run, vision = client
+    monkeypatch.setattr(settings, "OCR_TIMEOUT", VISION_DELAY * 2)
+    monkeypatch.setattr(settings, "OCR_MAX_QUEUE", 2)
+
+    async def scenario(http):
+        slow = await _upload(http, b"slow")
+        # Let the timed-out call finish and free its worker
+        await asyncio.sleep(VISION_DELAY * 3)
+        crowd = await asyncio.gather(*(_upload(http) for _ in range(10)))
+        return slow, crowd
+
+    slow, crowd = asyncio.run(run(scenario))
+    assert slow.status_code == 504
+    codes = sorted(r.status_code for r in crowd)
+    # 4 run at once and 2 may wait; the rest are turned away
+    assert codes == [200] * 6 + [503] * 4
+    assert all(int(r.headers["Retry-After"]) >= 1 for r in crowd if r.status_code == 503)
+    metrics = ocr_routes.get_ocr_metrics()
+    assert metrics["timeouts"] == 1 and metrics["rejected"] == 4
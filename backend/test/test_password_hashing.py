@@ -0,0 +1,168 @@
+# test/test_password_hashing.py
+import sys
+import os
+import uuid
+import time
+import asyncio
+import statistics
+import threading
+import requests
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.auth.auth_handler import (
+    get_password_hash, get_password_hash_async, verify_password_async, password_hash_pool
+)
+from app.utils.executor_pool import BoundedExecutor
+
+# Configuration
+BASE_URL = "http://localhost:8000"  # Update if your server runs on a different port
+
+async def _measure_loop_lag(work):
+    """Run `work` while a heartbeat task records the worst event loop stall"""
+    lags = []
+    stop = asyncio.Event()
+
+    async def heartbeat():
+        while not stop.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.005)
+            lags.append(time.perf_counter() - started - 0.005)
+
+    beat = asyncio.create_task(heartbeat())
+    result = await work
+    stop.set()
+    await beat
+    return result, max(lags)
+
+def test_hashing_does_not_block_event_loop():
+    """Concurrent bcrypt calls should leave the event loop responsive"""
+    hashed = get_password_hash("password123")
+
+    async def burst():
+        return await asyncio.gather(
+            *[verify_password_async("password123", hashed) for _ in range(8)],
+            get_password_hash_async("another-password")
+        )
+
+    results, max_lag = asyncio.run(_measure_loop_lag(burst()))
+
+    assert all(results[:8])
+    assert results[8].startswith("$2b$")
+    print(f"Max event loop lag during bcrypt burst: {max_lag * 1000:.1f} ms")
+    # A single inline bcrypt call would stall the loop for ~200 ms
+    assert max_lag < 0.1, f"Event loop stalled for {max_lag * 1000:.1f} ms"
+
+    metrics = password_hash_pool.get_metrics()
+    assert metrics["completed"] >= 9
+    assert metrics["max_waiting"] <= metrics["submitted"]
+
+def test_timed_out_calls_keep_their_slot():
+    """A call that timed out still counts against the cap until its thread ends"""
+    pool = BoundedExecutor("slot-test", max_workers=4, max_concurrency=2)
+    running = []
+    lock = threading.Lock()
+
+    def work(duration):
+        with lock:
+            running.append(1)
+            peak = len(running)
+        time.sleep(duration)
+        with lock:
+            running.pop()
+        return peak
+
+    async def scenario():
+        timed_out = 0
+        for _ in range(2):
+            try:
+                await pool.run(work, 0.3, timeout=0.05)
+            except asyncio.TimeoutError:
+                timed_out += 1
+        # Both slots are held by threads still running: these have to wait
+        await asyncio.sleep(0)
+        waiting = asyncio.gather(*(pool.run(work, 0.01) for _ in range(4)))
+        await asyncio.sleep(0.1)
+        queued = pool.get_metrics()["waiting"]
+        peaks = await waiting
+        # Let the second timed-out thread finish and hand back its slot
+        await asyncio.sleep(0.15)
+        return timed_out, queued, peaks
+
+    try:
+        timed_out, queued, peaks = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert timed_out == 2
+    assert queued == 4
+    assert max(peaks) <= 2
+    metrics = pool.get_metrics()
+    assert metrics["timeouts"] == 2 and metrics["completed"] == 4 and metrics["in_flight"] == 0
+
+def _register_and_login():
+    unique_id = str(uuid.uuid4())[:8]
+    username = f"loaduser_{unique_id}"
+    password = "password123"
+    response = requests.post(
+        f"{BASE_URL}/register",
+        json={"username": username, "email": f"{username}@example.com", "password": password}
+    )
+    assert response.status_code == 201, f"Failed to register: {response.text}"
+    response = requests.post(
+        f"{BASE_URL}/login",
+        data={"username": username, "password": password},
+        headers={"Content-Type": "application/x-www-form-urlencoded"}
+    )
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    return username, password, response.json()["access_token"]
+
+def _time_word_reads(token, count):
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        response = requests.get(
+            f"{BASE_URL}/words/all",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        latencies.append(time.perf_counter() - started)
+        assert response.status_code == 200, f"Word read failed: {response.text}"
+    return latencies
+
+def test_word_reads_during_login_burst():
+    """/words reads should keep their latency while a burst of logins runs"""
+    username, password, token = _register_and_login()
+
+    baseline = _time_word_reads(token, 20)
+
+    stop = threading.Event()
+
+    def login_loop():
+        while not stop.is_set():
+            requests.post(
+                f"{BASE_URL}/login",
+                data={"username": username, "password": password},
+                headers={"Content-Type": "application/x-www-form-urlencoded"}
+            )
+
+    workers = [threading.Thread(target=login_loop) for _ in range(10)]
+    for worker in workers:
+        worker.start()
+    try:
+        under_load = _time_word_reads(token, 20)
+    finally:
+        stop.set()
+        for worker in workers:
+            worker.join()
+
+    baseline_p50 = statistics.median(baseline)
+    load_p50 = statistics.median(under_load)
+    print(f"/words/all p50: {baseline_p50 * 1000:.1f} ms idle, {load_p50 * 1000:.1f} ms during login burst")
+
+    # With bcrypt on the event loop each read waited behind several
+    # 200-300 ms hashes; on the pool it only pays the normal DB round trip
+    assert load_p50 < baseline_p50 + 0.15, "Word reads were blocked by login hashing"
+
+if __name__ == "__main__":
+    test_hashing_does_not_block_event_loop()
+    test_word_reads_during_login_burst()
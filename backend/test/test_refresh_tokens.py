@@ -0,0 +1,79 @@
+# test/test_refresh_tokens.py
+import sys
+import os
+import uuid
+import time
+import requests
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.auth.refresh_tokens import hash_refresh_token, verify_refresh_token_digest
+from app.auth.jwt_handler import create_refresh_token
+
+# Configuration
+BASE_URL = "http://localhost:8000"  # Update if your server runs on a different port
+
+def test_refresh_token_digest_is_fast():
+    """Digest verification should take microseconds, not bcrypt's hundreds of ms"""
+    token = create_refresh_token({"sub": "digest_user", "fid": uuid.uuid4().hex})
+    digest = hash_refresh_token(token)
+
+    iterations = 10000
+    started = time.perf_counter()
+    for _ in range(iterations):
+        assert verify_refresh_token_digest(token, digest)
+    per_call = (time.perf_counter() - started) / iterations
+
+    print(f"Refresh token verification: {per_call * 1e6:.1f} us per call")
+    assert per_call < 0.001
+
+    other = create_refresh_token({"sub": "digest_user", "fid": uuid.uuid4().hex})
+    assert not verify_refresh_token_digest(other, digest)
+    assert not verify_refresh_token_digest(token, None)
+
+def test_rotated_tokens_are_unique():
+    """Tokens rotated within the same second must still get distinct digests"""
+    data = {"sub": "digest_user", "fid": "family"}
+    assert hash_refresh_token(create_refresh_token(data)) != hash_refresh_token(create_refresh_token(data))
+
+def _login():
+    unique_id = str(uuid.uuid4())[:8]
+    username = f"refreshuser_{unique_id}"
+    password = "password123"
+    response = requests.post(
+        f"{BASE_URL}/register",
+        json={"username": username, "email": f"{username}@example.com", "password": password}
+    )
+    assert response.status_code == 201, f"Failed to register: {response.text}"
+    response = requests.post(
+        f"{BASE_URL}/login",
+        data={"username": username, "password": password},
+        headers={"Content-Type": "application/x-www-form-urlencoded"}
+    )
+    assert response.status_code == 200, f"Login failed: {response.text}"
+    return response.json()
+
+def test_refresh_token_rotation_and_reuse_detection():
+    """A replayed refresh token should revoke the whole token family"""
+    tokens = _login()
+    first_refresh = tokens["refresh_token"]
+
+    # Normal rotation
+    response = requests.post(f"{BASE_URL}/refresh-token", json={"refresh_token": first_refresh})
+    assert response.status_code == 200, f"Refresh failed: {response.text}"
+    second_refresh = response.json()["refresh_token"]
+    assert second_refresh != first_refresh
+
+    # Replaying the rotated-out token is rejected...
+    response = requests.post(f"{BASE_URL}/refresh-token", json={"refresh_token": first_refresh})
+    assert response.status_code == 401
+
+    # ...and revokes the newer token from the same family too
+    response = requests.post(f"{BASE_URL}/refresh-token", json={"refresh_token": second_refresh})
+    assert response.status_code == 401
+
+if __name__ == "__main__":
+    test_refresh_token_digest_is_fast()
+    test_rotated_tokens_are_unique()
+    test_refresh_token_rotation_and_reuse_detection()
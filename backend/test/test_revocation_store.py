@@ -0,0 +1,103 @@
+# test/test_revocation_store.py
+import sys
+import os
+import time
+import uuid
+import tempfile
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.auth.revocation_store import BloomFilter, SQLiteRevocationBackend
+
+def _db_path():
+    return os.path.join(tempfile.mkdtemp(), "revoked_tokens.db")
+
+def test_bloom_filter_false_positive_rate():
+    """The bloom filter never misses a key and rarely reports an unknown one"""
+    bloom = BloomFilter(capacity=10_000, error_rate=0.001)
+    keys = [uuid.uuid4().hex for _ in range(10_000)]
+    for key in keys:
+        bloom.add(key)
+
+    assert all(key in bloom for key in keys)
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(10_000))
+    assert false_positives < 50, f"{false_positives} false positives out of 10000"
+
+def test_revocation_shared_between_workers():
+    """A token revoked on one worker is seen by another after a sync"""
+    path = _db_path()
+    worker_a = SQLiteRevocationBackend(path, sync_interval=60)
+    worker_b = SQLiteRevocationBackend(path, sync_interval=60)
+
+    worker_a.add("token-1", time.time() + 60)
+    assert worker_a.contains("token-1")
+
+    # Worker B only learns about it once it syncs the version counter
+    assert not worker_b.contains("token-1")
+    worker_b.sync()
+    assert worker_b.contains("token-1")
+    assert worker_b.get_metrics()["version"] == 1
+
+def test_revocation_survives_restart():
+    """Revocations are persisted in the SQLite file"""
+    path = _db_path()
+    backend = SQLiteRevocationBackend(path)
+    backend.add("token-1", time.time() + 60)
+    backend.close()
+
+    restarted = SQLiteRevocationBackend(path)
+    assert restarted.contains("token-1")
+    assert not restarted.contains("token-2")
+
+def test_not_revoked_path_stays_in_memory():
+    """Unknown tokens are answered by the bloom filter; nothing reads the file"""
+    backend = SQLiteRevocationBackend(_db_path(), sync_interval=60)
+    backend.add("revoked", time.time() + 60)
+    # A closed connection fails any query contains() might still make
+    backend.close()
+
+    for _ in range(1000):
+        assert not backend.contains(uuid.uuid4().hex)
+    assert backend.contains("revoked")
+    metrics = backend.get_metrics()
+    assert metrics["bloom_negative"] >= 990
+    assert metrics["blacklist_lookups"] <= 11
+
+def test_bloom_grows_on_sync_not_on_add():
+    """Past capacity add() only flags the filter; the next sync rebuilds it"""
+    backend = SQLiteRevocationBackend(_db_path(), sync_interval=60, bloom_capacity=10)
+    for i in range(12):
+        backend.add(f"token-{i}", time.time() + 60)
+    assert backend.get_metrics()["rebuilds"] == 1
+
+    backend.sync()
+    metrics = backend.get_metrics()
+    assert metrics["rebuilds"] == 2 and metrics["bloom_capacity"] >= 24
+    assert all(backend.contains(f"token-{i}") for i in range(12))
+
+def test_expired_revocations_are_removed():
+    """Expired revocations are deleted and other workers rebuild their filters"""
+    path = _db_path()
+    worker_a = SQLiteRevocationBackend(path, sync_interval=60)
+    worker_b = SQLiteRevocationBackend(path, sync_interval=60)
+    worker_a.add("short", time.time() + 0.05)
+    worker_a.add("long", time.time() + 60)
+    worker_b.sync()
+
+    time.sleep(0.1)
+    assert not worker_a.contains("short")
+    assert worker_a.clear_expired() == 1
+
+    worker_b.sync()
+    assert worker_b.get_metrics()["rebuilds"] == 2
+    assert worker_b.contains("long")
+    assert not worker_b.contains("short")
+
+if __name__ == "__main__":
+    test_bloom_filter_false_positive_rate()
+    test_revocation_shared_between_workers()
+    test_revocation_survives_restart()
+    test_not_revoked_path_stays_in_memory()
+    test_bloom_grows_on_sync_not_on_add()
+    test_expired_revocations_are_removed()
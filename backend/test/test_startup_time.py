@@ -0,0 +1,115 @@
+# test/test_startup_time.py
+import sys
+import os
+import json
+import subprocess
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.dictionary_data import WORDNET_DATA_FILES, provision_data_dir
+from app.utils.dictionary_index import build_dictionary_index
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 3
+
+# What the app may add on top of importing its frameworks, and how long
+# the startup handlers may take (everything slow runs in the background)
+APP_IMPORT_BUDGET = 0.5
+STARTUP_HANDLER_BUDGET = 0.25
+
+# Import the app and run its startup handlers, as a worker process does
+START_APP = """
+import sys, time, json
+started = time.perf_counter()
+import app.main
+imported = time.perf_counter()
+from fastapi.testclient import TestClient
+client = TestClient(app.main.app)
+before_startup = time.perf_counter()
+with client:
+    ready = time.perf_counter()
+    status = client.get("/").status_code
+    loaded = sorted(m for m in ("nltk", "google.cloud.vision") if m in sys.modules)
+print(json.dumps({
+    "import": imported - started,
+    "startup": ready - before_startup,
+    "status": status,
+    "loaded": loaded,
+}))
+"""
+
+# The frameworks every worker imports regardless of the app
+IMPORT_FRAMEWORKS = """
+import time, json
+started = time.perf_counter()
+import fastapi, motor.motor_asyncio, pydantic_settings, httpx, jose, aiosqlite
+print(json.dumps({"import": time.perf_counter() - started}))
+"""
+
+def _offline_env(tmp_path, data_dir, index_path):
+    env = dict(os.environ)
+    env.update({
+        "MONGODB_URL": "mongodb://127.0.0.1:1",
+        "SECRET_KEY": "startup-test",
+        "YOUDAO_APP_KEY": "",
+        "YOUDAO_APP_SECRET": "",
+        "GOOGLE_APPLICATION_CREDENTIALS": "",
+        "ENABLE_AUTO_SYNC": "false",
+        "SQLITE_DB_PATH": str(tmp_path / "words.db"),
+        "TOKEN_REVOCATION_DB_PATH": str(tmp_path / "revoked.db"),
+        "EMAIL_OUTBOX_DB_PATH": str(tmp_path / "outbox.db"),
+        "TRANSLATION_CACHE_DB_PATH": str(tmp_path / "cache.db"),
+        "YOUDAO_QUOTA_DB_PATH": str(tmp_path / "quota.db"),
+        "DICTIONARY_DATA_DIR": data_dir,
+        "DICTIONARY_INDEX_PATH": index_path,
+        # No network: anything trying to download fails immediately
+        "NLTK_DATA": str(tmp_path / "nltk_data"),
+        "HTTP_PROXY": "http://127.0.0.1:9",
+        "HTTPS_PROXY": "http://127.0.0.1:9",
+    })
+    return env
+
+def _run(code, env):
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, timeout=60,
+    )
+    assert output.returncode == 0, output.stderr
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def _provision(tmp_path):
+    """A provisioned host: checksummed data directory and a built index"""
+    source = tmp_path / "wordnet-source"
+    source.mkdir()
+    for name in WORDNET_DATA_FILES:
+        (source / name).write_text("")
+    data_dir = str(tmp_path / "wordnet")
+    digest = provision_data_dir(data_dir, source=str(source))
+    index_path = str(tmp_path / "dictionary_index.db")
+    build_dictionary_index(data_dir, index_path, digest)
+    return data_dir, index_path
+
+def test_offline_startup_time(tmp_path):
+    """A worker starts offline without NLTK, the Vision client or any download"""
+    data_dir, index_path = _provision(tmp_path)
+    env = _offline_env(tmp_path, data_dir, index_path)
+
+    runs = [_run(START_APP, env) for _ in range(RUNS)]
+    frameworks = min(_run(IMPORT_FRAMEWORKS, env)["import"] for _ in range(RUNS))
+    app_import = min(r["import"] for r in runs)
+    startup = min(r["startup"] for r in runs)
+    print(
+        f"\nstartup: import {app_import * 1000:.0f} ms (frameworks alone {frameworks * 1000:.0f} ms), "
+        f"startup handlers {startup * 1000:.0f} ms, total {(app_import + startup) * 1000:.0f} ms"
+    )
+    assert all(r["status"] == 200 and r["loaded"] == [] for r in runs)
+    assert app_import - frameworks < APP_IMPORT_BUDGET
+    assert startup < STARTUP_HANDLER_BUDGET
+
+def test_startup_without_dictionary_data(tmp_path):
+    """With no WordNet data at all the API still starts and serves requests"""
+    env = _offline_env(tmp_path, str(tmp_path / "missing"), str(tmp_path / "missing.db"))
+    result = _run(START_APP, env)
+    assert result["status"] == 200
+    assert result["startup"] < STARTUP_HANDLER_BUDGET
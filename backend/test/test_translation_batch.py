@@ -0,0 +1,114 @@
+# test/test_translation_batch.py
+import sys
+import os
+import random
+import hashlib
+import asyncio
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.routes.translation_routes as translation_routes
+from app.config import settings
+from app.routes.translation_routes import pack_batches
+
+OCR_WORDS = 300
+
+def _ocr_text(count, seed=3):
+    """Words of a page of text: a few hundred tokens over a smaller vocabulary"""
+    rng = random.Random(seed)
+    vocabulary = [f"word{i}" for i in range(180)] + ["the", "and", "of", "a", "to"]
+    return [rng.choice(vocabulary).capitalize() if rng.random() < 0.1 else rng.choice(vocabulary)
+            for _ in range(count)]
+
+def _stub_upstream(translation_state, fail_on=None):
+    calls = []
+
+    async def fake_batch(params):
+        calls.append(params)
+        await asyncio.sleep(0.01)
+        if fail_on in params["q"]:
+            raise Exception("Youdao API error: 411")
+        return [
+            {"query": q, "translation": f"{q.lower()}->{params['to']}", "type": f"en2{params['to']}"}
+            for q in params["q"]
+        ]
+
+    translation_state.replace(request_youdao_batch=fake_batch)
+    return calls, translation_state.translation_cache
+
+def test_pack_batches_respects_limits():
+    """Batches stay within the item and character limits and keep order"""
+    texts = ["a" * 10] * 7 + ["b" * 30, "c"]
+    batches = pack_batches(texts, max_items=3, max_chars=35)
+    assert [t for batch in batches for t in batch] == texts
+    assert all(len(b) <= 3 and sum(map(len, b)) <= 35 for b in batches if len(b) > 1)
+    assert len(batches) == 4
+
+def test_ocr_page_translated_in_few_upstream_calls(translation_state):
+    """300 OCR words become a handful of Youdao calls; results keep input order"""
+    calls, cache = _stub_upstream(translation_state)
+    words = ["The"] + _ocr_text(OCR_WORDS - 1)
+
+    async def scenario():
+        await cache.put("the", "auto", "zh-CHS", "这", "en")
+        response = await translation_routes.translate_batch(
+            {"texts": words, "target_language": "zh"}, None
+        )
+        again = await translation_routes.translate_batch(
+            {"texts": words, "target_language": "zh"}, None
+        )
+        await cache.close()
+        return response, again
+
+    response, again = asyncio.run(scenario())
+    stats = response["stats"]
+    unique = len({w.lower() for w in words})
+    print(
+        f"\n{stats['inputs']} inputs, {stats['unique']} unique, {stats['cache_hits']} cached: "
+        f"{stats['upstream_calls']} upstream calls (word by word: {stats['inputs']})"
+    )
+    assert stats["inputs"] == OCR_WORDS and stats["unique"] == unique
+    assert stats["cache_hits"] == 1
+    expected_calls = -(-(unique - 1) // settings.YOUDAO_BATCH_MAX_ITEMS)
+    assert stats["upstream_calls"] == len(calls) == expected_calls
+    assert sum(len(c["q"]) for c in calls) == unique - 1
+
+    assert [r["text"] for r in response["results"]] == words
+    for result in response["results"]:
+        if result["text"].lower() == "the":
+            assert result["translated_text"] == "这" and result["cached"]
+        else:
+            assert result["translated_text"] == f"{result['text'].lower()}->zh-CHS"
+    # Everything is cached afterwards
+    assert again["stats"]["upstream_calls"] == 0 and again["stats"]["cache_hits"] == unique
+
+def test_failed_pack_reports_per_text_errors(translation_state, monkeypatch):
+    """A failed upstream call only affects the texts in its pack"""
+    calls, cache = _stub_upstream(translation_state, fail_on="broken")
+    monkeypatch.setattr(settings, "YOUDAO_BATCH_MAX_ITEMS", 2)
+    texts = ["apple", "broken", "pear", "plum"]
+
+    async def scenario():
+        response = await translation_routes.translate_batch({"texts": texts, "target_language": "zh"}, None)
+        await cache.close()
+        return response
+
+    response = asyncio.run(scenario())
+    results = {r["text"]: r for r in response["results"]}
+    assert len(calls) == 2
+    assert results["apple"]["translated_text"] is None and "411" in results["apple"]["error"]
+    assert results["broken"]["translated_text"] is None
+    assert results["plum"]["translated_text"] == "plum->zh-CHS" and "error" not in results["plum"]
+    assert cache.get_metrics()["stores"] == 2
+
+def test_batch_params_sign_all_queries(translation_state):
+    """The batch request repeats q and signs the concatenated queries"""
+    request = translation_routes.TranslationRequest(text="", target_language="zh-TW")
+    params = request.get_youdao_batch_params(["hello", "world"])
+    assert params["q"] == ["hello", "world"] and params["to"] == "zh-CHT"
+
+    expected = hashlib.sha256(
+        ("test-key" + "helloworld" + params["salt"] + params["curtime"] + "test-secret").encode()
+    ).hexdigest()
+    assert params["sign"] == expected
@@ -0,0 +1,128 @@
+# test/test_translation_cache.py
+import sys
+import os
+import time
+import asyncio
+import sqlite3
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.routes.translation_routes as translation_routes
+from app.utils.translation_cache import TranslationCache
+
+def test_memory_and_disk_tiers(tmp_path):
+    """Hot entries come from memory, the rest from SQLite, across restarts"""
+    path = str(tmp_path / "translation_cache.db")
+
+    async def scenario():
+        cache = TranslationCache(path)
+        assert await cache.get("hello", "auto", "zh-CHS") is None
+        await cache.put("  Hello ", "auto", "zh-CHS", "你好", "en")
+
+        assert (await cache.get("hello", "auto", "zh-CHS"))["translated_text"] == "你好"
+        cache.clear_memory()
+        assert (await cache.get("HELLO", "auto", "zh-CHS"))["translated_text"] == "你好"
+        assert await cache.get("hello", "auto", "ja") is None
+        metrics = cache.get_metrics()
+        await cache.close()
+
+        restarted = TranslationCache(path)
+        persisted = await restarted.get("hello", "auto", "zh-CHS")
+        await restarted.close()
+        return metrics, persisted
+
+    metrics, persisted = asyncio.run(scenario())
+    assert metrics["memory_hits"] == 1 and metrics["disk_hits"] == 1 and metrics["misses"] == 2
+    assert metrics["hit_ratio"] == 0.5 and metrics["saved_upstream_calls"] == 2
+    assert persisted == {"translated_text": "你好", "detected_source": "en"}
+
+def test_ttl_and_size_eviction(tmp_path):
+    """Expired entries miss; rows over max_entries are evicted least recently used first"""
+    async def scenario():
+        cache = TranslationCache(str(tmp_path / "ttl.db"), ttl=0.05)
+        await cache.put("apple", "auto", "zh-CHS", "苹果")
+        await asyncio.sleep(0.06)
+        expired = await cache.get("apple", "auto", "zh-CHS")
+        await cache.close()
+
+        cache = TranslationCache(str(tmp_path / "evict.db"), max_entries=50, memory_size=0)
+        for i in range(60):  # below EVICTION_CHECK_INTERVAL
+            await cache.put(f"word{i}", "auto", "zh-CHS", f"词{i}")
+        await cache.get("word0", "auto", "zh-CHS")  # recently used again
+        await cache.evict()
+        db = await cache.connect()
+        cursor = await db.execute("SELECT COUNT(*) FROM translation_cache")
+        (rows,) = await cursor.fetchone()
+        kept_old = await cache.get("word0", "auto", "zh-CHS")
+        dropped = await cache.get("word1", "auto", "zh-CHS")
+        await cache.close()
+        return expired, rows, kept_old, dropped
+
+    expired, rows, kept_old, dropped = asyncio.run(scenario())
+    assert expired is None
+    assert rows == 50
+    assert kept_old is not None and dropped is None
+
+def test_warm_from_vocabulary(tmp_path):
+    """ch_meaning of stored words is served without calling Youdao"""
+    words_db = str(tmp_path / "word_storage.db")
+    with sqlite3.connect(words_db) as conn:
+        conn.execute("CREATE TABLE words (wordid INTEGER PRIMARY KEY, word TEXT, ch_meaning TEXT)")
+        conn.executemany(
+            "INSERT INTO words (word, ch_meaning) VALUES (?, ?)",
+            [("Apple", "苹果"), ("hello", "你好"), ("blank", "")]
+        )
+
+    async def scenario():
+        cache = TranslationCache(str(tmp_path / "translation_cache.db"))
+        await cache.put("hello", "auto", "zh-CHS", "喂", "en")
+        warmed = await cache.warm_from_words(words_db)
+        cache.clear_memory()
+        apple = await cache.get("apple", "auto", "zh-CHS")
+        hello = await cache.get("hello", "auto", "zh-CHS")
+        blank = await cache.get("blank", "auto", "zh-CHS")
+        await cache.close()
+        return warmed, apple, hello, blank
+
+    warmed, apple, hello, blank = asyncio.run(scenario())
+    assert warmed == 2
+    assert apple["translated_text"] == "苹果"
+    assert hello["translated_text"] == "喂"  # real translations are not overwritten
+    assert blank is None
+
+def test_repeated_translations_save_upstream_calls(translation_state):
+    """100 requests for 10 distinct words reach Youdao 10 times"""
+    upstream_calls = []
+
+    async def fake_youdao(params):
+        upstream_calls.append(params["q"])
+        return {"errorCode": "0", "translation": [params["q"].upper()], "l": "en2zh-CHS"}
+
+    translation_state.replace(request_youdao_translation=fake_youdao)
+    cache = translation_state.translation_cache
+
+    async def scenario():
+        results = []
+        started = time.perf_counter()
+        for i in range(100):
+            results.append(await translation_routes.translate_text(
+                {"text": f"word{i % 10}", "target_language": "zh"}, None
+            ))
+        elapsed = time.perf_counter() - started
+        await cache.close()
+        return results, elapsed
+
+    results, elapsed = asyncio.run(scenario())
+    metrics = cache.get_metrics()
+    print(f"\n100 translations, 10 distinct: {len(upstream_calls)} Youdao calls, "
+          f"hit ratio {metrics['hit_ratio']}, {elapsed * 1000:.0f} ms")
+    assert len(upstream_calls) == 10
+    assert metrics["saved_upstream_calls"] == 90 and metrics["hit_ratio"] == 0.9
+    assert results[15] == {
+        "text": "word5", "translated_text": "WORD5", "source_language": "en", "target_language": "zh"
+    }
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-s"])
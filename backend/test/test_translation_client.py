@@ -0,0 +1,166 @@
+# test/test_translation_client.py
+import sys
+import os
+import time
+import socket
+import asyncio
+import subprocess
+import requests
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.routes.translation_routes as translation_routes
+from app.utils.http_client import SharedHTTPClient
+
+TRANSLATIONS = 200
+YOUDAO_DELAY = 0.05  # simulated Youdao response time
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+# Fake Youdao API, run in its own process so it does not share our GIL
+FAKE_YOUDAO = """
+import sys, asyncio, uvicorn
+from fastapi import FastAPI, Request
+
+app = FastAPI()
+stats = {"client_ports": set(), "in_flight": 0, "max_in_flight": 0}
+
+@app.get("/api")
+async def translate(request: Request, q: str, to: str):
+    stats["client_ports"].add(request.client.port)
+    stats["in_flight"] += 1
+    stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+    await asyncio.sleep(float(sys.argv[2]))
+    stats["in_flight"] -= 1
+    return {"errorCode": "0", "translation": [q + "->" + to], "l": "en2" + to}
+
+@app.get("/stats")
+async def get_stats():
+    return {**stats, "client_ports": len(stats["client_ports"])}
+
+uvicorn.run(app, host="127.0.0.1", port=int(sys.argv[1]), log_level="warning")
+"""
+
+class _FakeYoudao:
+    """Local stand-in for openapi.youdao.com that counts client connections"""
+
+    def __init__(self):
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}/api"
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-c", FAKE_YOUDAO, str(self.port), str(YOUDAO_DELAY)]
+        )
+        deadline = time.time() + 20
+        while time.time() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=0.1).close()
+                return self
+            except OSError:
+                time.sleep(0.05)
+        raise RuntimeError("fake Youdao server did not start")
+
+    def stats(self):
+        return requests.get(f"http://127.0.0.1:{self.port}/stats").json()
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.wait()
+
+async def _measure_loop_lag(stop, interval=0.005):
+    """Largest delay of a periodic timer, i.e. how long the loop was blocked"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+async def _translate_concurrently(count):
+    # Warm up: the first call builds the client and opens a connection
+    await translation_routes.translate_text({"text": "warmup", "target_language": "zh"}, None)
+    stop = asyncio.Event()
+    lag = asyncio.create_task(_measure_loop_lag(stop))
+    started = time.perf_counter()
+    results = await asyncio.gather(*(
+        translation_routes.translate_text({"text": f"word{i}", "target_language": "zh"}, None)
+        for i in range(count)
+    ))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return results, elapsed, await lag
+
+async def _legacy_translate_concurrently(url, count):
+    """Blocking requests.get inside async handlers, as before"""
+    async def legacy(i):
+        return requests.get(url, params={"q": f"word{i}", "to": "zh"}).json()
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(_measure_loop_lag(stop))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await asyncio.gather(*(legacy(i) for i in range(count)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return elapsed, await lag
+
+def test_loop_stays_responsive_under_200_translations(translation_state):
+    """Translations run concurrently over a few pooled connections without blocking the loop"""
+    client = SharedHTTPClient(per_host_limit=20, max_keepalive_connections=20)
+    translation_state.replace(http_client=client)
+    # Every call must reach the server
+    translation_state.use_cache(ttl=0)
+
+    with _FakeYoudao() as youdao:
+        translation_state.replace(YOUDAO_API_URL=youdao.url)
+
+        async def scenario():
+            outcome = await _translate_concurrently(TRANSLATIONS)
+            await client.aclose()
+            return outcome
+
+        results, elapsed, lag = asyncio.run(scenario())
+        stats = youdao.stats()
+        legacy_elapsed, legacy_lag = asyncio.run(_legacy_translate_concurrently(youdao.url, 20))
+
+    print(
+        f"\n{TRANSLATIONS} translations: {elapsed:.2f}s, max loop lag {lag * 1000:.1f} ms, "
+        f"{stats['client_ports']} connections; "
+        f"blocking client: 20 translations {legacy_elapsed:.2f}s, max loop lag {legacy_lag * 1000:.0f} ms"
+    )
+    assert [r["translated_text"] for r in results] == [f"word{i}->zh-CHS" for i in range(TRANSLATIONS)]
+    assert stats["max_in_flight"] <= 20
+    assert stats["client_ports"] <= 20
+    # Serial requests would take TRANSLATIONS * YOUDAO_DELAY = 10s
+    assert elapsed < TRANSLATIONS * YOUDAO_DELAY / 4
+    assert lag < YOUDAO_DELAY
+    assert legacy_lag > lag
+    assert client.get_metrics()["requests"] == TRANSLATIONS + 1
+
+def test_timeouts_are_enforced(translation_state):
+    """A slow upstream fails the request with 504 instead of hanging it"""
+    client = SharedHTTPClient(read_timeout=YOUDAO_DELAY / 5)
+    translation_state.replace(http_client=client)
+    # Every call must reach the server
+    translation_state.use_cache(ttl=0)
+
+    with _FakeYoudao() as youdao:
+        translation_state.replace(YOUDAO_API_URL=youdao.url)
+
+        async def scenario():
+            try:
+                await translation_routes.translate_text({"text": "slow", "target_language": "zh"}, None)
+            except Exception as e:
+                return e
+            finally:
+                await client.aclose()
+
+        error = asyncio.run(scenario())
+
+    assert getattr(error, "status_code", None) == 504
+    assert client.get_metrics()["timeouts"] == 1
@@ -0,0 +1,193 @@
+# test/test_translation_single_flight.py
+import sys
+import os
+import time
+import socket
+import asyncio
+import subprocess
+import requests
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.routes.translation_routes as translation_routes
+from app.utils.http_client import SharedHTTPClient
+from app.utils.single_flight import SingleFlight
+
+STUDENTS = 40
+STUB_DELAY = 0.1
+
+# Stub Youdao API that counts calls per word; "broken" fails with error 108
+STUB_YOUDAO = """
+import sys, asyncio, collections, uvicorn
+from fastapi import FastAPI
+
+app = FastAPI()
+calls = collections.Counter()
+
+@app.get("/api")
+async def translate(q: str, to: str):
+    calls[q] += 1
+    await asyncio.sleep(float(sys.argv[2]))
+    if q == "broken":
+        return {"errorCode": "108"}
+    return {"errorCode": "0", "translation": [q + "->" + to], "l": "en2" + to}
+
+@app.get("/calls")
+async def get_calls():
+    return calls
+
+uvicorn.run(app, host="127.0.0.1", port=int(sys.argv[1]), log_level="warning")
+"""
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class _StubYoudao:
+    def __init__(self):
+        self.port = _free_port()
+        self.url = f"http://127.0.0.1:{self.port}/api"
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-c", STUB_YOUDAO, str(self.port), str(STUB_DELAY)]
+        )
+        deadline = time.time() + 20
+        while time.time() < deadline:
+            try:
+                socket.create_connection(("127.0.0.1", self.port), timeout=0.1).close()
+                return self
+            except OSError:
+                time.sleep(0.05)
+        raise RuntimeError("stub Youdao server did not start")
+
+    def calls(self):
+        return requests.get(f"http://127.0.0.1:{self.port}/calls").json()
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.wait()
+
+def _stub_upstream(translation_state, url):
+    translation_state.replace(YOUDAO_API_URL=url, http_client=SharedHTTPClient())
+    return translation_state.translation_cache
+
+async def _close(cache):
+    await translation_routes.http_client.aclose()
+    await cache.close()
+
+def test_class_lookup_makes_one_upstream_call(translation_state):
+    """40 students looking up one word at once share a single Youdao request"""
+    with _StubYoudao() as stub:
+        cache = _stub_upstream(translation_state, stub.url)
+
+        # Both endpoints run in one loop so their requests overlap
+        async def both():
+            words, texts = await asyncio.gather(
+                asyncio.gather(*(
+                    translation_routes.translate_word({"word": "photosynthesis", "target_language": "zh"}, None)
+                    for _ in range(STUDENTS // 2)
+                )),
+                asyncio.gather(*(
+                    translation_routes.translate_text({"text": "Photosynthesis ", "target_language": "zh-CN"}, None)
+                    for _ in range(STUDENTS // 2)
+                )),
+            )
+            await _close(cache)
+            return words, texts
+
+        started = time.perf_counter()
+        words, texts = asyncio.run(both())
+        elapsed = time.perf_counter() - started
+        calls = stub.calls()
+
+    metrics = translation_routes.translation_flight.get_metrics()
+    print(f"\n{STUDENTS} concurrent lookups: {sum(calls.values())} Youdao call(s), {elapsed * 1000:.0f} ms")
+    assert sum(calls.values()) == 1
+    assert metrics["calls"] == 1 and metrics["coalesced"] == STUDENTS - 1
+    assert {w["translated_word"] for w in words} | {t["translated_text"] for t in texts} == {
+        "photosynthesis->zh-CHS"
+    }
+    assert elapsed < STUB_DELAY * 5
+
+def test_failures_propagate_and_are_not_cached(translation_state):
+    """Every waiter sees the failure, and the next lookup tries Youdao again"""
+    with _StubYoudao() as stub:
+        cache = _stub_upstream(translation_state, stub.url)
+
+        async def lookup():
+            try:
+                await translation_routes.translate_text({"text": "broken", "target_language": "zh"}, None)
+            except Exception as e:
+                return e
+
+        async def scenario():
+            first = await asyncio.gather(*(lookup() for _ in range(STUDENTS)))
+            second = await lookup()
+            await _close(cache)
+            return first, second
+
+        first, second = asyncio.run(scenario())
+        calls = stub.calls()
+
+    assert all(getattr(e, "status_code", None) == 500 and "108" in e.detail for e in first)
+    assert getattr(second, "status_code", None) == 500
+    assert calls["broken"] == 2
+    assert translation_routes.translation_flight.in_flight() == 0
+    assert cache.get_metrics()["stores"] == 0
+
+def test_cancelled_leader_does_not_cancel_followers():
+    """A disconnecting first requester does not fail the others"""
+    flight = SingleFlight("test")
+
+    async def slow():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def scenario():
+        leader = asyncio.ensure_future(flight.do("key", slow))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("key", slow))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    assert asyncio.run(scenario()) == "done"
+    assert flight.get_metrics()["calls"] == 1
+
+def test_flight_is_cancelled_when_every_caller_leaves():
+    """Nobody waits for the result any more: the call stops, the next caller starts afresh"""
+    flight = SingleFlight("test")
+    stopped = []
+
+    async def slow():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            stopped.append(True)
+            raise
+        return "late"
+
+    async def quick():
+        return "fresh"
+
+    async def scenario():
+        callers = [asyncio.ensure_future(flight.do("key", slow)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        callers[0].cancel()
+        await asyncio.sleep(0.01)
+        # One caller is still waiting: the call goes on
+        still_running = not stopped
+        for caller in callers[1:]:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        return still_running, await flight.do("key", quick)
+
+    still_running, fresh = asyncio.run(scenario())
+    assert still_running and stopped == [True]
+    assert fresh == "fresh"
+    metrics = flight.get_metrics()
+    assert metrics["abandoned"] == 1 and metrics["calls"] == 2
@@ -0,0 +1,227 @@
+# test/test_translation_stream.py
+import sys
+import os
+import json
+import time
+import random
+import asyncio
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.routes.translation_routes as translation_routes
+from app.config import settings
+from app.utils.text_chunks import split_text
+
+# Youdao answers slower the longer the query is
+UPSTREAM_BASE_DELAY = 0.02
+UPSTREAM_DELAY_PER_CHAR = 0.0002
+
+def _passage(paragraphs=4, sentences=8, seed=5):
+    """An OCR'd page: paragraphs of sentences of varying length"""
+    rng = random.Random(seed)
+    vocabulary = ["reading", "the", "students", "language", "often", "of", "lesson", "a", "practice", "new"]
+    text = []
+    for p in range(paragraphs):
+        lines = []
+        for s in range(sentences):
+            words = [rng.choice(vocabulary) for _ in range(rng.randint(6, 20))]
+            lines.append(f"{words[0].capitalize()} {' '.join(words[1:])} {p}-{s}.")
+        text.append(" ".join(lines))
+    return "\n\n".join(text)
+
+def _stub_upstream(translation_state, fail_on=None, delay=None):
+    """Fake Youdao single and batch endpoints; records the q values of each call"""
+    calls = []
+
+    async def answer(queries):
+        calls.append(queries)
+        await asyncio.sleep(delay or UPSTREAM_BASE_DELAY + UPSTREAM_DELAY_PER_CHAR * sum(map(len, queries)))
+        if fail_on and any(fail_on in q for q in queries):
+            raise translation_routes.YoudaoAPIError("302")
+
+    async def upstream(params):
+        await answer([params["q"]])
+        return {"errorCode": "0", "translation": [f"<{params['q']}>"], "l": "en2zh-CHS"}
+
+    async def upstream_batch(params):
+        await answer(params["q"])
+        return [{"query": q, "translation": f"<{q}>", "type": "en2zh-CHS"} for q in params["q"]]
+
+    translation_state.replace(request_youdao_translation=upstream, request_youdao_batch=upstream_batch)
+    return calls, translation_state.translation_cache
+
+async def _read_stream(text):
+    """Lines of /translate/stream, each with the time it arrived"""
+    started = time.perf_counter()
+    response = await translation_routes.translate_stream({"text": text, "target_language": "zh"}, None)
+    lines = []
+    async for line in response.body_iterator:
+        lines.append((time.perf_counter() - started, json.loads(line)))
+    return lines
+
+def test_split_text_keeps_text_and_boundaries():
+    """Chunks rebuild the text, respect the limit and never span paragraphs"""
+    text = _passage() + "\n\n第一句。第二句！" + " long" * 200
+    chunks = split_text(text, 200)
+    assert "".join(chunk + separator for chunk, separator in chunks) == text
+    assert all(len(chunk) <= 200 for chunk, _ in chunks)
+    assert chunks[0][0].endswith("0-0.") and chunks[0][1] == " "
+    assert all("\n\n" not in chunk for chunk, _ in chunks)
+    assert ("第一句。第二句！", " ") in chunks
+    assert split_text("Use e.g. this one. And that", 100) == [("Use e.g. this one.", " "), ("And that", "")]
+
+def test_stream_sends_first_sentence_first(translation_state):
+    """The first sentence arrives long before a whole-text translation would"""
+    calls, cache = _stub_upstream(translation_state)
+    text = _passage()
+
+    async def scenario():
+        # What /translate used to do: the whole passage as one q
+        started = time.perf_counter()
+        await translation_routes.translate_cached(translation_routes.TranslationRequest(text, "zh"))
+        whole = time.perf_counter() - started
+        calls.clear()
+        first = await _read_stream(text)
+        upstream_calls = list(calls)
+        again = await _read_stream(text)
+        await cache.close()
+        return whole, first, upstream_calls, again
+
+    whole, lines, upstream_calls, again = asyncio.run(scenario())
+    chunks = [item for _, item in lines if item["type"] == "chunk"]
+    first_chunk = next(at for at, item in lines if item["type"] == "chunk")
+    print(
+        f"\n{len(text)} chars in {len(chunks)} chunks: first chunk after {first_chunk * 1000:.0f} ms, "
+        f"all after {lines[-1][0] * 1000:.0f} ms; whole text as one query {whole * 1000:.0f} ms"
+    )
+    assert lines[0][1] == {"type": "start", "chunks": len(chunks), "target_language": "zh"}
+    assert lines[-1][1] == {"type": "end", "chunks": len(chunks), "degraded": False}
+    assert [item["index"] for item in chunks] == list(range(len(chunks)))
+    assert "".join(item["text"] + item["separator"] for item in chunks) == text
+    assert all(item["translated_text"] == f"<{item['text']}>" for item in chunks)
+    # The first chunk on its own, the rest in one batch call
+    assert upstream_calls == [[chunks[0]["text"]], [item["text"] for item in chunks[1:]]]
+    assert all(len(item["text"]) <= settings.TRANSLATION_CHUNK_CHARS for item in chunks)
+    assert first_chunk < whole / 4
+    # Every chunk is cached: the same passage again never reaches Youdao
+    assert len(calls) == len(upstream_calls)
+    assert [item for _, item in again] == [item for _, item in lines]
+
+def test_translate_long_text_in_chunks(translation_state):
+    """/translate sends the chunks of a long text in one batch call and joins the results"""
+    calls, cache = _stub_upstream(translation_state)
+    text = _passage()
+
+    async def scenario():
+        short = await translation_routes.translate_text({"text": "Hello there. Bye.", "target_language": "zh"}, None)
+        long = await translation_routes.translate_text({"text": text, "target_language": "zh"}, None)
+        await cache.close()
+        return short, long
+
+    short, long = asyncio.run(scenario())
+    chunks = split_text(text, settings.TRANSLATION_CHUNK_CHARS)
+    assert short["translated_text"] == "<Hello there. Bye.>" and "chunks" not in short
+    assert calls == [["Hello there. Bye."], [chunk for chunk, _ in chunks]]
+    assert long["translated_text"] == "".join(f"<{chunk}>{separator}" for chunk, separator in chunks)
+    assert long["chunks"] == [
+        {"text": chunk, "separator": separator, "translated_text": f"<{chunk}>"} for chunk, separator in chunks
+    ]
+    assert long["source_language"] == "en" and long["degraded"] is False
+
+def test_long_texts_fit_the_default_quota(translation_state):
+    """With the production quota settings long passages are translated, not refused"""
+    calls, cache = _stub_upstream(translation_state)
+    translation_state.replace(youdao_quota=translation_routes.QuotaScheduler(
+        "youdao",
+        rate=settings.YOUDAO_QUOTA_PER_HOUR / 3600,
+        capacity=settings.YOUDAO_QUOTA_BURST,
+        interactive_max_wait=settings.YOUDAO_QUOTA_MAX_WAIT,
+        bulk_max_wait=settings.YOUDAO_QUOTA_BULK_MAX_WAIT,
+        interactive_reserve=settings.YOUDAO_QUOTA_INTERACTIVE_RESERVE,
+    ))
+    passages = [_passage(paragraphs=7, seed=seed) for seed in range(4)]
+
+    async def scenario():
+        translated = [
+            await translation_routes.translate_text({"text": passage, "target_language": "zh"}, None)
+            for passage in passages[:2]
+        ]
+        streamed = [await _read_stream(passage) for passage in passages[2:]]
+        await cache.close()
+        return translated, streamed
+
+    translated, streamed = asyncio.run(scenario())
+    assert all(len(passage) > 4000 for passage in passages)
+    assert all(result["degraded"] is False for result in translated)
+    assert all(lines[-1][1] == {"type": "end", "chunks": len(lines) - 2, "degraded": False} for lines in streamed)
+    # One call per /translate, two per stream, out of a burst of 10
+    assert len(calls) == 2 + 2 * 2
+    assert translation_state.youdao_quota.get_metrics()["interactive"]["throttled"] == 0
+
+def test_failed_chunk_degrades_stream(translation_state, monkeypatch):
+    """Chunks Youdao rejects are reported in place; the others still arrive"""
+    calls, cache = _stub_upstream(translation_state, fail_on="2-3.")
+    # Small batch calls, so that one failing does not take every chunk with it
+    monkeypatch.setattr(settings, "YOUDAO_BATCH_MAX_ITEMS", 3)
+    text = _passage()
+
+    async def scenario():
+        lines = await _read_stream(text)
+        translated = await translation_routes.translate_text({"text": text, "target_language": "zh"}, None)
+        await cache.close()
+        return lines, translated
+
+    lines, translated = asyncio.run(scenario())
+    chunks = [item for _, item in lines if item["type"] == "chunk"]
+    errors = [item for item in chunks if "error" in item]
+    assert 1 <= len(errors) <= 3 and any("2-3." in item["text"] for item in errors)
+    assert all(item["translated_text"] is None for item in errors)
+    assert all(item["translated_text"] for item in chunks if "error" not in item)
+    assert lines[-1][1]["degraded"] is True
+    # /translate answers with what it could translate instead of failing
+    assert translated["degraded"] is True
+    assert [result["text"] for result in translated["chunks"] if "error" in result] == [item["text"] for item in errors]
+    assert translated["translated_text"] == "".join(
+        (item["text"] if "error" in item else item["translated_text"]) + item["separator"] for item in chunks
+    )
+
+def test_translate_fails_when_no_chunk_is_translated(translation_state):
+    """Without any translated chunk /translate reports the upstream error"""
+    _, cache = _stub_upstream(translation_state, fail_on=" ")
+
+    async def scenario():
+        try:
+            await translation_routes.translate_text({"text": _passage(), "target_language": "zh"}, None)
+        except translation_routes.HTTPException as e:
+            return e
+        finally:
+            await cache.close()
+
+    assert asyncio.run(scenario()).status_code == 500
+
+def test_disconnect_cancels_pending_calls(translation_state):
+    """A client leaving the stream stops the Youdao calls made for it"""
+    calls, cache = _stub_upstream(translation_state, delay=1)
+    text = _passage()
+
+    async def scenario():
+        response = await translation_routes.translate_stream({"text": text, "target_language": "zh"}, None)
+        lines = response.body_iterator
+        await lines.__anext__()
+        reading = asyncio.ensure_future(lines.__anext__())
+        await asyncio.sleep(0.05)
+        started = len(calls)
+        # The client goes away before any chunk arrives
+        reading.cancel()
+        await asyncio.gather(reading, return_exceptions=True)
+        await lines.aclose()
+        await asyncio.sleep(0.05)
+        stray = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        await cache.close()
+        return started, stray
+
+    started, stray = asyncio.run(scenario())
+    assert started == 2
+    assert stray == []
+    assert translation_state.translation_flight.get_metrics()["abandoned"] == 1
@@ -0,0 +1,162 @@
+# test/test_word_autofill.py
+import sys
+import os
+import json
+import time
+import asyncio
+import statistics
+import httpx
+import pytest
+from fastapi import FastAPI
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.routes.translation_routes as translation_routes
+import app.routes.word_routes as word_routes
+from app.auth.auth_handler import get_current_user as auth_current_user
+from app.dependencies import UserInToken, get_current_user, get_sqlite_storage
+from app.database.sqlite.sqlite_storage import WordStorage
+from app.utils.dictionary_index import DictionaryIndex
+
+WORDS = 20
+UPSTREAM_DELAY = 0.05
+
+def _write_wordnet(directory, lemmas):
+    """Minimal WordNet files: one noun and one verb sense per lemma"""
+    os.makedirs(directory, exist_ok=True)
+    for pos, suffix in (("n", "noun"), ("v", "verb"), ("a", "adj"), ("r", "adv")):
+        data, index = [], []
+        if pos in "nv":
+            for i, lemma in enumerate(lemmas):
+                offset = 10 + i
+                data.append(f"{offset:08d} 00 {pos} 01 {lemma} 0 000 | {suffix} sense of {lemma}; \"an example\"  \n")
+                index.append(f"{lemma} {pos} 1 0 1 0 {offset:08d}  \n")
+        with open(os.path.join(directory, f"data.{suffix}"), "w") as f:
+            f.write("  test data\n" + "".join(data))
+        with open(os.path.join(directory, f"index.{suffix}"), "w") as f:
+            f.write("  test data\n" + "".join(sorted(index)))
+        open(os.path.join(directory, f"{suffix}.exc"), "w").close()
+
+@pytest.fixture
+def client(tmp_path, translation_state):
+    lemmas = [f"word{i}" for i in range(500)]
+    _write_wordnet(str(tmp_path / "wordnet"), lemmas)
+    index = DictionaryIndex(str(tmp_path / "dictionary_index.db"))
+    assert index.ensure_built(str(tmp_path / "wordnet"))
+    storage = WordStorage(db_path=str(tmp_path / "words.db"))
+    calls = []
+
+    async def upstream(params):
+        calls.append(params["q"])
+        await asyncio.sleep(UPSTREAM_DELAY)
+        return {"errorCode": "0", "translation": [f"译{params['q']}"], "l": "en2zh-CHS"}
+
+    translation_state.replace(dictionary_index=index, request_youdao_translation=upstream)
+    cache = translation_state.translation_cache
+
+    app = FastAPI()
+    app.include_router(translation_routes.router)
+    app.include_router(word_routes.router)
+    user = UserInToken(username="learner", user_id="user-1")
+    app.dependency_overrides[get_current_user] = lambda: user
+    app.dependency_overrides[auth_current_user] = lambda: user
+    app.dependency_overrides[get_sqlite_storage] = lambda: storage
+
+    async def run(scenario):
+        await storage.initialize_db()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            try:
+                return await scenario(http)
+            finally:
+                await cache.close()
+
+    return run, cache, storage, calls
+
+def test_add_word_with_one_request(client):
+    """POST /words/ with just the word replaces /translate/word + /words/"""
+    run, cache, storage, calls = client
+
+    async def add_old_way(http, word):
+        # What the app did: look the word up, then save what came back
+        translated = (await http.post("/translate/word", json={"word": word, "target_language": "zh"})).json()
+        meanings = {pos: ",".join(m[:3]) for pos, m in zip(translated["part_of_speech"], translated["english_meanings"])}
+        response = await http.post("/words/", json={
+            "word": word,
+            "en_meaning": json.dumps(meanings),
+            "ch_meaning": translated["translated_word"],
+            "part_of_speech": translated["part_of_speech"],
+        })
+        assert response.status_code == 201
+        return response.json()
+
+    async def add_new_way(http, word):
+        response = await http.post("/words/", json={"word": word})
+        assert response.status_code == 201
+        return response.json()
+
+    async def timed(add, http, words):
+        latencies = []
+        for word in words:
+            started = time.perf_counter()
+            created = await add(http, word)
+            latencies.append(time.perf_counter() - started)
+        return statistics.median(latencies), created
+
+    async def scenario(http):
+        # Words never translated before: the old way waits for Youdao
+        before_cold, _ = await timed(add_old_way, http, [f"word{i}" for i in range(WORDS)])
+        # Words with cached translations: both ways avoid Youdao
+        for i in range(WORDS, 3 * WORDS):
+            await cache.put(f"word{i}", "auto", "zh-CHS", f"缓存{i}", "en")
+        before_warm, _ = await timed(add_old_way, http, [f"word{i}" for i in range(WORDS, 2 * WORDS)])
+        after, created = await timed(add_new_way, http, [f"word{i}" for i in range(2 * WORDS, 3 * WORDS)])
+        unknown = await add_new_way(http, "zyzzyva")
+        return before_cold, before_warm, after, created, unknown
+
+    before_cold, before_warm, after, created, unknown = asyncio.run(run(scenario))
+    print(
+        f"\nmedian add-word latency: translate+create {before_cold * 1000:.1f} ms (uncached), "
+        f"{before_warm * 1000:.1f} ms (cached); create only {after * 1000:.1f} ms"
+    )
+    assert len(calls) == WORDS
+    assert after < before_cold
+    last = 3 * WORDS - 1
+    assert created["word"] == f"word{last}" and created["ch_meaning"] == f"缓存{last}"
+    assert created["part_of_speech"] == ["n", "v"]
+    assert json.loads(created["en_meaning"]) == {
+        "n": f"noun sense of word{last}", "v": f"verb sense of word{last}"
+    }
+    # Unknown and untranslated words are still saved, with blank fields
+    assert unknown["ch_meaning"] == "" and unknown["part_of_speech"] == []
+
+def test_bulk_import_fills_and_skips_existing(client):
+    """POST /words/batch fills every word and stores them in one transaction"""
+    run, cache, storage, calls = client
+    words = [{"word": f"word{i}"} for i in range(300)] + [{"word": "word5"}, {"word": "pear", "ch_meaning": "梨"}]
+
+    async def scenario(http):
+        await http.post("/words/", json={"word": "word1", "ch_meaning": "一"})
+        for i in range(0, 300, 2):
+            await cache.put(f"word{i}", "auto", "zh-CHS", f"译{i}", "en")
+        started = time.perf_counter()
+        response = await http.post("/words/batch", json={"words": words})
+        elapsed = time.perf_counter() - started
+        too_many = await http.post("/words/batch", json={"words": [{"word": "x"}] * 1001})
+        pending = await storage.get_pending_syncs()
+        return response, elapsed, too_many, pending
+
+    response, elapsed, too_many, pending = asyncio.run(run(scenario))
+    print(f"\nbulk import of {len(words)} words: {elapsed * 1000:.0f} ms")
+    assert response.status_code == 201 and too_many.status_code == 400
+    body = response.json()
+    assert body["created"] == 300 and body["existing"] == 2
+    results = body["words"]
+    assert [r["word"] for r in results] == [w["word"] for w in words]
+    assert results[1]["created"] is False and results[301]["created"] is True
+    assert results[300]["wordid"] == results[5]["wordid"] and not results[300]["created"]
+    assert results[4]["ch_meaning"] == "译4" and results[3]["ch_meaning"] == ""
+    assert results[301]["ch_meaning"] == "梨" and results[301]["part_of_speech"] == []
+    assert results[4]["part_of_speech"] == ["n", "v"]
+    assert len(pending) == 301 and calls == []
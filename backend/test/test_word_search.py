@@ -0,0 +1,155 @@
+# test/test_word_search.py
+import sys
+import os
+import re
+import time
+import random
+import string
+import asyncio
+import pytest
+from pymongo import MongoClient
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.mongodb_utils.word import (
+    MAX_SEARCH_LIMIT, build_word_search_query, search_words, word_ngrams, word_search_fields
+)
+
+# Local mongod used for the 1M-document benchmark
+MONGODB_BENCH_URL = os.getenv("MONGODB_BENCH_URL", "mongodb://localhost:27017")
+BENCH_WORDS = 1_000_000
+
+def _random_words(count, seed=7):
+    rng = random.Random(seed)
+    return [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12)))
+        for _ in range(count)
+    ]
+
+def _matches(document, query):
+    """Evaluate a filter from build_word_search_query against one document"""
+    ngrams = query.get("word_ngrams", {}).get("$all", [])
+    if not set(ngrams) <= set(document["word_ngrams"]):
+        return False
+    return re.search(query["word_lower"]["$regex"], document["word_lower"]) is not None
+
+class _Cursor:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def sort(self, key, direction):
+        self.calls["sort"] = (key, direction)
+        return self
+
+    def limit(self, limit):
+        self.calls["limit"] = limit
+        return self
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        raise StopAsyncIteration
+
+class _FakeClient:
+    def __init__(self):
+        self.calls = {}
+        self.async_db = {"words": self}
+
+    def find(self, query):
+        self.calls["query"] = query
+        return _Cursor(self.calls)
+
+def test_search_input_is_escaped():
+    """Regex metacharacters in user input match literally"""
+    query = build_word_search_query("(a+)+$", mode="prefix")
+    pattern = query["word_lower"]["$regex"]
+    assert pattern.startswith("^")
+    assert re.match(pattern, "(a+)+$x") and not re.match(pattern, "aaaa")
+
+    query = build_word_search_query("C++", mode="infix")
+    assert query["word_ngrams"] == {"$all": ["c++"]}
+    assert re.search(query["word_lower"]["$regex"], "c++ primer")
+    assert not re.search(query["word_lower"]["$regex"], "cpp")
+
+def test_short_infix_queries_use_prefix():
+    """Queries shorter than a trigram cannot use the n-gram index"""
+    assert build_word_search_query("Ab") == {"word_lower": {"$regex": "^ab"}}
+
+def test_ngram_search_matches_substring_search():
+    """The n-gram prefilter never drops a real substring match"""
+    words = _random_words(5000) + ["Apple", "pineapple", "APPLESAUCE", "grapple"]
+    documents = [{"word": w, **word_search_fields(w)} for w in words]
+    rng = random.Random(1)
+    queries = ["apple", "PPL", "app", "zzzz"] + [
+        w[i:i + rng.randint(3, 5)] for w in rng.sample(words, 200) for i in [rng.randint(0, 1)]
+    ]
+    for text in queries:
+        query = build_word_search_query(text, mode="infix")
+        found = {d["word"] for d in documents if _matches(d, query)}
+        expected = {w for w in words if text.lower() in w.lower()}
+        assert found == expected, text
+
+def test_search_words_limits_and_sorts():
+    """Results are sorted on the indexed field and capped"""
+    client = _FakeClient()
+    asyncio.run(search_words(client, "app", mode="prefix", limit=10_000))
+    assert client.calls["sort"] == ("word_lower", 1)
+    assert client.calls["limit"] == MAX_SEARCH_LIMIT
+    assert client.calls["query"] == {"word_lower": {"$regex": "^app"}}
+
+def _mongod_available():
+    try:
+        MongoClient(MONGODB_BENCH_URL, serverSelectionTimeoutMS=500).admin.command("ping")
+        return True
+    except Exception:
+        return False
+
+@pytest.mark.skipif(not _mongod_available(), reason="benchmark needs a local mongod (MONGODB_BENCH_URL)")
+def test_search_benchmark_1m_words():
+    """Indexed prefix/infix search against the old unanchored regex on 1M words"""
+    client = MongoClient(MONGODB_BENCH_URL)
+    collection = client["word_search_bench"]["words"]
+    collection.drop()
+    words = _random_words(BENCH_WORDS)
+    for start in range(0, BENCH_WORDS, 50_000):
+        collection.insert_many(
+            [{"wordid": start + i, "word": w, **word_search_fields(w)}
+             for i, w in enumerate(words[start:start + 50_000])],
+            ordered=False
+        )
+    collection.create_index("word_lower")
+    collection.create_index("word_ngrams")
+
+    def timed(query, limit=None):
+        started = time.perf_counter()
+        cursor = collection.find(query)
+        if limit:
+            cursor = cursor.sort("word_lower", 1).limit(limit)
+        results = list(cursor)
+        return time.perf_counter() - started, results
+
+    try:
+        legacy_time, legacy = timed({"word": {"$regex": ".*qxz.*", "$options": "i"}})
+        infix_time, infix = timed(build_word_search_query("qxz"), MAX_SEARCH_LIMIT)
+        prefix_time, _ = timed(build_word_search_query("qxz", mode="prefix"), 50)
+
+        stats = collection.find(build_word_search_query("qxz")).explain()["executionStats"]
+        assert {d["word"] for d in infix} <= {d["word"] for d in legacy}
+        assert len(infix) == min(len(legacy), MAX_SEARCH_LIMIT)
+        assert stats["totalDocsExamined"] < BENCH_WORDS / 100
+    finally:
+        client.drop_database("word_search_bench")
+
+    print(
+        f"\n1M words: legacy regex {legacy_time * 1000:.0f} ms, "
+        f"infix {infix_time * 1000:.1f} ms, prefix {prefix_time * 1000:.1f} ms"
+    )
+    assert infix_time < legacy_time and prefix_time < legacy_time
+
+if __name__ == "__main__":
+    test_search_input_is_escaped()
+    test_short_infix_queries_use_prefix()
+    test_ngram_search_matches_substring_search()
+    test_search_words_limits_and_sorts()
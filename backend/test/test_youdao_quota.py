@@ -0,0 +1,236 @@
+# test/test_youdao_quota.py
+import sys
+import os
+import time
+import asyncio
+import sqlite3
+import threading
+import subprocess
+import httpx
+import pytest
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app.routes.translation_routes as translation_routes
+from app.utils.circuit_breaker import CircuitBreaker
+from app.utils.rate_limiter import QuotaScheduler, QuotaExceededError, INTERACTIVE, BULK
+
+def test_bucket_waits_then_throttles():
+    """Requests wait for a refill up to the lane's maximum wait, then fail fast"""
+    quota = QuotaScheduler("test", rate=20, capacity=3, interactive_max_wait=0.2, bulk_max_wait=0.01)
+
+    async def scenario():
+        for _ in range(3):
+            await quota.acquire("key")
+        started = time.perf_counter()
+        await quota.acquire("key")  # waits ~50 ms for one token
+        waited = time.perf_counter() - started
+        with pytest.raises(QuotaExceededError) as error:
+            await quota.acquire("key", BULK)
+        return waited, error.value
+
+    waited, error = asyncio.run(scenario())
+    assert 0.03 < waited < 0.2
+    assert error.retry_after > 0
+    metrics = quota.get_metrics()
+    assert metrics[INTERACTIVE]["granted"] == 4 and metrics[INTERACTIVE]["waited"] == 1
+    assert metrics[BULK]["throttled"] == 1
+    assert list(metrics["tokens"]) == ["...key"]
+
+# One worker process taking as many tokens as it can from a shared bucket
+QUOTA_WORKER = """
+import sys, asyncio
+from app.utils.rate_limiter import QuotaScheduler, QuotaExceededError
+quota = QuotaScheduler("youdao", rate=1 / 3600, capacity=5, interactive_max_wait=0, db_path=sys.argv[1] or None)
+async def main():
+    granted = 0
+    for _ in range(10):
+        try:
+            await quota.acquire("key")
+            granted += 1
+        except QuotaExceededError:
+            pass
+    print(granted)
+asyncio.run(main())
+"""
+
+def _granted_by_workers(db_path, workers=4):
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    processes = [
+        subprocess.Popen([sys.executable, "-c", QUOTA_WORKER, db_path], cwd=backend,
+                         stdout=subprocess.PIPE, text=True)
+        for _ in range(workers)
+    ]
+    return [int(p.communicate(timeout=60)[0]) for p in processes]
+
+def test_workers_share_one_bucket(tmp_path):
+    """Four worker processes together get the key's burst once, not four times"""
+    per_process = _granted_by_workers("")
+    shared = _granted_by_workers(str(tmp_path / "quota.db"))
+    assert sum(per_process) == 20
+    assert sum(shared) == 5
+
+    # Youdao's own quota error drains the bucket for every worker
+    first = QuotaScheduler("youdao", rate=1 / 3600, capacity=5, db_path=str(tmp_path / "drain.db"))
+    second = QuotaScheduler("youdao", rate=1 / 3600, capacity=5, db_path=str(tmp_path / "drain.db"))
+    assert second.bucket("key").available() == 5
+    asyncio.run(first.penalize("key"))
+    assert second.bucket("key").available() < 0.01
+    metrics = second.get_metrics()
+    assert metrics["shared"] is True and metrics["tokens"]["...key"] < 0.01
+    first.close()
+    second.close()
+
+def test_locked_bucket_file_does_not_block_the_loop(tmp_path):
+    """Waiting on another worker's write lock leaves the event loop free"""
+    db_path = str(tmp_path / "quota.db")
+    quota = QuotaScheduler("youdao", rate=1, capacity=5, db_path=db_path)
+    quota.bucket("key").available()  # create the file and its table
+    locked = threading.Event()
+
+    def other_worker():
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        conn.execute("BEGIN IMMEDIATE")
+        locked.set()
+        time.sleep(0.3)
+        conn.execute("COMMIT")
+        conn.close()
+
+    async def scenario():
+        holder = threading.Thread(target=other_worker)
+        holder.start()
+        locked.wait()
+        gaps = []
+
+        async def ticker():
+            while True:
+                started = time.perf_counter()
+                await asyncio.sleep(0.01)
+                gaps.append(time.perf_counter() - started)
+
+        ticking = asyncio.create_task(ticker())
+        started = time.perf_counter()
+        await quota.acquire("key")
+        elapsed = time.perf_counter() - started
+        ticking.cancel()
+        holder.join()
+        return elapsed, gaps
+
+    elapsed, gaps = asyncio.run(scenario())
+    quota.close()
+    assert elapsed >= 0.2
+    assert max(gaps) < 0.1
+
+def test_interactive_lane_goes_first():
+    """With the bucket empty, waiting lookups get tokens before batch jobs"""
+    quota = QuotaScheduler("test", rate=50, capacity=2, interactive_max_wait=5, bulk_max_wait=5)
+    order = []
+
+    async def request(lane, i):
+        await quota.acquire("key", lane)
+        order.append(lane)
+
+    async def scenario():
+        quota.bucket("key").drain()
+        await asyncio.gather(
+            *(request(BULK, i) for i in range(5)),
+            *(request(INTERACTIVE, i) for i in range(5)),
+        )
+
+    asyncio.run(scenario())
+    assert order[:5] == [INTERACTIVE] * 5
+    assert order.count(BULK) == 5
+
+def test_quota_exhausted_serves_cache_only(translation_state):
+    """Cached texts still translate; others get 503 with Retry-After, lookups degrade"""
+    calls = []
+
+    async def upstream(params):
+        calls.append(params["q"])
+        return {"errorCode": "0", "translation": [params["q"] + "!"], "l": "en2zh-CHS"}
+
+    quota = QuotaScheduler("youdao", rate=1 / 60, capacity=1, interactive_max_wait=0.05)
+    translation_state.replace(youdao_quota=quota, youdao_breaker=CircuitBreaker("youdao"), request_youdao_translation=upstream)
+    cache = translation_state.translation_cache
+
+    async def scenario():
+        first = await translation_routes.translate_text({"text": "hello", "target_language": "zh"}, None)
+        cached = await translation_routes.translate_text({"text": "Hello", "target_language": "zh"}, None)
+        try:
+            await translation_routes.translate_text({"text": "world", "target_language": "zh"}, None)
+            error = None
+        except Exception as e:
+            error = e
+        word = await translation_routes.translate_word({"word": "apple", "target_language": "zh"}, None)
+        await cache.close()
+        return first, cached, error, word
+
+    first, cached, error, word = asyncio.run(scenario())
+    assert first["translated_text"] == cached["translated_text"] == "hello!"
+    assert calls == ["hello"]
+    assert error.status_code == 503 and 50 <= int(error.headers["Retry-After"]) <= 60
+    assert word["degraded"] and word["translated_word"] is None
+    assert quota.get_metrics()[INTERACTIVE]["throttled"] == 2
+
+def test_circuit_opens_on_upstream_failures(translation_state):
+    """After repeated failures Youdao is not called until the circuit half-opens"""
+    calls = []
+    healthy = False
+
+    async def upstream(params):
+        calls.append(params["q"])
+        if not healthy:
+            raise httpx.ConnectError("connection refused")
+        return {"errorCode": "0", "translation": ["ok"], "l": "en2zh-CHS"}
+
+    breaker = CircuitBreaker("youdao", failure_threshold=3, reset_timeout=0.1)
+    quota = QuotaScheduler("youdao", rate=1000, capacity=1000)
+    translation_state.replace(youdao_quota=quota, youdao_breaker=breaker, request_youdao_translation=upstream)
+    cache = translation_state.translation_cache
+
+    async def translate(text):
+        try:
+            return await translation_routes.translate_text({"text": text, "target_language": "zh"}, None)
+        except Exception as e:
+            return e
+
+    async def scenario():
+        nonlocal healthy
+        failures = [await translate(f"word{i}") for i in range(10)]
+        healthy = True
+        await asyncio.sleep(0.11)
+        recovered = await translate("word0")
+        await cache.close()
+        return failures, recovered
+
+    failures, recovered = asyncio.run(scenario())
+    assert len(calls) == 4  # 3 failures open the circuit, 1 probe after the reset timeout
+    assert [f.status_code for f in failures[:3]] == [500] * 3
+    assert all(f.status_code == 503 for f in failures[3:])
+    assert recovered["translated_text"] == "ok" and breaker.state == "closed"
+
+def test_quota_error_from_youdao_drains_bucket(translation_state):
+    """Youdao's own rate-limit error (411) stops further calls until the bucket refills"""
+    calls = []
+
+    async def upstream(params):
+        calls.append(params["q"])
+        raise translation_routes.YoudaoAPIError("411")
+
+    quota = QuotaScheduler("youdao", rate=1 / 60, capacity=10, interactive_max_wait=0.05)
+    translation_state.replace(youdao_quota=quota, youdao_breaker=CircuitBreaker("youdao"), request_youdao_translation=upstream)
+    cache = translation_state.translation_cache
+
+    async def scenario():
+        statuses = []
+        for text in ("a1", "a2", "a3"):
+            try:
+                await translation_routes.translate_text({"text": text, "target_language": "zh"}, None)
+            except Exception as e:
+                statuses.append(e.status_code)
+        await cache.close()
+        return statuses
+
+    assert asyncio.run(scenario()) == [500, 503, 503]
+    assert calls == ["a1"]